@@ -21,6 +21,7 @@ def create_app(test_config=None):
     app.config.from_mapping(
         SECRET_KEY=os.environ.get('SECRET_KEY', 'dev'),
         DATABASE_URL=os.environ.get('DATABASE_URL', 'sqlite:///portfolio.db'),
+        SQLALCHEMY_DATABASE_URI=os.environ.get('DATABASE_URL', 'sqlite:///portfolio.db'),
     )
 
     if test_config is None:
@@ -48,7 +49,16 @@ def create_app(test_config=None):
     from app.routes import init_app as init_routes
     init_routes(app)
 
+    # Static fingerprinting and response compression
+    from app.http_cache import init_app as init_http_cache
+    init_http_cache(app)
+
+    # Resource sampling and orphaned browser cleanup
+    from app.services.watchdog import init_app as init_watchdog
+    init_watchdog(app)
+
     # Create CLI commands group
+    from app.worker import worker_command
     cli_group = AppGroup('portfolio')
 
     @cli_group.command('init-db')
@@ -58,6 +68,7 @@ def create_app(test_config=None):
         init_db(app)
         click.echo('Initialized the database.')
 
+    cli_group.add_command(worker_command)
     app.cli.add_command(cli_group)
 
     # Register error handlers
@@ -1,9 +1,7 @@
-import click
 from flask import Flask
+from flask.cli import AppGroup
 from app.database import init_db, init_app as init_db_app
-from app.services.scheduler import SchedulerService
 from config.settings import Settings
-from apscheduler.schedulers.background import BackgroundScheduler
 
 def create_app(test_config=None):
     """Create and configure the Flask application."""
@@ -23,21 +21,45 @@ def create_app(test_config=None):
     settings = Settings.load_from_env()
     app.config['SETTINGS'] = settings
 
-    # Initialize scheduler after database setup
-    with app.app_context():
-        scheduler = BackgroundScheduler()
-        scheduler.start()
-        scheduler_service = SchedulerService(scheduler)
-        app.config['SCHEDULER_SERVICE'] = scheduler_service
+    # Initialize scheduler after database setup, unless a worker process runs the schedules
+    app.config['SCHEDULER_SERVICE'] = None
+    if settings.run_mode != 'queue':
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from app.services.scheduler import SchedulerService
+
+        with app.app_context():
+            scheduler = BackgroundScheduler()
+            scheduler.start()
+            scheduler_service = SchedulerService(scheduler, app=app)
+            app.config['SCHEDULER_SERVICE'] = scheduler_service
 
     # Register blueprints
     from app.routes.api import bp as api_bp
+    from app.routes.analytics import bp as analytics_bp
     from app.routes import main
     app.register_blueprint(main)
     app.register_blueprint(api_bp)
+    app.register_blueprint(analytics_bp)
+
+    # Static fingerprinting and response compression
+    from app.http_cache import init_app as init_http_cache
+    init_http_cache(app)
+
+    # Resource sampling and orphaned browser cleanup
+    from app.services.watchdog import init_app as init_watchdog
+    init_watchdog(app)
 
-    @click.command('init-db')
+    # Create CLI commands group
+    from app.worker import worker_command
+    cli_group = AppGroup('portfolio')
+
+    @cli_group.command('init-db')
     def init_db_command():
         """Clear existing data and create new tables."""
         init_db(app)
-        print('Initialized the database.')
\ No newline at end of file
+        print('Initialized the database.')
+
+    cli_group.add_command(worker_command)
+    app.cli.add_command(cli_group)
+
+    return app
\ No newline at end of file
@@ -1,22 +1,71 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.schema import CreateColumn
 from flask import current_app, g
+import threading
 
 Base = declarative_base()
 
+# One engine (and connection pool) per database URI for the whole process
+_engines = {}
+_engines_lock = threading.Lock()
+
 def get_engine():
-    """Create and return a SQLAlchemy engine instance."""
-    return create_engine(
-        current_app.config['SQLALCHEMY_DATABASE_URI'],
-        convert_unicode=True
-    )
+    """Return the SQLAlchemy engine for the app's database, creating it once."""
+    uri = current_app.config['SQLALCHEMY_DATABASE_URI']
+    with _engines_lock:
+        if uri not in _engines:
+            _engines[uri] = create_engine(uri, convert_unicode=True)
+        return _engines[uri]
+
+def pool_stats():
+    """Describe the connection pool of every engine created so far.
+
+    Returns:
+        dict: Pool class, status and checked out connections per database URI
+    """
+    with _engines_lock:
+        engines = dict(_engines)
+    stats = {}
+    for engine in engines.values():
+        pool = engine.pool
+        checkedout = getattr(pool, 'checkedout', None)
+        # repr() masks the password of the URL
+        stats[repr(engine.url)] = {
+            'pool': type(pool).__name__,
+            'status': pool.status(),
+            'checked_out': checkedout() if callable(checkedout) else None
+        }
+    return stats
+
+def _add_missing_columns(engine):
+    """Add nullable columns that models gained after their table was created."""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    definition = CreateColumn(column).compile(dialect=engine.dialect)
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {definition}"))
 
 def init_db(app):
-    """Initialize the database and create all tables."""
+    """Initialize the database and create all tables.
+
+    Nullable columns and indexes added to existing tables are created too,
+    since ``create_all`` skips tables that already exist.
+    """
+    # Models register their tables on Base when imported
+    from app import models  # noqa: F401
+
     with app.app_context():
         engine = get_engine()
         Base.metadata.create_all(bind=engine)
+        _add_missing_columns(engine)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
 
 def get_db():
     """Get or create a database session for the current request context."""
@@ -41,5 +90,10 @@ def close_db(e=None):
         db.close()
 
 def init_app(app):
-    """Register database functions with the Flask application."""
-    app.teardown_appcontext(close_db)
\ No newline at end of file
+    """Register database functions with the Flask application.
+
+    Missing tables and indexes are created on startup, so databases created
+    by an earlier version keep working without a manual ``init-db``.
+    """
+    app.teardown_appcontext(close_db)
+    init_db(app)
\ No newline at end of file
@@ -0,0 +1,125 @@
+from flask import request
+from app.lru import LRUCache
+import gzip
+import hashlib
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/javascript',
+    'text/css',
+    'text/html',
+    'text/plain',
+}
+MIN_COMPRESS_SIZE = 500
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+# Compressed static file bodies keyed by (path, etag, encoding)
+_compressed_static = LRUCache(64)
+# Static content hashes keyed by (path, mtime)
+_static_hashes = LRUCache(256)
+
+
+def static_file_hash(static_folder: str, filename: str):
+    """Return a short content hash of a static file, or None if it does not exist.
+
+    Args:
+        static_folder (str): Application static folder
+        filename (str): Path relative to the static folder
+
+    Returns:
+        str: First 12 hex digits of the file's SHA-256
+    """
+    path = os.path.join(static_folder, filename)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    key = (path, mtime)
+    digest = _static_hashes.get(key)
+    if digest is None:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        _static_hashes.set(key, digest)
+    return digest
+
+
+def _choose_encoding():
+    accepted = request.headers.get('Accept-Encoding', '').lower()
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def compress_response(response):
+    """Compress text responses with brotli or gzip when the client accepts it."""
+    if (response.status_code != 200
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers
+            or request.method == 'HEAD'):
+        return response
+
+    encoding = _choose_encoding()
+    response.vary.add('Accept-Encoding')
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    cache_key = (request.path, etag, encoding) if request.endpoint == 'static' and etag else None
+    body = _compressed_static.get(cache_key) if cache_key else None
+
+    if body is None:
+        # Static files are streamed from disk, read them so they can be compressed
+        response.direct_passthrough = False
+        data = response.get_data()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return response
+        body = _compress(data, encoding)
+        if cache_key:
+            _compressed_static.set(cache_key, body)
+    elif hasattr(response.response, 'close'):
+        # Served from cache, release the unread file handle
+        response.response.close()
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if etag and not weak:
+        # Like nginx, downgrade to a weak validator that matches every encoding
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    """Register static fingerprinting and response compression with the application."""
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            digest = static_file_hash(app.static_folder, values['filename'])
+            if digest:
+                values['v'] = digest
+
+    @app.after_request
+    def cache_and_compress(response):
+        if request.endpoint == 'static' and response.status_code in (200, 304):
+            version = request.args.get('v')
+            filename = request.view_args.get('filename') if request.view_args else None
+            if version and filename and version == static_file_hash(app.static_folder, filename):
+                response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return compress_response(response)
@@ -1,7 +1,17 @@
-from app.interfaces.data_source import DataSource
+from app.interfaces.data_source import DataSource, PartialFetchError
 from app.interfaces.data_sink import DataSink
+from app.interfaces.delta_sink import DeltaSink
+from app.interfaces.async_data_source import AsyncDataSource
+from app.interfaces.async_data_sink import AsyncDataSink
+from app.interfaces.adapters import SyncSourceAdapter, SyncSinkAdapter
 
 __all__ = [
     'DataSource',
-    'DataSink'
-]
\ No newline at end of file
+    'PartialFetchError',
+    'DataSink',
+    'DeltaSink',
+    'AsyncDataSource',
+    'AsyncDataSink',
+    'SyncSourceAdapter',
+    'SyncSinkAdapter'
+]
@@ -0,0 +1,37 @@
+from concurrent.futures import Executor
+from typing import List, Optional, Sequence
+import asyncio
+from app.models.position import Position
+from app.interfaces.data_source import DataSource
+from app.interfaces.data_sink import DataSink
+from app.interfaces.async_data_source import AsyncDataSource
+from app.interfaces.async_data_sink import AsyncDataSink
+from app.services.deadline import in_context
+
+class SyncSourceAdapter(AsyncDataSource):
+    """Expose a synchronous DataSource through the async interface.
+
+    ``fetch_positions`` runs in ``executor`` (the loop's default executor
+    when None), so blocking sources such as Selenium scraping do not stall
+    the event loop. The call keeps the caller's run deadline.
+    """
+
+    def __init__(self, source: DataSource, executor: Optional[Executor] = None):
+        self.source = source
+        self.executor = executor
+
+    async def fetch_positions(self) -> Sequence[Position]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, in_context(self.source.fetch_positions))
+
+
+class SyncSinkAdapter(AsyncDataSink):
+    """Expose a synchronous DataSink through the async interface."""
+
+    def __init__(self, sink: DataSink, executor: Optional[Executor] = None):
+        self.sink = sink
+        self.executor = executor
+
+    async def save_positions(self, positions: List[Position]) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, in_context(self.sink.save_positions, positions))
@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+from typing import List
+from app.models.position import Position
+
+class AsyncDataSink(ABC):
+    @abstractmethod
+    async def save_positions(self, positions: List[Position]) -> None:
+        """Save positions to the data sink without blocking the event loop"""
+        pass
@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+from typing import Sequence
+from app.models.position import Position
+
+class AsyncDataSource(ABC):
+    @abstractmethod
+    async def fetch_positions(self) -> Sequence[Position]:
+        """Fetch positions from the data source, as a list or a PositionBatch without blocking the event loop"""
+        pass
@@ -1,9 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import List
-from app.models.position import Position
+from typing import Dict, Sequence
+from app.models.position import Position, PositionBatch
+
+class PartialFetchError(Exception):
+    """Raised by a source that fetched only some of its accounts.
+
+    Attributes:
+        positions: Positions of the accounts that were fetched
+        errors: Mapping of account name to the exception it raised
+    """
+
+    def __init__(self, positions: PositionBatch, errors: Dict[str, Exception]):
+        self.positions = positions
+        self.errors = errors
+        super().__init__(", ".join(f"{name}: {error}" for name, error in errors.items()))
+
 
 class DataSource(ABC):
     @abstractmethod
-    def fetch_positions(self) -> List[Position]:
-        """Fetch positions from the data source"""
+    def fetch_positions(self) -> Sequence[Position]:
+        """Fetch positions from the data source, as a list or a PositionBatch"""
         pass
\ No newline at end of file
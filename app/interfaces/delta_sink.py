@@ -0,0 +1,18 @@
+from abc import abstractmethod
+from app.interfaces.data_sink import DataSink
+
+class DeltaSink(DataSink):
+    """A sink that subscribes to snapshot deltas instead of full snapshots.
+
+    ``save_positions`` still receives full snapshots when no previous
+    snapshot is available to diff against.
+    """
+
+    @abstractmethod
+    def save_delta(self, delta) -> None:
+        """Save the changes between the previous and the current snapshot.
+
+        Args:
+            delta (SnapshotDelta): Classified positions; never empty
+        """
+        pass
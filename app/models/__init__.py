@@ -1,7 +1,15 @@
 from app.models.schedule import Schedule
-from app.models.position import Position
+from app.models.position import Position, PositionBatch
+from app.models.run import Run
+from app.models.snapshot import Snapshot, SnapshotPosition
+from app.models.table_version import TableVersion
 
 __all__ = [
     'Schedule',
-    'Position'
+    'Position',
+    'PositionBatch',
+    'Run',
+    'Snapshot',
+    'SnapshotPosition',
+    'TableVersion'
 ]
\ No newline at end of file
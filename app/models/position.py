@@ -1,17 +1,251 @@
-from dataclasses import dataclass
+from collections.abc import Sequence
 from decimal import Decimal
 from datetime import datetime
+from typing import Collection, Iterable, Iterator, List, Optional, Union
+import numpy as np
+
+# Positions below this worth are treated as dust and dropped by the sources
+MIN_POSITION_WORTH = Decimal('5')
+
+# Currency positions are reported in unless a source says otherwise
+DEFAULT_CURRENCY = 'USD'
+
 
-@dataclass
 class Position:
-    name: str
-    worth: Decimal
-    platform: str
-    timestamp: datetime = datetime.now()
+    """A single holding reported by a data source.
+
+    ``worth`` is expressed in ``currency``. After currency normalization
+    the value and currency reported by the source are kept in
+    ``original_worth`` and ``original_currency``.
+    """
+
+    __slots__ = ('name', 'worth', 'platform', 'timestamp', 'currency',
+                 'original_worth', 'original_currency')
+
+    def __init__(self, name: str, worth: Decimal, platform: str,
+                 timestamp: Optional[datetime] = None, currency: str = DEFAULT_CURRENCY,
+                 original_worth: Optional[Decimal] = None, original_currency: Optional[str] = None):
+        self.name = name
+        self.worth = worth
+        self.platform = platform
+        self.timestamp = timestamp if timestamp is not None else datetime.now()
+        self.currency = currency
+        self.original_worth = original_worth if original_worth is not None else worth
+        self.original_currency = original_currency if original_currency is not None else currency
+
+    def __repr__(self) -> str:
+        return (f"Position(name={self.name!r}, worth={self.worth!r}, "
+                f"platform={self.platform!r}, timestamp={self.timestamp!r}, "
+                f"currency={self.currency!r})")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
 
     def to_dict(self) -> dict:
-        return {
+        data = {
             "name": self.name,
             "worth": str(self.worth),
-            "platform": self.platform
-        }
\ No newline at end of file
+            "platform": self.platform,
+            "currency": self.currency
+        }
+        if self.original_currency != self.currency:
+            data["original_worth"] = str(self.original_worth)
+            data["original_currency"] = self.original_currency
+        return data
+
+
+def _objects(values) -> np.ndarray:
+    """Copy values into a 1-d object array, keeping Decimals and strings as they are."""
+    values = values if isinstance(values, (list, np.ndarray)) else list(values)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _column(value, size: int, scalar_type) -> np.ndarray:
+    """Expand a scalar shared by every row, or copy a per-row iterable, into an object array."""
+    if isinstance(value, scalar_type):
+        array = np.empty(size, dtype=object)
+        array.fill(value)
+        return array
+    return _objects(value)
+
+
+def _times(value, size: int) -> np.ndarray:
+    """Expand one timestamp shared by every row, or copy per-row timestamps, into ``datetime64[us]``."""
+    if isinstance(value, datetime):
+        return np.full(size, np.datetime64(value, 'us'))
+    return np.array(value if isinstance(value, (list, np.ndarray)) else list(value), dtype='datetime64[us]')
+
+
+class PositionBatch(Sequence):
+    """Columnar collection of positions backed by NumPy arrays.
+
+    Every column is a 1-d array: names, platforms and currencies are
+    object arrays of ``str``, timestamps are ``datetime64[us]`` and worths
+    are object arrays of ``Decimal``, so sums stay exact while totals,
+    comparisons and filters run as array operations instead of creating
+    a Position object per row. The batch is a read-only sequence of
+    Position objects, so it can be passed wherever a ``List[Position]``
+    is expected.
+    """
+
+    __slots__ = ('names', 'platforms', 'worths', 'timestamps', 'currencies',
+                 'original_worths', 'original_currencies')
+
+    def __init__(self, names: Iterable[str] = (), worths: Iterable[Decimal] = (),
+                 platforms: Union[str, Iterable[str]] = (),
+                 timestamps: Union[datetime, Iterable[datetime], None] = None,
+                 currencies: Union[str, Iterable[str]] = DEFAULT_CURRENCY,
+                 original_worths: Optional[Iterable[Decimal]] = None,
+                 original_currencies: Union[str, Iterable[str], None] = None):
+        """Build a batch from column values.
+
+        Args:
+            names: Position names
+            worths: Position worths, one per name
+            platforms: Either one platform name shared by every row or one per row
+            timestamps: Either one timestamp shared by every row, one per row,
+                or None to stamp every row with the current time
+            currencies: Either one currency shared by every row or one per row
+            original_worths: Worths as reported by the source, defaults to ``worths``
+            original_currencies: Currencies as reported by the source, defaults
+                to ``currencies``
+        """
+        self.names: np.ndarray = _objects(names)
+        self.worths: np.ndarray = _objects(worths)
+        size = len(self.names)
+
+        self.platforms: np.ndarray = _column(platforms, size, str)
+        self.timestamps: np.ndarray = _times(datetime.now() if timestamps is None else timestamps, size)
+        self.currencies: np.ndarray = _column(currencies, size, str)
+        self.original_worths: np.ndarray = (
+            self.worths.copy() if original_worths is None else _objects(original_worths)
+        )
+        self.original_currencies: np.ndarray = (
+            self.currencies.copy() if original_currencies is None
+            else _column(original_currencies, size, str)
+        )
+
+        columns = (self.worths, self.platforms, self.timestamps, self.currencies,
+                   self.original_worths, self.original_currencies)
+        if any(len(column) != size for column in columns):
+            raise ValueError("PositionBatch columns must have the same length")
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[Position]) -> 'PositionBatch':
+        """Build a batch from Position objects."""
+        if isinstance(positions, PositionBatch):
+            return positions
+        positions = list(positions)
+        return cls(
+            names=[p.name for p in positions],
+            worths=[p.worth for p in positions],
+            platforms=[p.platform for p in positions],
+            timestamps=[p.timestamp for p in positions],
+            currencies=[p.currency for p in positions],
+            original_worths=[p.original_worth for p in positions],
+            original_currencies=[p.original_currency for p in positions]
+        )
+
+    @classmethod
+    def concat(cls, batches: Iterable[Iterable[Position]]) -> 'PositionBatch':
+        """Concatenate several batches (or position lists) into one."""
+        batches = [cls.from_positions(batch) for batch in batches]
+        result = cls()
+        if batches:
+            for column in cls.__slots__:
+                setattr(result, column, np.concatenate([getattr(batch, column) for batch in batches]))
+        return result
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._take(index)
+        return Position(self.names[index], self.worths[index], self.platforms[index],
+                        self.timestamps[index].item(), self.currencies[index],
+                        self.original_worths[index], self.original_currencies[index])
+
+    def __iter__(self) -> Iterator[Position]:
+        return map(Position, self.names, self.worths, self.platforms, self.timestamps.tolist(),
+                   self.currencies, self.original_worths, self.original_currencies)
+
+    def __repr__(self) -> str:
+        return f"PositionBatch(size={len(self)})"
+
+    def _take(self, index) -> 'PositionBatch':
+        """Return a batch of the rows selected by a slice, boolean mask or index array."""
+        batch = PositionBatch.__new__(PositionBatch)
+        for column in self.__slots__:
+            setattr(batch, column, getattr(self, column)[index])
+        return batch
+
+    def take_rows(self, rows: Iterable[int]) -> 'PositionBatch':
+        """Return a batch holding the given row indices, in that order."""
+        return self._take(np.fromiter(rows, dtype=np.intp))
+
+    def with_worths(self, worths: Iterable[Decimal], currencies: Union[str, Iterable[str]]) -> 'PositionBatch':
+        """Return a copy with replaced worths and currencies, keeping the original values."""
+        return PositionBatch(self.names, worths, self.platforms, self.timestamps, currencies,
+                             self.original_worths, self.original_currencies)
+
+    def total_worth(self) -> Decimal:
+        """Return the summed worth of all positions."""
+        return np.add.reduce(self.worths, initial=Decimal('0'))
+
+    def totals_by_platform(self) -> dict:
+        """Return the summed worth of positions per platform."""
+        platforms, index = np.unique(self.platforms.astype(str), return_inverse=True)
+        totals = np.empty(len(platforms), dtype=object)
+        totals.fill(Decimal('0'))
+        np.add.at(totals, index, self.worths)
+        return dict(zip(platforms.tolist(), totals))
+
+    def filter_min_worth(self, min_worth: Decimal = MIN_POSITION_WORTH) -> 'PositionBatch':
+        """Return a batch holding only positions worth at least ``min_worth``."""
+        return self._take((self.worths >= min_worth).astype(bool))
+
+    def filter_platform(self, platform: str) -> 'PositionBatch':
+        """Return a batch holding only positions from ``platform``."""
+        return self._take((self.platforms == platform).astype(bool))
+
+    def exclude_platforms(self, platforms: Collection[str]) -> 'PositionBatch':
+        """Return a batch without the positions from any of ``platforms``."""
+        return self._take(~np.isin(self.platforms.astype(str), list(platforms)))
+
+    def to_positions(self) -> List[Position]:
+        """Materialize the batch as a list of Position objects."""
+        return list(self)
+
+    def to_dicts(self) -> List[dict]:
+        """Serialize every row the same way as ``Position.to_dict``, without creating Position objects."""
+        worths = self.worths.astype(str).tolist()
+        original_worths = self.original_worths.astype(str).tolist()
+        converted = (self.original_currencies != self.currencies).astype(bool).tolist()
+        dicts = [
+            {"name": name, "worth": worth, "platform": platform, "currency": currency}
+            for name, worth, platform, currency in zip(self.names.tolist(), worths,
+                                                       self.platforms.tolist(), self.currencies.tolist())
+        ]
+        for data, original_worth, original_currency, was_converted in zip(
+                dicts, original_worths, self.original_currencies.tolist(), converted):
+            if was_converted:
+                data["original_worth"] = original_worth
+                data["original_currency"] = original_currency
+        return dicts
+
+    def to_dict(self) -> dict:
+        """Serialize the batch column-wise."""
+        return {
+            "names": self.names.tolist(),
+            "worths": self.worths.astype(str).tolist(),
+            "platforms": self.platforms.tolist(),
+            "timestamps": [ts.isoformat() for ts in self.timestamps.tolist()],
+            "currencies": self.currencies.tolist(),
+            "original_worths": self.original_worths.astype(str).tolist(),
+            "original_currencies": self.original_currencies.tolist()
+        }
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, LargeBinary
+from sqlalchemy.orm import deferred
+from datetime import datetime
+from app.database import Base
+
+class Run(Base):
+    """Database model recording a single portfolio tracking run."""
+
+    __tablename__ = 'runs'
+
+    id = Column(Integer, primary_key=True)
+    trigger = Column(String(20), nullable=False)  # 'manual' or 'schedule'
+    schedule_id = Column(Integer, nullable=True)
+    selected_sources = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default='running')
+    result = Column(JSON, nullable=True)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    # Refreshed by the process executing the run, see app.services.runs.expire_abandoned_runs
+    heartbeat_at = Column(DateTime, nullable=True)
+    # Marshalled pstats data, only present for profiled runs
+    profile = deferred(Column(LargeBinary, nullable=True))
+    profiled = Column(Boolean, default=False)
+
+    def to_dict(self):
+        """Convert run to dictionary format."""
+        return {
+            'id': self.id,
+            'trigger': self.trigger,
+            'schedule_id': self.schedule_id,
+            'selected_sources': self.selected_sources,
+            'status': self.status,
+            'result': self.result,
+            'profiled': bool(self.profiled),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
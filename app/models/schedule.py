@@ -1,7 +1,10 @@
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON
 from datetime import datetime
+import re
 from app.database import Base
+from app.models.table_version import versioned
 
+@versioned
 class Schedule(Base):
     """Database model for storing portfolio update schedules."""
     
@@ -13,11 +16,15 @@ class Schedule(Base):
     time = Column(String(5), nullable=False)  # Format: "HH:MM"
     day_of_week = Column(Integer, nullable=True)  # 0-6 for weekly schedules
     selected_sources = Column(JSON, nullable=False)
-    active = Column(Boolean, default=True)
+    active = Column(Boolean, default=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_run = Column(DateTime, nullable=True)
 
+    REQUIRED_FIELDS = ('name', 'schedule_type', 'time', 'selected_sources')
+    EDITABLE_FIELDS = ('name', 'schedule_type', 'time', 'day_of_week', 'selected_sources', 'active')
+    SCHEDULE_TYPES = ('daily', 'weekly')
+
     def to_dict(self):
         """Convert schedule to dictionary format."""
         return {
@@ -33,6 +40,47 @@ class Schedule(Base):
             'updated_at': self.updated_at.isoformat()
         }
 
+    @classmethod
+    def validate(cls, data, partial=False):
+        """Check schedule fields without touching the database.
+
+        Args:
+            data (dict): Schedule fields as sent by API clients
+            partial (bool): Only check the fields present, for updates
+
+        Returns:
+            list: Error messages, empty when the data is valid
+        """
+        if not isinstance(data, dict):
+            return ['Schedule must be an object']
+
+        errors = []
+        if not partial:
+            missing = [field for field in cls.REQUIRED_FIELDS if field not in data]
+            if missing:
+                errors.append(f"Missing required fields: {', '.join(missing)}")
+
+        if 'name' in data and (not isinstance(data['name'], str) or not 0 < len(data['name']) <= 100):
+            errors.append('name must be a string of 1 to 100 characters')
+        if 'schedule_type' in data and data['schedule_type'] not in cls.SCHEDULE_TYPES:
+            errors.append(f"schedule_type must be one of {', '.join(cls.SCHEDULE_TYPES)}")
+        if 'time' in data and not (
+            isinstance(data['time'], str) and re.fullmatch(r'([01]\d|2[0-3]):[0-5]\d', data['time'])
+        ):
+            errors.append('time must use the HH:MM format')
+        if 'day_of_week' in data and data['day_of_week'] is not None and data['day_of_week'] not in range(7):
+            errors.append('day_of_week must be between 0 and 6')
+        if data.get('schedule_type') == 'weekly' and data.get('day_of_week') is None and not partial:
+            errors.append('day_of_week is required for weekly schedules')
+        if 'selected_sources' in data and not (
+            isinstance(data['selected_sources'], list) and data['selected_sources']
+            and all(isinstance(source, str) for source in data['selected_sources'])
+        ):
+            errors.append('selected_sources must be a non-empty list of source names')
+        if 'active' in data and not isinstance(data['active'], bool):
+            errors.append('active must be a boolean')
+        return errors
+
     @classmethod
     def create(cls, db_session, name, schedule_type, time, selected_sources, day_of_week=None):
         """Create a new schedule in the database.
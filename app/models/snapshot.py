@@ -0,0 +1,56 @@
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database import Base
+
+class Snapshot(Base):
+    """Database model for one stored portfolio snapshot.
+
+    Identical consecutive snapshots share their position rows: a snapshot
+    whose content hash matches the previous one stores no rows of its own
+    and points ``positions_snapshot_id`` at the snapshot holding them.
+    ``sources`` names the sources the run selected, so a run only diffs
+    against an earlier run of the same sources.
+    """
+
+    __tablename__ = 'snapshots'
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, nullable=True)
+    sources = Column(String(255), nullable=True, index=True)
+    taken_at = Column(DateTime, default=datetime.utcnow, index=True)
+    content_hash = Column(String(64), nullable=False)
+    positions_snapshot_id = Column(Integer, nullable=True)
+    position_count = Column(Integer, nullable=False, default=0)
+    total_worth = Column(Numeric(38, 18), nullable=False, default=0)
+    currency = Column(String(3), nullable=False)
+
+    positions = relationship('SnapshotPosition', lazy='dynamic', cascade='all, delete-orphan')
+
+    def to_dict(self):
+        """Convert snapshot to dictionary format."""
+        return {
+            'id': self.id,
+            'run_id': self.run_id,
+            'sources': self.sources.split(',') if self.sources else None,
+            'taken_at': self.taken_at.isoformat() if self.taken_at else None,
+            'content_hash': self.content_hash,
+            'position_count': self.position_count,
+            'total_worth': str(self.total_worth),
+            'currency': self.currency
+        }
+
+
+class SnapshotPosition(Base):
+    """Database model for one position row of a snapshot."""
+
+    __tablename__ = 'snapshot_positions'
+
+    id = Column(Integer, primary_key=True)
+    snapshot_id = Column(Integer, ForeignKey('snapshots.id'), nullable=False, index=True)
+    platform = Column(String(100), nullable=False)
+    name = Column(String(200), nullable=False)
+    worth = Column(Numeric(38, 18), nullable=False)
+    currency = Column(String(3), nullable=False)
+    original_worth = Column(Numeric(38, 18), nullable=False)
+    original_currency = Column(String(3), nullable=False)
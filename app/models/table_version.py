@@ -0,0 +1,117 @@
+from sqlalchemy import Column, Integer, String, DateTime, event
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+from datetime import datetime
+from app.database import Base
+import secrets
+
+def _new_epoch():
+    return secrets.token_hex(8)
+
+class TableVersion(Base):
+    """Monotonic change counter per table, used for HTTP cache validation.
+
+    ``epoch`` is a random value drawn when the row is created, so a table
+    of a recreated database never reuses the validator of an earlier one
+    at the same version.
+    """
+
+    __tablename__ = 'table_versions'
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    epoch = Column(String(16), default=_new_epoch)
+
+    @property
+    def tag(self):
+        """Validator of the table's contents, unique across databases."""
+        return f"{self.epoch}-{self.version}" if self.epoch else str(self.version)
+
+    @classmethod
+    def get(cls, db_session, name):
+        """Return the version row for a table, or None if it never changed.
+
+        Args:
+            db_session: SQLAlchemy session
+            name (str): Table name
+
+        Returns:
+            TableVersion: Version row or None
+        """
+        return db_session.query(cls).get(name)
+
+    @classmethod
+    def current_tag(cls, db_session, name):
+        """Return the ``tag`` of a table, '0' if it never changed.
+
+        Args:
+            db_session: SQLAlchemy session
+            name (str): Table name
+
+        Returns:
+            str: Validator of the table's contents
+        """
+        row = cls.get(db_session, name)
+        return row.tag if row is not None else '0'
+
+    @classmethod
+    def bump(cls, db_session, name):
+        """Increment the version of a table within the current transaction.
+
+        A single upsert creates the row or increments it on the server, so
+        concurrent writers neither lose an update nor collide on the first
+        insert.
+
+        Args:
+            db_session: SQLAlchemy session
+            name (str): Table name
+        """
+        now = datetime.utcnow()
+        table = cls.__table__
+        dialect = db_session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            statement = insert(table).values(name=name, version=1, updated_at=now).on_conflict_do_update(
+                index_elements=[table.c.name],
+                set_={'version': table.c.version + 1, 'updated_at': now}
+            )
+        elif dialect == 'mysql':
+            statement = mysql.insert(table).values(name=name, version=1, updated_at=now).on_duplicate_key_update(
+                version=table.c.version + 1, updated_at=now
+            )
+        else:
+            with db_session.no_autoflush:
+                row = db_session.query(cls).get(name)
+            if row is None:
+                db_session.add(cls(name=name, version=1, updated_at=now))
+            else:
+                row.version = cls.version + 1
+                row.updated_at = now
+            return
+
+        db_session.execute(statement)
+        # A row loaded earlier in this session no longer reflects the stored version
+        row = db_session.identity_map.get(identity_key(cls, name))
+        if row is not None:
+            db_session.expire(row)
+
+
+# Tables whose changes are tracked, filled in by the models that opt in
+VERSIONED_MODELS = {}
+
+def versioned(model):
+    """Class decorator bumping ``table_versions`` whenever rows of ``model`` change."""
+    VERSIONED_MODELS[model] = model.__tablename__
+    return model
+
+@event.listens_for(Session, 'before_flush')
+def _bump_versions(session, flush_context, instances):
+    changed = {
+        VERSIONED_MODELS[type(obj)]
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if type(obj) in VERSIONED_MODELS and (obj not in session.dirty or session.is_modified(obj))
+    }
+    for name in changed:
+        TableVersion.bump(session, name)
@@ -1,34 +1,60 @@
-from typing import List, Dict, Type
-from app.models.position import Position
-from app.sources.trading212 import Trading212Source
-from app.sources.debank import DebankSource
-from app.sinks.notion import NotionSink
+from typing import Callable, List, Dict, Optional, Set, Tuple, Type
+from app.models.position import PositionBatch
+from app.sources.trading212 import AsyncTrading212Source
+from app.sources.binance import AsyncBinanceSource
+from app.sources import SOURCE_NAMES, source_class
+from app.sinks.notion import NotionSink, AsyncNotionSink
+from app.sinks.fanout import FanOutSink, FanOutError
+from app.sinks.files import JsonlSink, CsvSink, ParquetSink
+from app.sinks.delta_only import DeltaOnlySink
 from app.services.web_driver import WebDriverService
-from app.interfaces.data_source import DataSource
+from app.interfaces.data_source import DataSource, PartialFetchError
+from app.interfaces.data_sink import DataSink
+from app.interfaces.delta_sink import DeltaSink
+from app.interfaces.async_data_source import AsyncDataSource
+from app.interfaces.async_data_sink import AsyncDataSink
+from app.interfaces.adapters import SyncSourceAdapter, SyncSinkAdapter
+from app.services import metrics
+from app.services.fx import CurrencyConverter, FrankfurterRateProvider, shared_rate_cache
+from app.services.delta import SnapshotDelta, compute_delta, content_hash
+from app.services.snapshots import SnapshotStore, sources_key
+from app.services.deadline import Deadline, DeadlineExceeded, current_deadline, in_context
 from config.settings import Settings
+import asyncio
+import functools
+import httpx
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Result messages of runs stopped by their deadline
+STOPPED_MESSAGES = {
+    'timeout': "Portfolio tracking stopped at the run deadline",
+    'cancelled': "Portfolio tracking cancelled"
+}
+
 class PortfolioTracker:
     """Core class for managing portfolio tracking operations."""
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, snapshot_store: Optional[SnapshotStore] = None):
         """Initialize the portfolio tracker with configurations.
         
         Args:
             settings: Application settings instance containing necessary configurations
+            snapshot_store: Store of previous snapshots; without it no deltas are computed
         """
         self.settings = settings
-        self.web_driver_service = WebDriverService()
+        self.snapshot_store = snapshot_store
+        self.run_id: Optional[int] = None
+        self.web_driver_service = WebDriverService(settings.chromedriver_path)
         self._initialize_components()
 
     def _initialize_components(self) -> None:
         """Initialize data sources and sinks."""
         # Initialize available sources
         self.source_registry: Dict[str, Type[DataSource]] = {
-            'Trading212': Trading212Source,
-            'Debank': DebankSource
+            name: source_class(name) for name in SOURCE_NAMES
         }
 
         # Create source instances
@@ -41,8 +67,41 @@ class PortfolioTracker:
         # Initialize active sources with all available sources
         self.active_sources: Dict[str, DataSource] = self.available_sources.copy()
 
-        # Initialize data sink
-        self.sink = NotionSink(self.settings)
+        # Initialize available sinks
+        self.sink_registry: Dict[str, Type[DataSink]] = {
+            'notion': NotionSink,
+            'jsonl': JsonlSink,
+            'csv': CsvSink,
+            'parquet': ParquetSink
+        }
+
+        # Create configured sink instances, every batch is written to all of them
+        self.sinks: Dict[str, DataSink] = {}
+        for name in self.settings.sinks:
+            if name not in self.sink_registry:
+                logger.warning(f"Invalid sink name: {name}")
+                continue
+            sink = self.sink_registry[name](self.settings)
+            # Delta subscribers only receive positions that changed since the last snapshot
+            self.sinks[name] = DeltaOnlySink(sink) if name in self.settings.delta_sinks else sink
+
+        self.sink = FanOutSink(self.sinks)
+
+        # Normalize all positions to one base currency before saving
+        self.currency_converter = CurrencyConverter(
+            self.settings.base_currency,
+            FrankfurterRateProvider(),
+            shared_rate_cache(self.settings.fx_cache_path, self.settings.fx_cache_ttl)
+        )
+
+        # Native asyncio implementations, other sources and sinks run through executor adapters
+        self.async_source_registry: Dict[str, Type[AsyncDataSource]] = {
+            'Trading212': AsyncTrading212Source,
+            'Binance': AsyncBinanceSource
+        }
+        self.async_sink_registry: Dict[str, Type[AsyncDataSink]] = {
+            'notion': AsyncNotionSink
+        }
 
     def set_active_sources(self, source_names: List[str]) -> None:
         """Update the list of active data sources.
@@ -64,9 +123,21 @@ class PortfolioTracker:
         """
         return list(self.source_registry.keys())
 
-    def run(self) -> dict:
+    def run(self, deadline: Optional[Deadline] = None) -> dict:
         """Execute portfolio tracking operation with active sources.
-        
+
+        Sources, sinks and their HTTP calls and WebDriver sessions share the
+        run's deadline. Once it passes or the run is cancelled, no further
+        source or sink is started and a fetched batch is no longer saved;
+        the result lists what completed before the cutoff.
+
+        A run whose positions could not be converted to the base currency
+        fails: nothing is saved and no snapshot is recorded, so sinks never
+        receive positions in mixed currencies.
+
+        Args:
+            deadline: Time budget of the run, ``settings.run_deadline`` seconds from now when omitted
+
         Returns:
             Dictionary containing operation results and any errors
         """
@@ -78,39 +149,364 @@ class PortfolioTracker:
                 "positions": []
             }
 
-        all_positions: List[Position] = []
+        if deadline is None:
+            deadline = Deadline(self.settings.run_deadline)
+        run_started = time.perf_counter()
+        fetched: List[PositionBatch] = []
+        fetched_platforms: Dict[str, Set[str]] = {}
         errors: Dict[str, str] = {}
-        
-        # Fetch positions from each active source
-        for source_name, source in self.active_sources.items():
+        completed: Dict[str, List[str]] = {"sources": [], "sinks": []}
+        interrupted: Dict[str, List[str]] = {"sources": [], "sinks": []}
+
+        with deadline.activate():
+            # Fetch positions from each active source
+            for source_name, source in self.active_sources.items():
+                if deadline.expired:
+                    interrupted["sources"].append(source_name)
+                    continue
+                try:
+                    logger.info(f"Fetching positions from {source_name}")
+                    with metrics.SOURCE_FETCH_DURATION.labels(source=source_name).time():
+                        positions = PositionBatch.from_positions(source.fetch_positions())
+                    # A source cut off by the deadline may have returned only part of its positions
+                    deadline.check()
+                    fetched.append(positions)
+                    self._source_fetched(source_name, positions, fetched_platforms, completed)
+                except DeadlineExceeded as e:
+                    logger.warning(f"Fetching positions from {source_name} stopped: {str(e)}")
+                    interrupted["sources"].append(source_name)
+                except PartialFetchError as e:
+                    fetched.append(PositionBatch.from_positions(e.positions))
+                    self._source_failed(source_name, e, errors)
+                except Exception as e:
+                    self._source_failed(source_name, e, errors)
+
+            all_positions, delta, record = self._prepare(fetched, errors, fetched_platforms)
+            if deadline.expired:
+                interrupted["sinks"].extend(self.sinks)
+                return self._build_result(all_positions, errors, run_started, delta,
+                                          deadline, completed, interrupted)
+
+            # Save positions if any were fetched and converted successfully
+            if all_positions and "fx" not in errors:
+                try:
+                    logger.info(f"Saving {len(all_positions)} positions to {', '.join(self.sinks)}")
+                    self.sink.save_positions(all_positions, delta)
+                except FanOutError as e:
+                    for sink_name, error in e.errors.items():
+                        if isinstance(error, DeadlineExceeded):
+                            interrupted["sinks"].append(sink_name)
+                        else:
+                            errors[sink_name] = f"Error saving positions to {sink_name}: {str(error)}"
+                except Exception as e:
+                    error_msg = f"Error saving positions: {str(e)}"
+                    logger.error(error_msg)
+                    metrics.record_error('sink', 'fanout')
+                    errors["sinks"] = error_msg
+                if "sinks" not in errors:
+                    completed["sinks"].extend(
+                        name for name in self.sinks if name not in errors and name not in interrupted["sinks"]
+                    )
+            self._record_snapshot(record, errors, interrupted)
+
+        return self._build_result(all_positions, errors, run_started, delta,
+                                  deadline, completed, interrupted)
+
+    async def run_async(self, client: Optional[httpx.AsyncClient] = None,
+                        deadline: Optional[Deadline] = None) -> dict:
+        """Execute portfolio tracking on the running event loop.
+
+        Sources are fetched concurrently and the batch is then saved to all
+        sinks concurrently. Sources and sinks with a native asyncio
+        implementation use ``client``; the rest run in the loop's default
+        executor. Every fetch and save is abandoned once the run's deadline
+        passes, and nothing is saved when the currency conversion fails,
+        see ``run``.
+
+        Args:
+            client: Shared HTTP client; a private one is created when omitted
+            deadline: Time budget of the run, ``settings.run_deadline`` seconds from now when omitted
+
+        Returns:
+            Dictionary containing operation results and any errors
+        """
+        if not self.active_sources:
+            logger.warning("No active sources configured")
+            return {
+                "status": "warning",
+                "message": "No active sources configured",
+                "positions": []
+            }
+
+        if deadline is None:
+            deadline = Deadline(self.settings.run_deadline)
+        if client is None:
+            async with httpx.AsyncClient(timeout=30) as client:
+                return await self.run_async(client, deadline)
+
+        run_started = time.perf_counter()
+        fetched_platforms: Dict[str, Set[str]] = {}
+        errors: Dict[str, str] = {}
+        completed: Dict[str, List[str]] = {"sources": [], "sinks": []}
+        interrupted: Dict[str, List[str]] = {"sources": [], "sinks": []}
+
+        async def fetch(source_name: str, source: AsyncDataSource) -> PositionBatch:
             try:
                 logger.info(f"Fetching positions from {source_name}")
-                positions = source.fetch_positions()
-                all_positions.extend(positions)
-                logger.info(f"Successfully fetched {len(positions)} positions from {source_name}")
+                with metrics.SOURCE_FETCH_DURATION.labels(source=source_name).time():
+                    positions = PositionBatch.from_positions(
+                        await asyncio.wait_for(source.fetch_positions(), deadline.remaining())
+                    )
+                deadline.check()
+                self._source_fetched(source_name, positions, fetched_platforms, completed)
+                return positions
+            except (DeadlineExceeded, asyncio.TimeoutError):
+                logger.warning(f"Fetching positions from {source_name} stopped by the run deadline")
+                interrupted["sources"].append(source_name)
+                return PositionBatch()
+            except PartialFetchError as e:
+                self._source_failed(source_name, e, errors)
+                return PositionBatch.from_positions(e.positions)
             except Exception as e:
-                error_msg = f"Error fetching positions from {source_name}: {str(e)}"
-                logger.error(error_msg)
-                errors[source_name] = error_msg
+                self._source_failed(source_name, e, errors)
+                return PositionBatch()
 
-        # Save positions if any were fetched successfully
-        if all_positions:
+        async def save(sink_name: str, save_call, count: int) -> None:
             try:
-                logger.info(f"Saving {len(all_positions)} positions to Notion")
-                self.sink.save_positions(all_positions)
-                logger.info("Successfully saved positions to Notion")
+                logger.info(f"Saving {count} positions to {sink_name}")
+                with metrics.SINK_SAVE_DURATION.labels(sink=sink_name).time():
+                    await asyncio.wait_for(save_call, deadline.remaining())
+                completed["sinks"].append(sink_name)
+                metrics.POSITIONS_SAVED.labels(sink=sink_name).inc(count)
+                logger.info(f"Successfully saved positions to {sink_name}")
+            except (DeadlineExceeded, asyncio.TimeoutError):
+                logger.warning(f"Saving positions to {sink_name} stopped by the run deadline")
+                interrupted["sinks"].append(sink_name)
             except Exception as e:
-                error_msg = f"Error saving positions to Notion: {str(e)}"
+                error_msg = f"Error saving positions to {sink_name}: {str(e)}"
                 logger.error(error_msg)
-                errors["notion"] = error_msg
+                metrics.record_error('sink', sink_name)
+                errors[sink_name] = error_msg
+
+        with deadline.activate():
+            sources = {
+                name: self._async_source(name, source, client)
+                for name, source in self.active_sources.items()
+            }
+            fetched = await asyncio.gather(*(fetch(name, source) for name, source in sources.items()))
+            loop = asyncio.get_running_loop()
+            all_positions, delta, record = await loop.run_in_executor(
+                None, in_context(self._prepare, fetched, errors, fetched_platforms)
+            )
+            if deadline.expired:
+                interrupted["sinks"].extend(self.sinks)
+                return self._build_result(all_positions, errors, run_started, delta,
+                                          deadline, completed, interrupted)
+
+            if all_positions and "fx" not in errors:
+                saves = []
+                for name, sink in self.sinks.items():
+                    if isinstance(sink, DeltaSink) and delta is not None:
+                        if delta.is_empty:
+                            completed["sinks"].append(name)
+                        else:
+                            saves.append(save(name, loop.run_in_executor(None, in_context(sink.save_delta, delta)),
+                                              delta.change_count))
+                    else:
+                        saves.append(save(name, self._async_sink(name, sink, client).save_positions(all_positions),
+                                          len(all_positions)))
+                await asyncio.gather(*saves)
+            await loop.run_in_executor(None, in_context(self._record_snapshot, record, errors, interrupted))
+
+        return self._build_result(all_positions, errors, run_started, delta,
+                                  deadline, completed, interrupted)
+
+    def _source_fetched(self, source_name: str, positions: PositionBatch,
+                        fetched_platforms: Dict[str, Set[str]], completed: Dict[str, List[str]]) -> None:
+        """Record a source that returned all of its positions."""
+        fetched_platforms[source_name] = set(positions.platforms)
+        completed["sources"].append(source_name)
+        metrics.POSITIONS_FETCHED.labels(source=source_name).inc(len(positions))
+        logger.info(f"Successfully fetched {len(positions)} positions from {source_name}")
+
+    def _source_failed(self, source_name: str, error: Exception, errors: Dict[str, str]) -> None:
+        """Record a failed source.
+
+        Positions of a PartialFetchError are still saved, but the source is
+        left out of the snapshot delta like a source that returned nothing.
+        """
+        error_msg = f"Error fetching positions from {source_name}: {str(error)}"
+        logger.error(error_msg)
+        metrics.record_error('source', source_name)
+        errors[source_name] = error_msg
+
+    def _prepare(self, fetched: List[PositionBatch], errors: Dict[str, str],
+                 fetched_platforms: Dict[str, Set[str]]
+                 ) -> Tuple[PositionBatch, Optional[SnapshotDelta], Optional[Callable[[], None]]]:
+        """Turn the fetched batches into the positions to save.
+
+        Runs the steps between fetching and saving shared by ``run`` and
+        ``run_async``: the batches are merged, converted to the base
+        currency and diffed against the previous snapshot. No delta is
+        computed once the run's deadline passed or the conversion failed.
+
+        Args:
+            fetched: Batches returned by the sources
+            errors: Run errors, extended by failed steps
+            fetched_platforms: Platforms returned by each source that was fetched completely
+
+        Returns:
+            The positions, their snapshot delta and the call recording the
+            new snapshot, see ``_compute_delta``
+        """
+        positions = self._normalize_currency(PositionBatch.concat(fetched), errors)
+        if "fx" in errors or current_deadline().expired:
+            return positions, None, None
+        return (positions, *self._compute_delta(positions, errors, fetched_platforms))
+
+    def _normalize_currency(self, positions: PositionBatch, errors: Dict[str, str]) -> PositionBatch:
+        """Convert positions to the base currency, keeping them unconverted and failing the run if rates are unavailable."""
+        try:
+            return self.currency_converter.convert(positions)
+        except Exception as e:
+            error_msg = f"Error converting positions to {self.settings.base_currency}: {str(e)}"
+            logger.error(error_msg)
+            metrics.record_error('fx', self.settings.base_currency)
+            errors["fx"] = error_msg
+            return positions
+
+    def _compute_delta(self, positions: PositionBatch, errors: Dict[str, str],
+                       fetched_platforms: Dict[str, Set[str]]
+                       ) -> Tuple[Optional[SnapshotDelta], Optional[Callable[[], None]]]:
+        """Diff positions against the previous snapshot and prepare storing them as the new one.
+
+        The previous snapshot is the latest one of a run selecting the same
+        sources. When a selected source failed, only the platforms of the
+        sources fetched completely are diffed; the other platforms keep
+        their previous rows in the new snapshot instead of being reported
+        as removed.
+
+        A snapshot whose content hash matches the previous one short-circuits
+        to an empty delta without loading the previous positions.
+
+        Args:
+            positions: Positions of the run
+            errors: Run errors, extended when the delta fails
+            fetched_platforms: Platforms returned by each source that was fetched completely
+
+        Returns:
+            The delta and the call recording the new snapshot, both None when
+            there is no snapshot store or it failed
+        """
+        if self.snapshot_store is None or not positions:
+            return None, None
+
+        try:
+            key = sources_key(self.active_sources)
+            digest = content_hash(positions)
+            previous = self.snapshot_store.latest(key)
+            complete = all(name in fetched_platforms for name in self.active_sources)
+
+            if complete and previous is not None and previous.content_hash == digest:
+                empty = PositionBatch()
+                delta = SnapshotDelta(empty, empty, empty, positions, identical=True)
+                snapshot = positions
+            else:
+                previous_positions = (
+                    self.snapshot_store.load_positions(previous) if previous is not None else PositionBatch()
+                )
+                snapshot = positions
+                if not complete:
+                    diffed = set().union(*fetched_platforms.values())
+                    skipped = (set(positions.platforms) | set(previous_positions.platforms)) - diffed
+                    if skipped:
+                        logger.warning(f"Snapshot delta skips platforms of failed sources: {', '.join(sorted(skipped))}")
+                    kept = previous_positions.exclude_platforms(diffed)
+                    positions = positions.exclude_platforms(skipped)
+                    previous_positions = previous_positions.exclude_platforms(skipped)
+                    snapshot = PositionBatch.concat([positions, kept])
+                    digest = content_hash(snapshot)
+                delta = compute_delta(previous_positions, positions, self.settings.delta_threshold)
+
+            logger.info(f"Snapshot delta: {delta.summary()}")
+            return delta, functools.partial(self.snapshot_store.record, snapshot, digest,
+                                            self.settings.base_currency, previous, self.run_id, key)
+        except Exception as e:
+            error_msg = f"Error computing snapshot delta: {str(e)}"
+            logger.error(error_msg)
+            metrics.record_error('delta', 'snapshots')
+            errors["delta"] = error_msg
+            return None, None
+
+    def _record_snapshot(self, record: Optional[Callable[[], None]], errors: Dict[str, str],
+                         interrupted: Dict[str, List[str]]) -> None:
+        """Store the run's snapshot once every sink saved its positions.
+
+        A run with a failed or interrupted sink keeps the previous snapshot
+        as the baseline, so the next run delivers its changes again instead
+        of diffing against positions some sinks never received.
+        """
+        if record is None or interrupted["sinks"] or any(name in errors for name in ("sinks", *self.sinks)):
+            return
+        try:
+            record()
+        except Exception as e:
+            error_msg = f"Error recording snapshot: {str(e)}"
+            logger.error(error_msg)
+            metrics.record_error('delta', 'snapshots')
+            errors["delta"] = error_msg
+
+    def _async_source(self, name: str, source: DataSource, client: httpx.AsyncClient) -> AsyncDataSource:
+        """Return the native async variant of a source, or wrap it in an executor adapter."""
+        if name in self.async_source_registry:
+            return self.async_source_registry[name](self.settings, client)
+        return SyncSourceAdapter(source)
+
+    def _async_sink(self, name: str, sink: DataSink, client: httpx.AsyncClient) -> AsyncDataSink:
+        """Return the native async variant of a sink, or wrap it in an executor adapter."""
+        if name in self.async_sink_registry:
+            return self.async_sink_registry[name](self.settings, client)
+        return SyncSinkAdapter(sink)
+
+    def _build_result(self, all_positions: PositionBatch, errors: Dict[str, str], run_started: float,
+                      delta: Optional[SnapshotDelta] = None, deadline: Optional[Deadline] = None,
+                      completed: Optional[Dict[str, List[str]]] = None,
+                      interrupted: Optional[Dict[str, List[str]]] = None) -> dict:
+        """Build the run summary and record the run duration.
+
+        A run that left sources or sinks unfinished because of its deadline
+        gets the status 'timeout', or 'cancelled' when it was cancelled.
+        """
+        stopped = bool(interrupted and any(interrupted.values()))
+        if stopped:
+            status = deadline.reason or 'timeout'
+            message = STOPPED_MESSAGES[status]
+        else:
+            saved = all_positions and "fx" not in errors
+            status = "success" if not errors else "partial_success" if saved else "error"
+            message = "Portfolio tracking completed"
+        metrics.RUN_DURATION.labels(status=status).observe(time.perf_counter() - run_started)
 
         return {
-            "status": "success" if not errors else "partial_success" if all_positions else "error",
-            "message": "Portfolio tracking completed" + (f" with {len(errors)} errors" if errors else ""),
+            "status": status,
+            "message": message + (f" with {len(errors)} errors" if errors else ""),
             "positions": len(all_positions),
+            "total_worth": str(all_positions.total_worth()),
+            "currency": self._result_currency(all_positions),
+            "delta": delta.summary() if delta is not None else None,
+            "deadline": deadline.seconds if deadline is not None else None,
+            "completed": completed,
+            "interrupted": interrupted if stopped else None,
             "errors": errors if errors else None
         }
 
+    def _result_currency(self, positions: PositionBatch) -> Optional[str]:
+        """Currency of ``total_worth``, None when a failed conversion left positions in mixed currencies."""
+        currencies = set(positions.currencies)
+        if len(currencies) > 1:
+            return None
+        return currencies.pop() if currencies else self.settings.base_currency
+
     def validate_sources(self, source_names: List[str]) -> List[str]:
         """Validate a list of source names.
         
@@ -126,4 +522,21 @@ class PortfolioTracker:
                 valid_sources.append(name)
             else:
                 logger.warning(f"Invalid source name: {name}")
-        return valid_sources
\ No newline at end of file
+        return valid_sources
+
+
+async def run_trackers_async(trackers: List[PortfolioTracker], max_connections: int = 100) -> List[dict]:
+    """Run several trackers, e.g. one per account, concurrently on one event loop.
+
+    All trackers share a single HTTP connection pool.
+
+    Args:
+        trackers: Trackers to run
+        max_connections: Size of the shared connection pool
+
+    Returns:
+        List of run results in the order of ``trackers``
+    """
+    limits = httpx.Limits(max_connections=max_connections)
+    async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+        return await asyncio.gather(*(tracker.run_async(client) for tracker in trackers))
@@ -1,5 +1,5 @@
-from flask import Blueprint, render_template, current_app
-from app.portfolio_tracker import PortfolioTracker
+from flask import Blueprint, Response, render_template
+from app.sources import SOURCE_NAMES
 from app.database import get_db
 from app.models import Schedule
 
@@ -8,17 +8,23 @@ main = Blueprint('main', __name__)
 @main.route('/')
 def index():
     """Serve the main application page with available sources and schedules."""
-    # Get portfolio tracker sources
-    settings = current_app.config['SETTINGS']
-    tracker = PortfolioTracker(settings)
-    sources = tracker.get_available_sources()
-    
-    return render_template('index.html', sources=sources)
+    # Listed without building a tracker, which would start a WebDriver service
+    return render_template('index.html', sources=SOURCE_NAMES)
+
+@main.route('/metrics')
+def prometheus_metrics():
+    """Expose collected metrics in the Prometheus text format."""
+    from app.services.metrics import render_latest
+
+    payload, content_type = render_latest()
+    return Response(payload, content_type=content_type)
 
 def init_app(app):
     """Register blueprints with the Flask application."""
     from app.routes.api import bp as api_bp
+    from app.routes.analytics import bp as analytics_bp
     
     # Register blueprints
     app.register_blueprint(main)
-    app.register_blueprint(api_bp)
\ No newline at end of file
+    app.register_blueprint(api_bp)
+    app.register_blueprint(analytics_bp)
\ No newline at end of file
@@ -0,0 +1,90 @@
+from flask import Blueprint, jsonify, request, current_app
+from app.database import get_db
+from datetime import datetime
+
+bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
+
+ALLOCATION_GROUPS = ('platform', 'asset')
+
+
+def _parse_time(name):
+    """Read an ISO 8601 query parameter, raising ValueError when malformed."""
+    value = request.args.get(name)
+    return datetime.fromisoformat(value) if value else None
+
+
+def _report(metric, **options):
+    """Compute a metric over the stored snapshots for the common query parameters.
+
+    ``since`` and ``until`` bound the snapshot times and ``currency``
+    selects the snapshots to analyze, the base currency by default.
+    """
+    try:
+        since = _parse_time('since')
+        until = _parse_time('until')
+    except ValueError:
+        return jsonify({
+            'status': 'error',
+            'message': 'since and until must be ISO 8601 dates'
+        }), 400
+
+    try:
+        from app.services.analytics import compute
+
+        settings = current_app.config['SETTINGS']
+        currency = request.args.get('currency', settings.base_currency).upper()
+        result = compute(
+            get_db(), current_app.config['SQLALCHEMY_DATABASE_URI'], metric, currency,
+            since=since, until=until, **options
+        )
+        return jsonify({
+            'status': 'success',
+            'currency': currency,
+            metric: result
+        })
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+
+def _series():
+    return request.args.get('series', type=int, default=0) == 1
+
+
+@bp.route('/allocation', methods=['GET'])
+def get_allocation():
+    """Allocation of the latest snapshot, grouped by ``?by=platform`` (default) or ``?by=asset``."""
+    by = request.args.get('by', 'platform')
+    if by not in ALLOCATION_GROUPS:
+        return jsonify({
+            'status': 'error',
+            'message': f"by must be one of {', '.join(ALLOCATION_GROUPS)}"
+        }), 400
+    return _report('allocation', by=by)
+
+
+@bp.route('/returns', methods=['GET'])
+def get_returns():
+    """Time-weighted return, with the per-period series when ``?series=1``."""
+    return _report('returns', series=_series())
+
+
+@bp.route('/drawdown', methods=['GET'])
+def get_drawdown():
+    """Maximum and current drawdown, with the per-snapshot series when ``?series=1``."""
+    return _report('drawdown', series=_series())
+
+
+@bp.route('/volatility', methods=['GET'])
+def get_volatility():
+    """Per-period and annualized volatility of returns."""
+    return _report('volatility')
+
+
+@bp.route('/summary', methods=['GET'])
+def get_summary():
+    """Platform allocation, returns, drawdown and volatility in one response."""
+    return _report('summary')
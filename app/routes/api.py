@@ -1,20 +1,62 @@
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, Response, jsonify, request, current_app
 from app.database import get_db
-from app.models import Schedule
+from app.models import Run, Schedule, TableVersion
+from werkzeug.http import is_resource_modified
 from datetime import datetime
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
+# Serialized schedule list per database, reused until the schedules table version changes
+_schedules_cache = {}
+
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+def _flag(value) -> bool:
+    """Interpret a query parameter or JSON value such as 'true', '1' or true as a flag."""
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_VALUES
+    return bool(value)
+
+
 @bp.route('/schedules', methods=['GET'])
 def get_schedules():
-    """Retrieve all portfolio update schedules."""
+    """Retrieve all portfolio update schedules.
+
+    Responses carry an ETag and Last-Modified derived from the schedules
+    table version, so polling clients get a 304 until a schedule changes.
+    The ETag includes the version row's random epoch, so a recreated
+    database does not answer 304 to validators of the old one.
+    """
     try:
         db = get_db()
-        schedules = db.query(Schedule).all()
-        return jsonify({
-            'status': 'success',
-            'schedules': [schedule.to_dict() for schedule in schedules]
-        })
+        version_row = TableVersion.get(db, Schedule.__tablename__)
+        version = version_row.tag if version_row else '0'
+        last_modified = version_row.updated_at if version_row else None
+        etag = f"schedules-{version}"
+
+        if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+            response = Response(status=304)
+        else:
+            cache_key = current_app.config['SQLALCHEMY_DATABASE_URI']
+            cached = _schedules_cache.get(cache_key)
+            if cached and cached[0] == version:
+                body = cached[1]
+            else:
+                schedules = db.query(Schedule).all()
+                body = jsonify({
+                    'status': 'success',
+                    'schedules': [schedule.to_dict() for schedule in schedules]
+                }).get_data()
+                _schedules_cache[cache_key] = (version, body)
+            response = Response(body, mimetype='application/json')
+
+        response.set_etag(etag)
+        if last_modified:
+            response.last_modified = last_modified
+        # Let browsers keep the list but revalidate it on every poll
+        response.cache_control.no_cache = True
+        return response
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -131,9 +173,196 @@ def delete_schedule(schedule_id):
             'message': str(e)
         }), 500
 
+# Upper bound on operations accepted by one bulk request
+MAX_BULK_OPERATIONS = 5000
+
+@bp.route('/schedules/bulk', methods=['GET'])
+def export_schedules():
+    """Export every schedule without ids or timestamps.
+
+    Post the list back as ``{"create": schedules, "replace": true}`` to
+    ``/api/schedules/bulk`` to import it, e.g. into another instance.
+    """
+    try:
+        db = get_db()
+        schedules = db.query(Schedule).order_by(Schedule.id).all()
+        return jsonify({
+            'status': 'success',
+            'schedules': [
+                {field: getattr(schedule, field) for field in Schedule.EDITABLE_FIELDS}
+                for schedule in schedules
+            ]
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/schedules/bulk', methods=['POST'])
+def bulk_schedules():
+    """Create, update and delete many schedules in a single transaction.
+
+    The body may contain ``create`` (schedule objects), ``update`` (objects
+    with an ``id`` and the fields to change) and ``delete`` (schedule ids).
+    With ``"replace": true`` every schedule not listed in ``update`` is
+    deleted as well. All operations are validated before any is applied,
+    and either all of them are committed or none is. Scheduler jobs are
+    reconciled once afterwards.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not any(key in data for key in ('create', 'update', 'delete')):
+            return jsonify({
+                'status': 'error',
+                'message': 'No operations provided'
+            }), 400
+
+        creates = data.get('create', [])
+        updates = data.get('update', [])
+        deletes = data.get('delete', [])
+        replace = data.get('replace', False) is True
+        if not all(isinstance(items, list) for items in (creates, updates, deletes)):
+            return jsonify({
+                'status': 'error',
+                'message': 'create, update and delete must be lists'
+            }), 400
+        if len(creates) + len(updates) + len(deletes) > MAX_BULK_OPERATIONS:
+            return jsonify({
+                'status': 'error',
+                'message': f'At most {MAX_BULK_OPERATIONS} operations per request'
+            }), 400
+
+        errors = []
+
+        def error(operation, index, message):
+            errors.append({'operation': operation, 'index': index, 'message': message})
+
+        for index, item in enumerate(creates):
+            for message in Schedule.validate(item):
+                error('create', index, message)
+
+        update_ids = []
+        for index, item in enumerate(updates):
+            if not isinstance(item, dict) or not isinstance(item.get('id'), int):
+                error('update', index, 'Update must be an object with an integer id')
+            elif item['id'] in update_ids:
+                error('update', index, f"Schedule {item['id']} is updated more than once")
+            else:
+                update_ids.append(item['id'])
+
+        delete_ids = []
+        for index, schedule_id in enumerate(deletes):
+            if not isinstance(schedule_id, int):
+                error('delete', index, 'Delete entries must be schedule ids')
+            elif schedule_id in update_ids:
+                error('delete', index, f"Schedule {schedule_id} is both updated and deleted")
+            else:
+                delete_ids.append(schedule_id)
+
+        db = get_db()
+        wanted_ids = set(update_ids) | set(delete_ids)
+        existing = {}
+        if wanted_ids:
+            existing = {
+                schedule.id: schedule
+                for schedule in db.query(Schedule).filter(Schedule.id.in_(wanted_ids)).all()
+            }
+
+        for index, item in enumerate(updates):
+            if not isinstance(item, dict) or item.get('id') not in existing:
+                if isinstance(item, dict) and isinstance(item.get('id'), int):
+                    error('update', index, f"Schedule {item['id']} not found")
+                continue
+            schedule = existing[item['id']]
+            # Validate the schedule as it will be after the update
+            merged = {field: getattr(schedule, field) for field in Schedule.EDITABLE_FIELDS}
+            merged.update({field: item[field] for field in Schedule.EDITABLE_FIELDS if field in item})
+            for message in Schedule.validate(merged):
+                error('update', index, message)
+
+        for index, schedule_id in enumerate(deletes):
+            if isinstance(schedule_id, int) and schedule_id not in existing and schedule_id not in update_ids:
+                error('delete', index, f"Schedule {schedule_id} not found")
+
+        if errors:
+            return jsonify({
+                'status': 'error',
+                'message': 'Validation failed, no schedule was changed',
+                'errors': errors
+            }), 400
+
+        try:
+            now = datetime.utcnow()
+            created = [
+                Schedule(
+                    name=item['name'],
+                    schedule_type=item['schedule_type'],
+                    time=item['time'],
+                    selected_sources=item['selected_sources'],
+                    day_of_week=item.get('day_of_week'),
+                    active=item.get('active', True)
+                )
+                for item in creates
+            ]
+            db.add_all(created)
+
+            updated = []
+            for item in updates:
+                schedule = existing[item['id']]
+                for field in Schedule.EDITABLE_FIELDS:
+                    if field in item:
+                        setattr(schedule, field, item[field])
+                schedule.updated_at = now
+                updated.append(schedule)
+
+            removed = [existing[schedule_id] for schedule_id in delete_ids]
+            if replace:
+                kept = set(update_ids) | set(delete_ids)
+                query = db.query(Schedule)
+                if kept:
+                    query = query.filter(Schedule.id.notin_(kept))
+                removed.extend(query.all())
+            for schedule in removed:
+                db.delete(schedule)
+
+            db.flush()
+            # Serialize before the commit expires every instance
+            result = {
+                'status': 'success',
+                'created': [schedule.to_dict() for schedule in created],
+                'updated': [schedule.to_dict() for schedule in updated],
+                'deleted': sorted({schedule.id for schedule in removed})
+            }
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        scheduler_service = current_app.config.get('SCHEDULER_SERVICE')
+        if scheduler_service is not None:
+            scheduler_service.reconcile(db)
+
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
 @bp.route('/run', methods=['POST'])
 def run_portfolio_update():
-    """Execute an immediate portfolio update with specified sources."""
+    """Execute an immediate portfolio update with specified sources.
+
+    Pass ``?profile=1`` (or ``true``/``yes``, or ``"profile": true`` in the body) to run under
+    the profiler and store the profile with the run record. ``"deadline"``
+    overrides the configured time budget of the run in seconds, 0 for none.
+
+    With ``run_mode`` 'queue' the run is only recorded for a worker process
+    (``flask portfolio worker``) and answered with 202; poll ``/api/runs``
+    for its outcome.
+    """
     try:
         data = request.get_json()
         selected_sources = data.get('sources', [])
@@ -144,21 +373,156 @@ def run_portfolio_update():
                 'message': 'No sources selected for update'
             }), 400
 
+        profile = _flag(request.args.get('profile')) or _flag(data.get('profile'))
+
+        deadline = data.get('deadline')
+        if deadline is not None and (isinstance(deadline, bool) or not isinstance(deadline, (int, float))
+                                     or deadline < 0):
+            return jsonify({
+                'status': 'error',
+                'message': 'deadline must be a non-negative number of seconds'
+            }), 400
+
         settings = current_app.config['SETTINGS']
-        from app.portfolio_tracker import PortfolioTracker
+        if settings.run_mode == 'queue':
+            from app.services.runs import enqueue_run
+
+            run = enqueue_run(get_db(), selected_sources, profile=profile, deadline=deadline)
+            return jsonify({
+                'status': 'success',
+                'message': 'Portfolio update queued',
+                'run_id': run.id,
+                'details': run.result
+            }), 202
+
+        from app.services.runs import execute_run
         
-        tracker = PortfolioTracker(settings)
-        tracker.set_active_sources(selected_sources)
-        result = tracker.run()
+        run = execute_run(get_db(), settings, selected_sources, profile=profile, deadline=deadline)
 
         return jsonify({
             'status': 'success',
             'message': 'Portfolio update completed successfully',
-            'details': result
+            'run_id': run.id,
+            'details': run.result
+        })
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/runs', methods=['GET'])
+def get_runs():
+    """Retrieve the most recent portfolio tracking runs."""
+    try:
+        limit = request.args.get('limit', type=int, default=20)
+        db = get_db()
+        runs = db.query(Run).order_by(Run.id.desc()).limit(limit).all()
+        return jsonify({
+            'status': 'success',
+            'runs': [run.to_dict() for run in runs]
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/runs/<int:run_id>/cancel', methods=['POST'])
+def cancel_run(run_id):
+    """Stop an unfinished run at its next step boundary.
+
+    The run records the sources and sinks that completed before it stopped
+    and finishes with the status 'cancelled'.
+    """
+    try:
+        from app.services.runs import cancel_run as request_cancellation
+
+        db = get_db()
+        run = db.query(Run).get(run_id)
+
+        if not run:
+            return jsonify({
+                'status': 'error',
+                'message': 'Run not found'
+            }), 404
+
+        if not request_cancellation(db, run):
+            return jsonify({
+                'status': 'error',
+                'message': f'Run already finished with status {run.status}'
+            }), 409
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Cancellation requested',
+            'run': run.to_dict()
+        }), 202
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/runs/<int:run_id>/profile', methods=['GET'])
+def download_run_profile(run_id):
+    """Download the profile of a profiled run.
+
+    The default format is a pstats file (``?format=pstats``), usable with
+    ``python -m pstats``, snakeviz or flameprof. ``?format=text`` returns a
+    plain-text summary of the slowest functions instead.
+    """
+    try:
+        db = get_db()
+        run = db.query(Run).get(run_id)
+
+        if not run or not run.profile:
+            return jsonify({
+                'status': 'error',
+                'message': 'Profile not found'
+            }), 404
+
+        if request.args.get('format') == 'text':
+            from app.services.profiler import summarize_profile
+            return Response(summarize_profile(run.profile), mimetype='text/plain')
+
+        return Response(
+            run.profile,
+            mimetype='application/octet-stream',
+            headers={'Content-Disposition': f'attachment; filename=run-{run.id}.pstats'}
+        )
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@bp.route('/health/resources', methods=['GET'])
+def resource_health():
+    """Report memory, threads, database pools and browser processes of this process.
+
+    Returns the latest watchdog sample with trends over its history, or a
+    fresh sample when the watchdog is disabled. Pass ``?history=1`` to
+    include every kept sample.
+    """
+    try:
+        from app.services.watchdog import ResourceWatchdog
+
+        watchdog = current_app.config.get('WATCHDOG')
+        if watchdog is None:
+            # Sample on demand, but never kill anything outside the watchdog
+            watchdog = ResourceWatchdog(orphan_age=0)
+
+        return jsonify({
+            'status': 'success',
+            'resources': watchdog.report(history=request.args.get('history', type=int, default=0) == 1)
         })
 
     except Exception as e:
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
@@ -1,7 +1,19 @@
-from app.services.scheduler import SchedulerService
-from app.services.web_driver import WebDriverService
+import importlib
+
+# Imported on first access, so a web process that neither schedules nor
+# scrapes never loads APScheduler or Selenium
+_LAZY_IMPORTS = {
+    'SchedulerService': 'app.services.scheduler',
+    'WebDriverService': 'app.services.web_driver'
+}
 
 __all__ = [
     'SchedulerService',
     'WebDriverService'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,353 @@
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import Float, cast, func, select
+from app.lru import LRUCache
+from app.models.snapshot import Snapshot, SnapshotPosition
+
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+
+# Shorter histories are not annualized, extrapolating a few hours to a year overflows
+MIN_ANNUALIZE_SECONDS = 30 * 24 * 3600
+
+# Loaded histories and computed metrics, keyed by the latest snapshot id so a new snapshot invalidates them
+_histories = LRUCache(8)
+_results = LRUCache(256)
+
+
+class History:
+    """Snapshot history as dense NumPy arrays.
+
+    Attributes:
+        times: Snapshot times, ``datetime64[s]`` of shape (snapshots,)
+        keys: (platform, name) of every position column
+        worths: Worth per snapshot and position, shape (snapshots, positions),
+            0 where a position was not held
+        sources: Key of the sources each snapshot's run selected, shape (snapshots,)
+    """
+
+    __slots__ = ('times', 'keys', 'worths', 'sources')
+
+    def __init__(self, times: np.ndarray, keys: List[Tuple[str, str]], worths: np.ndarray,
+                 sources: Optional[np.ndarray] = None):
+        self.times = times
+        self.keys = keys
+        self.worths = worths
+        self.sources = np.full(len(times), None, dtype=object) if sources is None else sources
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def totals(self) -> np.ndarray:
+        return self.worths.sum(axis=1)
+
+    def elapsed_seconds(self) -> np.ndarray:
+        """Seconds between consecutive snapshots, shape (snapshots - 1,)."""
+        return np.diff(self.times).astype('timedelta64[s]').astype(np.float64)
+
+    def span_seconds(self) -> float:
+        """Seconds between the first and the last snapshot."""
+        return float(self.elapsed_seconds().sum()) if len(self) > 1 else 0.0
+
+    def periods_per_year(self) -> Optional[float]:
+        """Estimate the snapshot frequency from the median spacing between snapshots."""
+        if len(self) < 2:
+            return None
+        spacing = float(np.median(self.elapsed_seconds()))
+        return SECONDS_PER_YEAR / spacing if spacing > 0 else None
+
+
+def load_history(db_session, currency: str, since: Optional[datetime] = None,
+                 until: Optional[datetime] = None) -> History:
+    """Load stored snapshots into a History.
+
+    Snapshots sharing their rows with an identical earlier snapshot are
+    loaded once and expanded with fancy indexing.
+
+    Args:
+        db_session: SQLAlchemy session
+        currency (str): Only snapshots valued in this currency are loaded
+        since (datetime, optional): Earliest snapshot time
+        until (datetime, optional): Latest snapshot time
+
+    Returns:
+        History: Snapshots in chronological order
+    """
+    conditions = [Snapshot.currency == currency]
+    if since is not None:
+        conditions.append(Snapshot.taken_at >= since)
+    if until is not None:
+        conditions.append(Snapshot.taken_at <= until)
+    snapshots = db_session.query(
+        Snapshot.id, Snapshot.taken_at, Snapshot.positions_snapshot_id, Snapshot.sources
+    ).filter(*conditions).order_by(Snapshot.taken_at, Snapshot.id).all()
+
+    if not snapshots:
+        return History(np.array([], dtype='datetime64[s]'), [], np.zeros((0, 0)))
+
+    owners = [positions_id or snapshot_id for snapshot_id, _, positions_id, _ in snapshots]
+    owner_rows = {owner: row for row, owner in enumerate(dict.fromkeys(owners))}
+
+    # A subquery instead of a literal id list stays within SQLite's bound parameter limit
+    owner_ids = select(func.coalesce(Snapshot.positions_snapshot_id, Snapshot.id)).where(*conditions)
+    rows = db_session.query(
+        SnapshotPosition.snapshot_id,
+        SnapshotPosition.platform,
+        SnapshotPosition.name,
+        cast(SnapshotPosition.worth, Float)
+    ).filter(SnapshotPosition.snapshot_id.in_(owner_ids)).all()
+
+    key_columns: Dict[Tuple[str, str], int] = {}
+    row_index = np.empty(len(rows), dtype=np.intp)
+    column_index = np.empty(len(rows), dtype=np.intp)
+    values = np.empty(len(rows), dtype=np.float64)
+    for i, (snapshot_id, platform, name, worth) in enumerate(rows):
+        row_index[i] = owner_rows[snapshot_id]
+        column_index[i] = key_columns.setdefault((platform, name), len(key_columns))
+        values[i] = worth or 0.0
+
+    # Duplicate (platform, name) rows of one snapshot are summed
+    owner_worths = np.zeros((len(owner_rows), len(key_columns)))
+    np.add.at(owner_worths, (row_index, column_index), values)
+
+    times = np.array([taken_at for _, taken_at, _, _ in snapshots], dtype='datetime64[s]')
+    worths = owner_worths[[owner_rows[owner] for owner in owners]]
+    sources = np.array([sources for _, _, _, sources in snapshots], dtype=object)
+    return History(times, list(key_columns), worths, sources)
+
+
+def period_returns(history: History) -> np.ndarray:
+    """Return of every period between consecutive snapshots.
+
+    Positions that appear or disappear between two snapshots are treated
+    as external cash flows, so a period's return only covers positions
+    held at both ends. Quantity changes of a held position cannot be told
+    apart from price changes and count as return.
+    """
+    if len(history) < 2:
+        return np.zeros(0)
+    previous, current = history.worths[:-1], history.worths[1:]
+    held = (previous > 0) & (current > 0)
+    base = np.where(held, previous, 0.0).sum(axis=1)
+    gain = np.where(held, current - previous, 0.0).sum(axis=1)
+    return np.divide(gain, base, out=np.zeros_like(gain), where=base > 0)
+
+
+def _iso(value) -> Optional[str]:
+    return None if value is None else str(np.datetime_as_string(value, unit='s'))
+
+
+def _finite(value) -> Optional[float]:
+    """Convert to float, None for inf and NaN, which JSON cannot represent."""
+    return float(value) if np.isfinite(value) else None
+
+
+def latest_worths(history: History) -> Tuple[np.ndarray, int]:
+    """Worth of every position column in the latest snapshot holding its platform.
+
+    Runs selecting different sources store snapshots of different
+    platforms, so each platform is taken from the newest snapshot of any
+    source selection that holds it, not only from the very last snapshot.
+
+    Returns:
+        Worths of shape (positions,) and the row of the newest snapshot used
+    """
+    latest_rows: Dict[Optional[str], int] = {}
+    for row, sources in enumerate(history.sources):
+        latest_rows[sources] = row
+    rows = sorted(latest_rows.values(), reverse=True)
+
+    platforms = np.array([platform for platform, _ in history.keys], dtype=object)
+    worths = np.zeros(len(history.keys))
+    covered = np.zeros(len(history.keys), dtype=bool)
+    for row in rows:
+        held = np.isin(platforms, platforms[history.worths[row] > 0]) & ~covered
+        worths[held] = history.worths[row][held]
+        covered |= held
+    return worths, rows[0]
+
+
+def allocation(history: History, by: str = 'platform') -> dict:
+    """Split the latest holdings of every platform by platform or asset.
+
+    Args:
+        history (History): Snapshot history
+        by (str): 'platform' or 'asset'
+
+    Returns:
+        dict: Total and worth and weight per group, largest first
+    """
+    if not len(history):
+        return {'taken_at': None, 'total': 0.0, 'allocation': []}
+
+    latest, latest_row = latest_worths(history)
+    labels = [platform if by == 'platform' else name for platform, name in history.keys]
+    groups, group_index = np.unique(np.array(labels, dtype=object), return_inverse=True)
+    group_worths = np.bincount(group_index, weights=latest, minlength=len(groups))
+    total = float(latest.sum())
+
+    order = np.argsort(-group_worths)
+    return {
+        'taken_at': _iso(history.times[latest_row]),
+        'total': total,
+        'allocation': [
+            {
+                'key': str(groups[i]),
+                'worth': float(group_worths[i]),
+                'weight': float(group_worths[i] / total) if total else 0.0
+            }
+            for i in order if group_worths[i] > 0
+        ]
+    }
+
+
+def returns(history: History, series: bool = False) -> dict:
+    """Time-weighted return over the history.
+
+    Args:
+        history (History): Snapshot history
+        series (bool): Include the return and growth index of every period
+
+    Returns:
+        dict: Cumulative and annualized time-weighted return, the latter
+        None for histories shorter than ``MIN_ANNUALIZE_SECONDS``
+    """
+    period = period_returns(history)
+    index = np.concatenate(([1.0], np.cumprod(1.0 + period)))
+    result = {
+        'start': _iso(history.times[0]) if len(history) else None,
+        'end': _iso(history.times[-1]) if len(history) else None,
+        'periods': int(len(period)),
+        'time_weighted_return': _finite(index[-1] - 1.0),
+        'annualized_return': None
+    }
+    span = history.span_seconds()
+    if span >= MIN_ANNUALIZE_SECONDS and index[-1] > 0:
+        with np.errstate(over='ignore'):
+            result['annualized_return'] = _finite(index[-1] ** (SECONDS_PER_YEAR / span) - 1.0)
+    if series:
+        result['series'] = [
+            {'time': _iso(time), 'return': _finite(r), 'index': _finite(i)}
+            for time, r, i in zip(history.times[1:], period, index[1:])
+        ]
+    return result
+
+
+def drawdown(history: History, series: bool = False) -> dict:
+    """Maximum and current drawdown of the time-weighted growth index.
+
+    Args:
+        history (History): Snapshot history
+        series (bool): Include the drawdown at every snapshot
+
+    Returns:
+        dict: Maximum drawdown with its peak, trough and recovery times
+    """
+    if not len(history):
+        return {'max_drawdown': 0.0, 'current_drawdown': 0.0, 'peak': None, 'trough': None, 'recovered': None}
+
+    index = np.concatenate(([1.0], np.cumprod(1.0 + period_returns(history))))
+    running_max = np.maximum.accumulate(index)
+    drawdowns = index / running_max - 1.0
+
+    trough = int(np.argmin(drawdowns))
+    peak = int(np.argmax(index[:trough + 1]))
+    recovered = None
+    if drawdowns[trough] < 0:
+        after = np.nonzero(index[trough:] >= index[peak])[0]
+        if len(after):
+            recovered = _iso(history.times[trough + int(after[0])])
+
+    result = {
+        'max_drawdown': float(drawdowns[trough]),
+        'current_drawdown': float(drawdowns[-1]),
+        'peak': _iso(history.times[peak]),
+        'trough': _iso(history.times[trough]),
+        'recovered': recovered
+    }
+    if series:
+        result['series'] = [
+            {'time': _iso(time), 'drawdown': float(d)}
+            for time, d in zip(history.times, drawdowns)
+        ]
+    return result
+
+
+def volatility(history: History) -> dict:
+    """Standard deviation of period returns, per period and annualized.
+
+    Args:
+        history (History): Snapshot history
+
+    Returns:
+        dict: Volatility and the estimated number of periods per year, the
+        annualized volatility None for histories shorter than ``MIN_ANNUALIZE_SECONDS``
+    """
+    period = period_returns(history)
+    periods_per_year = history.periods_per_year()
+    if len(period) < 2:
+        return {'periods': int(len(period)), 'volatility': None,
+                'annualized_volatility': None, 'periods_per_year': periods_per_year}
+
+    std = np.std(period, ddof=1)
+    annualized = None
+    if periods_per_year and history.span_seconds() >= MIN_ANNUALIZE_SECONDS:
+        annualized = _finite(std * np.sqrt(periods_per_year))
+    return {
+        'periods': int(len(period)),
+        'volatility': _finite(std),
+        'annualized_volatility': annualized,
+        'periods_per_year': periods_per_year
+    }
+
+
+def summary(history: History) -> dict:
+    """All metrics of the history, without per-period series."""
+    return {
+        'snapshots': len(history),
+        'allocation': allocation(history, 'platform'),
+        'returns': returns(history),
+        'drawdown': drawdown(history),
+        'volatility': volatility(history)
+    }
+
+
+METRICS: Dict[str, Callable[..., dict]] = {
+    'allocation': allocation,
+    'returns': returns,
+    'drawdown': drawdown,
+    'volatility': volatility,
+    'summary': summary,
+}
+
+
+def compute(db_session, namespace: str, metric: str, currency: str,
+            since: Optional[datetime] = None, until: Optional[datetime] = None, **options) -> dict:
+    """Compute a metric, memoized until a new snapshot is stored.
+
+    Args:
+        db_session: SQLAlchemy session
+        namespace (str): Separates caches of different databases, e.g. the database URI
+        metric (str): Name of a function in ``METRICS``
+        currency (str): Currency of the snapshots to analyze
+        since (datetime, optional): Earliest snapshot time
+        until (datetime, optional): Latest snapshot time
+        **options: Keyword arguments of the metric function
+
+    Returns:
+        dict: Metric result
+    """
+    latest_id = db_session.query(func.max(Snapshot.id)).scalar()
+    history_key = (namespace, latest_id, currency, since, until)
+    key = (*history_key, metric, tuple(sorted(options.items())))
+
+    result = _results.get(key)
+    if result is None:
+        history = _histories.get(history_key)
+        if history is None:
+            history = load_history(db_session, currency, since, until)
+            _histories.set(history_key, history)
+        result = METRICS[metric](history, **options)
+        _results.set(key, result)
+    return result
@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Callable, Optional
+import functools
+import threading
+import time
+from app.services.profiler import profiled
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work continues past its run's deadline or after the run was cancelled.
+
+    Attributes:
+        reason: 'timeout' or 'cancelled'
+    """
+
+    def __init__(self, reason: str = 'timeout'):
+        self.reason = reason
+        super().__init__("Run cancelled" if reason == 'cancelled' else "Run deadline exceeded")
+
+
+class Deadline:
+    """Time budget of one run, shared by every source, sink and HTTP call it makes.
+
+    Work is cancelled cooperatively: long operations bound their own
+    timeouts with ``timeout`` and call ``check`` between steps, so a run
+    stops at the next step boundary once its budget is spent or ``cancel``
+    was called from another thread.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        """Initialize the deadline.
+
+        Args:
+            seconds: Time budget from now, None or 0 for no limit
+        """
+        self.seconds = seconds or None
+        self.expires_at = time.monotonic() + seconds if seconds else None
+        self.reason: Optional[str] = None
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, 0 once cancelled, None without a limit."""
+        if self._cancelled.is_set():
+            return 0.0
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0 and self.reason is None:
+            self.reason = 'timeout'
+        return remaining is not None and remaining <= 0
+
+    def cancel(self) -> None:
+        """Stop the run at its next check, e.g. on a user's request."""
+        if self.reason is None:
+            self.reason = 'cancelled'
+        self._cancelled.set()
+
+    def check(self) -> None:
+        """Raise DeadlineExceeded once the deadline passed or the run was cancelled."""
+        if self.expired:
+            raise DeadlineExceeded(self.reason)
+
+    def timeout(self, default: Optional[float]) -> Optional[float]:
+        """Bound an operation's timeout by the time left.
+
+        Args:
+            default: Timeout the operation uses without a deadline
+
+        Returns:
+            float: The smaller of ``default`` and the remaining time
+
+        Raises:
+            DeadlineExceeded: When no time is left
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return remaining if default is None else min(default, remaining)
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep, waking up early and raising DeadlineExceeded when the run is stopped meanwhile."""
+        self._cancelled.wait(self.timeout(seconds))
+        self.check()
+
+    @contextmanager
+    def activate(self):
+        """Make this the current deadline of the calling context."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+# Without an active run, work is unbounded
+_current: ContextVar[Deadline] = ContextVar('deadline', default=Deadline())
+
+
+def current_deadline() -> Deadline:
+    """Return the deadline of the run executing in the calling context."""
+    return _current.get()
+
+
+def in_context(function: Callable, *args, **kwargs) -> Callable[[], object]:
+    """Bind a call to a copy of the caller's context, so worker threads keep its deadline.
+
+    A copy is made per call, as a context cannot be entered by two threads at once.
+    Under ``profiler.profile_call`` the call is profiled on the thread that runs it.
+    """
+    return functools.partial(copy_context().run, profiled(function), *args, **kwargs)
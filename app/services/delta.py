@@ -0,0 +1,167 @@
+from decimal import Context, Decimal
+from typing import Dict, Tuple
+import hashlib
+from app.models.position import PositionBatch
+
+Key = Tuple[str, str]
+
+# Snapshot worths keep 15 significant digits and at most 18 decimal places,
+# which survive the Numeric(38, 18) columns even on SQLite, where they are
+# stored as doubles
+WORTH_CONTEXT = Context(prec=15)
+WORTH_SCALE = Decimal('1e-18')
+
+
+def quantize_worth(worth: Decimal) -> Decimal:
+    """Round a worth to the precision snapshots store and compare.
+
+    A worth read back from the database and the worth it was stored from
+    quantize to the same value, so a reloaded snapshot neither hashes nor
+    diffs differently from the batch it was recorded from.
+    """
+    rounded = WORTH_CONTEXT.plus(worth)
+    if rounded.as_tuple().exponent < -18:
+        rounded = rounded.quantize(WORTH_SCALE)
+    return rounded.normalize()
+
+
+def content_hash(batch: PositionBatch) -> str:
+    """Return a hash of a snapshot's content, independent of row order and timestamps.
+
+    Args:
+        batch: Snapshot positions
+
+    Returns:
+        str: Hex SHA-256 digest over the sorted (platform, name, quantized worth, currency) rows
+    """
+    worths = (str(quantize_worth(worth)) for worth in batch.worths)
+    digest = hashlib.sha256()
+    for row in sorted(zip(batch.platforms, batch.names, worths, batch.currencies)):
+        digest.update('\x1f'.join(row).encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+def _index(batch: PositionBatch) -> Dict[Key, int]:
+    """Build the hash side of the join, mapping (platform, name) to its first row.
+
+    Duplicate keys are merged into that row by ``_aggregate``.
+    """
+    index = {}
+    for i, key in enumerate(zip(batch.platforms, batch.names)):
+        index.setdefault(key, i)
+    return index
+
+
+def _aggregate(batch: PositionBatch) -> Dict[Key, Decimal]:
+    """Sum quantized worth per (platform, name), e.g. one token held in several DeFi protocols."""
+    totals: Dict[Key, Decimal] = {}
+    for key, worth in zip(zip(batch.platforms, batch.names), batch.worths):
+        totals[key] = totals.get(key, Decimal('0')) + quantize_worth(worth)
+    return totals
+
+
+class SnapshotDelta:
+    """Classification of a snapshot against the previous one.
+
+    Attributes:
+        added: Positions absent from the previous snapshot
+        removed: Positions of the previous snapshot that disappeared
+        changed: Positions whose worth moved beyond the threshold, with new worths
+        unchanged: Positions whose worth stayed within the threshold
+        identical: True when both snapshots have the same content hash
+    """
+
+    __slots__ = ('added', 'removed', 'changed', 'unchanged', 'identical', 'previous_worths')
+
+    def __init__(self, added: PositionBatch, removed: PositionBatch, changed: PositionBatch,
+                 unchanged: PositionBatch, identical: bool = False, previous_worths=None):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.unchanged = unchanged
+        self.identical = identical
+        # Previous worth of each row of ``changed``, in the same order
+        self.previous_worths = previous_worths or []
+
+    @property
+    def change_count(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.change_count == 0
+
+    def changed_positions(self) -> PositionBatch:
+        """Return added and changed positions plus removed ones with a zero worth.
+
+        This is what a sink needs to apply to bring a copy of the previous
+        snapshot up to date.
+        """
+        removed = self.removed.with_worths([Decimal('0')] * len(self.removed), self.removed.currencies)
+        return PositionBatch.concat([self.added, self.changed, removed])
+
+    def summary(self) -> dict:
+        return {
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "changed": len(self.changed),
+            "unchanged": len(self.unchanged),
+            "identical": self.identical
+        }
+
+
+def compute_delta(previous: PositionBatch, current: PositionBatch,
+                  threshold: float = 0.0) -> SnapshotDelta:
+    """Compare two snapshots with a single hash join on (platform, name).
+
+    Args:
+        previous: Previous snapshot, empty when there is none
+        current: Current snapshot
+        threshold: Relative worth change (0.01 for 1%) above which a
+            position counts as changed
+
+    Returns:
+        SnapshotDelta: Classified positions
+    """
+    previous_totals = _aggregate(previous)
+    current_totals = _aggregate(current)
+    current_index = _index(current)
+    limit = Decimal(str(threshold))
+
+    added, changed, unchanged = [], [], []
+    previous_worths = []
+    for key, row in current_index.items():
+        worth = current_totals[key]
+        if key not in previous_totals:
+            added.append((row, worth))
+            continue
+        old = previous_totals[key]
+        if old == 0:
+            moved = worth != 0
+        else:
+            moved = abs(worth - old) / abs(old) > limit
+        if moved:
+            changed.append((row, worth))
+            previous_worths.append(old)
+        else:
+            unchanged.append((row, worth))
+
+    previous_index = _index(previous)
+    removed = [
+        (row, previous_totals[key])
+        for key, row in previous_index.items()
+        if key not in current_totals
+    ]
+
+    def take(batch: PositionBatch, rows) -> PositionBatch:
+        subset = batch.take_rows(row for row, _ in rows)
+        return subset.with_worths([worth for _, worth in rows], subset.currencies)
+
+    return SnapshotDelta(
+        added=take(current, added),
+        removed=take(previous, removed),
+        changed=take(current, changed),
+        unchanged=take(current, unchanged),
+        previous_worths=previous_worths
+    )
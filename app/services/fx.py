@@ -0,0 +1,196 @@
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+import logging
+import sqlite3
+import threading
+import time
+import requests
+from app.models.position import PositionBatch
+from app.services.metrics import http_hooks
+from app.services.deadline import current_deadline
+
+logger = logging.getLogger(__name__)
+
+
+class RateProvider(ABC):
+    @abstractmethod
+    def get_rates(self, base: str, currencies: Iterable[str]) -> Dict[str, Decimal]:
+        """Return how many units of ``base`` one unit of each currency is worth"""
+        pass
+
+
+class FrankfurterRateProvider(RateProvider):
+    """Daily ECB reference rates from the keyless frankfurter.app API."""
+
+    def __init__(self, base_url: str = "https://api.frankfurter.app", timeout: float = 10):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def get_rates(self, base: str, currencies: Iterable[str]) -> Dict[str, Decimal]:
+        currencies = sorted(set(currencies))
+        if not currencies:
+            return {}
+        # Ask for base -> currencies in one call and invert the quotes
+        response = requests.get(
+            f"{self.base_url}/latest",
+            params={'from': base, 'to': ','.join(currencies)},
+            timeout=current_deadline().timeout(self.timeout),
+            hooks=http_hooks('fx')
+        )
+        response.raise_for_status()
+        quotes = response.json()['rates']
+        return {
+            currency: Decimal('1') / Decimal(str(quotes[currency]))
+            for currency in currencies
+            if currency in quotes
+        }
+
+
+class StaticRateProvider(RateProvider):
+    """Fixed rates, useful for offline runs and benchmarks."""
+
+    def __init__(self, rates: Dict[str, Dict[str, Decimal]]):
+        """Initialize the provider.
+
+        Args:
+            rates: Mapping of base currency to {currency: units of base per unit}
+        """
+        self.rates = rates
+
+    def get_rates(self, base: str, currencies: Iterable[str]) -> Dict[str, Decimal]:
+        known = self.rates.get(base, {})
+        return {currency: known[currency] for currency in currencies if currency in known}
+
+
+class RateCache:
+    """Two level FX rate cache: an in-process dict backed by a SQLite table.
+
+    Entries older than ``ttl`` seconds are treated as missing. The SQLite
+    level lets rates survive restarts, so a fresh process does not refetch
+    rates that are still valid.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 6 * 3600):
+        """Initialize the cache.
+
+        Args:
+            path: SQLite database file, or None to keep rates in memory only
+            ttl: Seconds a rate stays valid
+        """
+        self.path = path
+        self.ttl = ttl
+        self._memory: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+        if self.path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS fx_rates ("
+                    "base TEXT NOT NULL, currency TEXT NOT NULL, rate TEXT NOT NULL, "
+                    "fetched_at REAL NOT NULL, PRIMARY KEY (base, currency))"
+                )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get_many(self, base: str, currencies: Iterable[str]) -> Dict[str, Decimal]:
+        """Return the fresh cached rates for ``currencies``, missing ones are omitted."""
+        now = time.time()
+        found: Dict[str, Decimal] = {}
+        missing = []
+        with self._lock:
+            for currency in currencies:
+                entry = self._memory.get((base, currency))
+                if entry and now - entry[1] < self.ttl:
+                    found[currency] = entry[0]
+                else:
+                    missing.append(currency)
+
+        if missing and self.path:
+            placeholders = ','.join('?' * len(missing))
+            with self._connect() as conn:
+                rows = conn.execute(
+                    f"SELECT currency, rate, fetched_at FROM fx_rates "
+                    f"WHERE base = ? AND currency IN ({placeholders}) AND fetched_at > ?",
+                    (base, *missing, now - self.ttl)
+                ).fetchall()
+            with self._lock:
+                for currency, rate, fetched_at in rows:
+                    found[currency] = Decimal(rate)
+                    self._memory[(base, currency)] = (Decimal(rate), fetched_at)
+        return found
+
+    def set_many(self, base: str, rates: Dict[str, Decimal]) -> None:
+        """Store freshly fetched rates in both cache levels."""
+        now = time.time()
+        with self._lock:
+            for currency, rate in rates.items():
+                self._memory[(base, currency)] = (rate, now)
+        if self.path and rates:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO fx_rates (base, currency, rate, fetched_at) VALUES (?, ?, ?, ?)",
+                    [(base, currency, str(rate), now) for currency, rate in rates.items()]
+                )
+
+
+_rate_caches: Dict[Optional[str], RateCache] = {}
+_rate_caches_lock = threading.Lock()
+
+
+def shared_rate_cache(path: Optional[str], ttl: float) -> RateCache:
+    """Return the process-wide rate cache for ``path``.
+
+    Trackers are created per run, so the in-memory level only saves
+    lookups when the cache outlives them.
+    """
+    with _rate_caches_lock:
+        if path not in _rate_caches:
+            _rate_caches[path] = RateCache(path, ttl)
+        cache = _rate_caches[path]
+        cache.ttl = ttl
+        return cache
+
+
+class CurrencyConverter:
+    """Normalize every position of a batch to one base currency.
+
+    Rates are resolved once per distinct currency in the batch, from the
+    cache first and the provider for whatever is missing, and then applied
+    to the whole worth column in a single pass.
+    """
+
+    def __init__(self, base_currency: str, provider: RateProvider, cache: Optional[RateCache] = None):
+        self.base_currency = base_currency
+        self.provider = provider
+        self.cache = cache if cache is not None else RateCache()
+
+    def rates_for(self, currencies: Iterable[str]) -> Dict[str, Decimal]:
+        """Resolve rates to the base currency for ``currencies``.
+
+        Raises:
+            LookupError: If a rate is available neither in the cache nor from the provider
+        """
+        needed = {c for c in currencies if c != self.base_currency}
+        rates = self.cache.get_many(self.base_currency, needed)
+        missing = needed - rates.keys()
+        if missing:
+            fetched = self.provider.get_rates(self.base_currency, missing)
+            self.cache.set_many(self.base_currency, fetched)
+            rates.update(fetched)
+            missing -= fetched.keys()
+        if missing:
+            raise LookupError(f"No FX rate to {self.base_currency} for {', '.join(sorted(missing))}")
+        rates[self.base_currency] = Decimal('1')
+        return rates
+
+    def convert(self, batch: PositionBatch) -> PositionBatch:
+        """Return a copy of ``batch`` with every worth expressed in the base currency."""
+        if all(currency == self.base_currency for currency in batch.currencies):
+            return batch
+        rates = self.rates_for(set(batch.currencies))
+        worths = [
+            worth * rates[currency]
+            for worth, currency in zip(batch.worths, batch.currencies)
+        ]
+        return batch.with_worths(worths, self.base_currency)
@@ -0,0 +1,148 @@
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Buckets span fast API calls up to multi-minute DeBank scrapes and Notion imports
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+RUN_DURATION = Histogram(
+    'portfolio_run_duration_seconds',
+    'Duration of a full PortfolioTracker run',
+    ['status'],
+    buckets=DURATION_BUCKETS
+)
+SOURCE_FETCH_DURATION = Histogram(
+    'portfolio_source_fetch_duration_seconds',
+    'Duration of DataSource.fetch_positions',
+    ['source'],
+    buckets=DURATION_BUCKETS
+)
+SINK_SAVE_DURATION = Histogram(
+    'portfolio_sink_save_duration_seconds',
+    'Duration of DataSink.save_positions',
+    ['sink'],
+    buckets=DURATION_BUCKETS
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'portfolio_http_request_duration_seconds',
+    'Duration of outgoing HTTP requests to upstream APIs',
+    ['service', 'method', 'status'],
+    buckets=DURATION_BUCKETS
+)
+WEBDRIVER_SESSION_DURATION = Histogram(
+    'portfolio_webdriver_session_duration_seconds',
+    'Lifetime of a Selenium WebDriver session',
+    buckets=DURATION_BUCKETS
+)
+POSITIONS_FETCHED = Counter(
+    'portfolio_positions_fetched_total',
+    'Positions returned by data sources',
+    ['source']
+)
+POSITIONS_SAVED = Counter(
+    'portfolio_positions_saved_total',
+    'Positions handed to data sinks',
+    ['sink']
+)
+THROTTLED = Counter(
+    'portfolio_throttled_responses_total',
+    'Upstream responses rejecting a call as rate limited (HTTP 429)',
+    ['kind', 'name']
+)
+RETRIES = Counter(
+    'portfolio_retries_total',
+    'Upstream calls sent again after a failed attempt',
+    ['kind', 'name']
+)
+ERRORS = Counter(
+    'portfolio_errors_total',
+    'Errors raised by sources, sinks and upstream calls',
+    ['kind', 'name']
+)
+
+PROCESS_RSS = Gauge(
+    'portfolio_process_resident_memory_bytes',
+    'Resident memory of the process, sampled by the resource watchdog'
+)
+PROCESS_OPEN_FDS = Gauge(
+    'portfolio_process_open_fds',
+    'Open file descriptors of the process, sampled by the resource watchdog'
+)
+PROCESS_THREADS = Gauge(
+    'portfolio_process_threads',
+    'Threads of the process, sampled by the resource watchdog'
+)
+BROWSER_PROCESSES = Gauge(
+    'portfolio_browser_processes',
+    'Chrome and chromedriver processes started by the process or orphaned by it'
+)
+ORPHANS_KILLED = Counter(
+    'portfolio_orphaned_browsers_killed_total',
+    'Orphaned Chrome and chromedriver processes killed by the resource watchdog'
+)
+
+
+def record_error(kind: str, name: str) -> None:
+    """Count an error for a source, sink or upstream service.
+
+    Args:
+        kind (str): Component kind, e.g. 'source', 'sink', 'http' or 'webdriver'
+        name (str): Component name, e.g. 'Trading212' or 'Notion'
+    """
+    ERRORS.labels(kind=kind, name=name).inc()
+
+
+def record_throttled(kind: str, name: str) -> None:
+    """Count a call an upstream service rejected as rate limited."""
+    THROTTLED.labels(kind=kind, name=name).inc()
+
+
+def record_retry(kind: str, name: str) -> None:
+    """Count a call that is sent again after a failed attempt."""
+    RETRIES.labels(kind=kind, name=name).inc()
+
+
+def observe_http(service: str, method: str, status, seconds: float) -> None:
+    """Record one outgoing HTTP request.
+
+    Args:
+        service (str): Upstream service name, e.g. 'binance' or 'notion'
+        method (str): HTTP method
+        status: HTTP status code, or a short marker such as 'error'
+        seconds (float): Request duration
+    """
+    HTTP_REQUEST_DURATION.labels(service=service, method=method, status=str(status)).observe(seconds)
+    if status == 429:
+        record_throttled('http', service)
+    elif not isinstance(status, int) or status >= 400:
+        record_error('http', service)
+
+
+def http_hooks(service: str) -> dict:
+    """Build ``requests`` hooks that record duration and status of each response.
+
+    Args:
+        service (str): Upstream service name used as metric label
+
+    Returns:
+        dict: Value for the ``hooks`` argument of ``requests`` calls
+
+    Example:
+        requests.get(url, hooks=http_hooks('trading212'))
+    """
+    def observe(response, *args, **kwargs):
+        observe_http(service, response.request.method, response.status_code,
+                     response.elapsed.total_seconds())
+        return response
+
+    return {'response': observe}
+
+
+def render_latest():
+    """Render all metrics in the Prometheus text exposition format.
+
+    Returns:
+        tuple: Payload bytes and the matching content type
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,102 @@
+from typing import Dict, NamedTuple, Optional, Set
+import os
+
+# Process names of the browsers and drivers Selenium starts
+BROWSER_NAMES = ('chrome', 'chromium', 'chromedriver')
+
+
+class ProcessInfo(NamedTuple):
+    pid: int
+    ppid: int
+    name: str
+    uid: int
+    started_at: float
+
+
+def _read_proc(pid, name: str) -> str:
+    with open(f"/proc/{pid}/{name}") as f:
+        return f.read()
+
+
+def _boot_time() -> float:
+    for line in _read_proc('', 'stat').splitlines():
+        if line.startswith('btime '):
+            return float(line.split()[1])
+    raise OSError("btime missing from /proc/stat")
+
+
+def process_status(pid: int) -> Optional[dict]:
+    """Return RSS, thread and open file descriptor counts of a process.
+
+    Args:
+        pid: Process id
+
+    Returns:
+        dict: ``rss_mb``, ``threads`` and ``open_fds``, or None without Linux ``/proc``
+    """
+    try:
+        status = dict(
+            line.split(':', 1) for line in _read_proc(pid, 'status').splitlines() if ':' in line
+        )
+        return {
+            "rss_mb": int(status['VmRSS'].split()[0]) / 1024,
+            "threads": int(status['Threads']),
+            "open_fds": len(os.listdir(f"/proc/{pid}/fd"))
+        }
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def list_processes() -> Dict[int, ProcessInfo]:
+    """Return every running process by pid, empty without Linux ``/proc``."""
+    try:
+        boot_time = _boot_time()
+        entries = os.listdir('/proc')
+    except OSError:
+        return {}
+
+    ticks = os.sysconf('SC_CLK_TCK')
+    processes = {}
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            stat = _read_proc(entry, 'stat')
+            uid = os.stat(f"/proc/{entry}").st_uid
+        except OSError:
+            continue
+        # The command name may contain spaces, fields start after its closing parenthesis
+        name = stat[stat.index('(') + 1:stat.rindex(')')]
+        fields = stat[stat.rindex(')') + 2:].split()
+        processes[int(entry)] = ProcessInfo(
+            pid=int(entry),
+            ppid=int(fields[1]),
+            name=name,
+            uid=uid,
+            started_at=boot_time + int(fields[19]) / ticks
+        )
+    return processes
+
+
+def descendants(pid: int, processes: Optional[Dict[int, ProcessInfo]] = None) -> Set[int]:
+    """Return the pids of every descendant of ``pid``."""
+    if processes is None:
+        processes = list_processes()
+    found, frontier = set(), {pid}
+    while frontier:
+        frontier = {p.pid for p in processes.values() if p.ppid in frontier} - found
+        found |= frontier
+    return found
+
+
+def process_cmdline(pid: int) -> str:
+    """Return the command line of a process, empty when it cannot be read."""
+    try:
+        return _read_proc(pid, 'cmdline').replace('\0', ' ').strip()
+    except OSError:
+        return ''
+
+
+def is_browser(process: ProcessInfo) -> bool:
+    name = process.name.lower()
+    return any(browser in name for browser in BROWSER_NAMES)
@@ -0,0 +1,114 @@
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, Set, Tuple
+import cProfile
+import functools
+import io
+import marshal
+import pstats
+import threading
+
+
+class _ThreadProfiles:
+    """Profilers of the worker threads a profiled call hands work to.
+
+    cProfile only sees the thread that enabled it, so every function bound
+    with ``deadline.in_context`` while a profile is active runs under its
+    own profiler, and ``profile_call`` merges them into one profile.
+    """
+
+    def __init__(self):
+        self.profilers: List[cProfile.Profile] = []
+        self._profiled_threads: Set[int] = {threading.get_ident()}
+        self._lock = threading.Lock()
+
+    def run(self, function: Callable, *args, **kwargs):
+        thread = threading.get_ident()
+        with self._lock:
+            # A thread already under a profiler runs the call inline in it
+            nested = thread in self._profiled_threads
+            self._profiled_threads.add(thread)
+        if nested:
+            return function(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with self._lock:
+                self._profiled_threads.discard(thread)
+                self.profilers.append(profiler)
+
+
+# Worker thread profilers of the profile_call running in the calling context
+_thread_profiles: ContextVar[Optional[_ThreadProfiles]] = ContextVar('thread_profiles', default=None)
+
+
+def profiled(function: Callable) -> Callable:
+    """Profile ``function`` on whichever thread runs it, when called under ``profile_call``."""
+    profiles = _thread_profiles.get()
+    if profiles is None:
+        return function
+    return functools.partial(profiles.run, function)
+
+
+def profile_call(func: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bytes]:
+    """Run ``func`` under cProfile.
+
+    The profiler is only created here, so callers that do not ask for a
+    profile pay nothing. Work ``func`` hands to other threads through
+    ``deadline.in_context``, such as sink saves and Binance wallet
+    requests, is profiled on those threads and merged into the result.
+
+    Args:
+        func: Callable to profile
+        *args: Positional arguments passed to ``func``
+        **kwargs: Keyword arguments passed to ``func``
+
+    Returns:
+        tuple: The return value of ``func`` and the marshalled pstats data,
+        loadable with ``pstats.Stats`` and tools such as snakeviz or flameprof
+    """
+    profiles = _ThreadProfiles()
+    token = _thread_profiles.set(profiles)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        _thread_profiles.reset(token)
+    stats = pstats.Stats(profiler)
+    with profiles._lock:
+        threads = list(profiles.profilers)
+    for thread_profiler in threads:
+        stats.add(thread_profiler)
+    return result, marshal.dumps(stats.stats)
+
+
+def summarize_profile(data: bytes, limit: int = 25, sort: str = 'cumulative') -> str:
+    """Render the top entries of marshalled pstats data as text.
+
+    Args:
+        data: Marshalled pstats data as returned by ``profile_call``
+        limit: Number of functions to include
+        sort: pstats sort key
+
+    Returns:
+        str: Human readable profile summary
+    """
+    stream = io.StringIO()
+    stats = pstats.Stats(_MarshalledStats(data), stream=stream)
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+class _MarshalledStats:
+    """Adapter letting ``pstats.Stats`` load stats from bytes instead of a file."""
+
+    def __init__(self, data: bytes):
+        self.stats = marshal.loads(data)
+
+    def create_stats(self):
+        pass
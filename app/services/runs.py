@@ -0,0 +1,294 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import func, select, update
+from app.models.run import Run
+from app.services.deadline import Deadline
+from app.services.profiler import profile_call
+from config.settings import Settings
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Statuses of runs that have not finished yet
+PENDING_STATUSES = ('queued', 'running', 'cancelling')
+
+# Seconds between checks for a cancellation requested by another process, and between heartbeats
+CANCEL_POLL_INTERVAL = 5
+
+# Seconds without a heartbeat after which an unfinished run counts as abandoned by its process
+HEARTBEAT_TIMEOUT = 60
+
+# Deadlines of the runs executing in this process, by run id
+_active_runs: Dict[int, Deadline] = {}
+_active_lock = threading.Lock()
+
+
+def execute_run(db_session, settings: Settings, selected_sources: List[str],
+                trigger: str = 'manual', schedule_id: Optional[int] = None,
+                profile: bool = False, deadline: Optional[float] = None) -> Run:
+    """Run the portfolio tracker and record the outcome as a Run.
+
+    While the run executes it can be stopped with ``cancel_run``, from this
+    or any other process sharing the database.
+
+    Args:
+        db_session: SQLAlchemy session
+        settings (Settings): Application settings
+        selected_sources (list): Source names to activate
+        trigger (str): What started the run, 'manual' or 'schedule'
+        schedule_id (int, optional): Schedule that started the run
+        profile (bool): Run under cProfile and store the stats with the run
+        deadline (float, optional): Time budget in seconds, ``settings.run_deadline`` when omitted,
+            0 for no limit
+
+    Returns:
+        Run: The finished run record
+    """
+    run = Run(
+        trigger=trigger,
+        schedule_id=schedule_id,
+        selected_sources=list(selected_sources),
+        status='running',
+        profiled=profile,
+        heartbeat_at=datetime.utcnow()
+    )
+    db_session.add(run)
+    db_session.commit()
+
+    return _execute(db_session, settings, run, deadline)
+
+
+def enqueue_run(db_session, selected_sources: List[str], trigger: str = 'manual',
+                schedule_id: Optional[int] = None, profile: bool = False,
+                deadline: Optional[float] = None) -> Run:
+    """Record a run for a worker process to execute, see ``claim_queued_runs``.
+
+    Args:
+        db_session: SQLAlchemy session
+        selected_sources (list): Source names to activate
+        trigger (str): What started the run, 'manual' or 'schedule'
+        schedule_id (int, optional): Schedule that started the run
+        profile (bool): Run under cProfile and store the stats with the run
+        deadline (float, optional): Time budget in seconds, the worker's ``run_deadline`` when omitted
+
+    Returns:
+        Run: The queued run record
+    """
+    run = Run(
+        trigger=trigger,
+        schedule_id=schedule_id,
+        selected_sources=list(selected_sources),
+        status='queued',
+        profiled=profile,
+        # Options of the run until the worker replaces them with its result
+        result={'status': 'queued', 'deadline': deadline}
+    )
+    db_session.add(run)
+    db_session.commit()
+    return run
+
+
+def claim_queued_runs(db_session, limit: int) -> List[int]:
+    """Mark up to ``limit`` of the oldest queued runs as running.
+
+    Each run is claimed with a conditional update, so workers polling the
+    same database never execute a run twice.
+
+    Args:
+        db_session: SQLAlchemy session
+        limit (int): Maximum number of runs to claim
+
+    Returns:
+        list: Ids of the claimed runs
+    """
+    candidates = [
+        run_id for run_id, in db_session.query(Run.id)
+        .filter(Run.status == 'queued').order_by(Run.id).limit(limit)
+    ]
+    claimed = []
+    for run_id in candidates:
+        now = datetime.utcnow()
+        updated = db_session.query(Run).filter(Run.id == run_id, Run.status == 'queued').update(
+            {'status': 'running', 'started_at': now, 'heartbeat_at': now}, synchronize_session=False
+        )
+        db_session.commit()
+        if updated:
+            claimed.append(run_id)
+    return claimed
+
+
+def execute_queued_run(db_session, settings: Settings, run: Run) -> Run:
+    """Execute a run claimed with ``claim_queued_runs``.
+
+    Args:
+        db_session: SQLAlchemy session
+        settings (Settings): Application settings
+        run (Run): Claimed run
+
+    Returns:
+        Run: The finished run record
+    """
+    return _execute(db_session, settings, run, (run.result or {}).get('deadline'))
+
+
+def _execute(db_session, settings: Settings, run: Run, deadline: Optional[float]) -> Run:
+    """Run the portfolio tracker for a run record and store the outcome."""
+    from app.portfolio_tracker import PortfolioTracker
+    from app.services.snapshots import SnapshotStore
+
+    profile = bool(run.profiled)
+    run_deadline = Deadline(settings.run_deadline if deadline is None else deadline)
+    with _active_lock:
+        _active_runs[run.id] = run_deadline
+    stop_watching = threading.Event()
+    threading.Thread(
+        target=_watch_run, args=(db_session.get_bind(), run.id, run_deadline, stop_watching),
+        name=f'run-{run.id}-watch', daemon=True
+    ).start()
+
+    try:
+        tracker = PortfolioTracker(settings, snapshot_store=SnapshotStore(db_session))
+        tracker.run_id = run.id
+        tracker.set_active_sources(run.selected_sources)
+        if profile:
+            result, run.profile = profile_call(tracker.run, run_deadline)
+        else:
+            result = tracker.run(run_deadline)
+        run.status = result.get('status', 'success')
+        run.result = result
+    except Exception as e:
+        logger.error(f"Run {run.id} failed: {str(e)}")
+        run.status = 'error'
+        run.result = {'status': 'error', 'message': str(e)}
+        raise
+    finally:
+        stop_watching.set()
+        with _active_lock:
+            _active_runs.pop(run.id, None)
+        run.finished_at = datetime.utcnow()
+        db_session.commit()
+
+    return run
+
+
+def cancel_run(db_session, run: Run) -> bool:
+    """Request cancellation of an unfinished run.
+
+    A queued run is cancelled before any worker starts it. A run executing
+    in this process is stopped directly, and one whose process stopped
+    sending heartbeats is marked 'cancelled' right away. Otherwise the run
+    is marked 'cancelling', which the process executing it notices within
+    ``CANCEL_POLL_INTERVAL`` seconds.
+
+    Args:
+        db_session: SQLAlchemy session
+        run (Run): Run to cancel
+
+    Returns:
+        bool: False when the run had already finished
+    """
+    if run.status not in PENDING_STATUSES:
+        return False
+
+    # Conditional updates, as a worker may claim or finish the run meanwhile
+    if db_session.query(Run).filter(Run.id == run.id, Run.status == 'queued').update({
+        'status': 'cancelled',
+        'result': {'status': 'cancelled', 'message': 'Run cancelled before it started'},
+        'finished_at': datetime.utcnow()
+    }, synchronize_session=False):
+        db_session.commit()
+        db_session.refresh(run)
+        logger.info(f"Queued run {run.id} cancelled")
+        return True
+
+    with _active_lock:
+        deadline = _active_runs.get(run.id)
+    if deadline is not None:
+        deadline.cancel()
+    elif db_session.query(Run).filter(
+            Run.id == run.id, Run.status.in_(PENDING_STATUSES), _abandoned(datetime.utcnow())
+    ).update({
+        'status': 'cancelled',
+        'result': {'status': 'cancelled', 'message': 'Run cancelled, the process executing it stopped'},
+        'finished_at': datetime.utcnow()
+    }, synchronize_session=False):
+        db_session.commit()
+        db_session.refresh(run)
+        logger.info(f"Abandoned run {run.id} cancelled")
+        return True
+
+    updated = db_session.query(Run).filter(Run.id == run.id, Run.status.in_(PENDING_STATUSES)).update(
+        {'status': 'cancelling'}, synchronize_session=False
+    )
+    db_session.commit()
+    db_session.refresh(run)
+    if updated:
+        logger.info(f"Cancellation of run {run.id} requested")
+    return bool(updated)
+
+
+def cancel_active_runs() -> int:
+    """Cancel every run executing in this process, e.g. before it shuts down.
+
+    Returns:
+        int: Number of runs cancelled
+    """
+    with _active_lock:
+        deadlines = list(_active_runs.values())
+    for deadline in deadlines:
+        deadline.cancel()
+    return len(deadlines)
+
+
+def _abandoned(now: datetime):
+    """Condition matching runs without a heartbeat for ``HEARTBEAT_TIMEOUT`` seconds."""
+    # Runs started before heartbeats were recorded only have their start time
+    return func.coalesce(Run.heartbeat_at, Run.started_at) < now - timedelta(seconds=HEARTBEAT_TIMEOUT)
+
+
+def expire_abandoned_runs(db_session) -> int:
+    """Finish the runs whose process stopped without recording their outcome.
+
+    A run counts as abandoned once no process refreshed its heartbeat for
+    ``HEARTBEAT_TIMEOUT`` seconds. Running ones become 'error' and those
+    waiting for a cancellation 'cancelled', so they no longer look
+    unfinished forever.
+
+    Args:
+        db_session: SQLAlchemy session
+
+    Returns:
+        int: Number of runs finished
+    """
+    now = datetime.utcnow()
+    abandoned = _abandoned(now)
+    expired = 0
+    for status, result in (
+        ('running', {'status': 'error', 'message': 'Run abandoned, the process executing it stopped'}),
+        ('cancelling', {'status': 'cancelled', 'message': 'Run cancelled, the process executing it stopped'})
+    ):
+        expired += db_session.query(Run).filter(Run.status == status, abandoned).update(
+            {'status': result['status'], 'result': result, 'finished_at': now}, synchronize_session=False
+        )
+    db_session.commit()
+    if expired:
+        logger.warning(f"Finished {expired} abandoned runs")
+    return expired
+
+
+def _watch_run(engine, run_id: int, deadline: Deadline, stop: threading.Event) -> None:
+    """Refresh the run's heartbeat and cancel ``deadline`` once the run is marked 'cancelling'."""
+    heartbeat = update(Run).where(Run.id == run_id)
+    query = select(Run.status).where(Run.id == run_id)
+    while not stop.wait(CANCEL_POLL_INTERVAL):
+        try:
+            with engine.begin() as connection:
+                connection.execute(heartbeat.values(heartbeat_at=datetime.utcnow()))
+                status = connection.execute(query).scalar()
+        except Exception as e:
+            logger.error(f"Error checking run {run_id} for cancellation: {str(e)}")
+            continue
+        # Heartbeats continue until the cancelled run has recorded its outcome
+        if status == 'cancelling':
+            deadline.cancel()
@@ -5,8 +5,16 @@ from app.database import get_db
 from app.models import Schedule
 
 class SchedulerService:
-    def __init__(self, scheduler=None):
-        """Initialize the scheduler service."""
+    JOB_PREFIX = 'portfolio_update_'
+
+    def __init__(self, scheduler=None, app=None):
+        """Initialize the scheduler service.
+
+        Args:
+            scheduler: APScheduler scheduler, a started BackgroundScheduler when omitted
+            app: Flask application whose context jobs run in, ``current_app`` when omitted
+        """
+        self.app = app
         self.scheduler = scheduler if scheduler else BackgroundScheduler()
         if not scheduler:
             self.scheduler.start()
@@ -24,9 +32,31 @@ class SchedulerService:
         for schedule in active_schedules:
             self._add_job(schedule)
 
+    def reconcile(self, db):
+        """Bring scheduler jobs in line with the schedules table in one pass.
+
+        Jobs are (re)added for every active schedule and removed for
+        schedules that were deleted or deactivated.
+
+        Args:
+            db: SQLAlchemy session
+        """
+        active_schedules = db.query(Schedule).filter_by(active=True).all()
+        wanted = set()
+        for schedule in active_schedules:
+            self._add_job(schedule)
+            wanted.add(self._job_id(schedule.id))
+
+        for job in self.scheduler.get_jobs():
+            if job.id.startswith(self.JOB_PREFIX) and job.id not in wanted:
+                self.scheduler.remove_job(job.id)
+
+    def _job_id(self, schedule_id):
+        return f"{self.JOB_PREFIX}{schedule_id}"
+
     def _add_job(self, schedule):
         """Add a job to the scheduler based on schedule configuration."""
-        job_id = f"portfolio_update_{schedule.id}"
+        job_id = self._job_id(schedule.id)
         
         if schedule.schedule_type == 'daily':
             hour, minute = map(int, schedule.time.split(':'))
@@ -53,7 +83,9 @@ class SchedulerService:
 
     def _run_portfolio_update(self, schedule_id):
         """Execute a portfolio update for a specific schedule."""
-        with current_app.app_context():
+        # Jobs run on scheduler threads, outside the context the service was created in
+        app = self.app if self.app is not None else current_app
+        with app.app_context():
             db = get_db()
             schedule = db.query(Schedule).get(schedule_id)
             
@@ -61,12 +93,13 @@ class SchedulerService:
                 return
                 
             try:
-                settings = current_app.config['SETTINGS']
-                from app.portfolio_tracker import PortfolioTracker
+                settings = app.config['SETTINGS']
+                from app.services.runs import execute_run
                 
-                tracker = PortfolioTracker(settings)
-                tracker.set_active_sources(schedule.selected_sources)
-                tracker.run()
+                execute_run(
+                    db, settings, schedule.selected_sources,
+                    trigger='schedule', schedule_id=schedule.id
+                )
                 
                 schedule.last_run = db.func.now()
                 db.commit()
@@ -0,0 +1,165 @@
+from typing import Callable, Dict, Optional, Tuple
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from app.models.position import PositionBatch
+
+logger = logging.getLogger(__name__)
+
+
+def _dump(batch: PositionBatch) -> str:
+    return json.dumps(batch.to_dict())
+
+
+def _load(payload: str) -> PositionBatch:
+    data = json.loads(payload)
+    return PositionBatch(
+        data['names'],
+        [Decimal(worth) for worth in data['worths']],
+        data['platforms'],
+        [datetime.fromisoformat(ts) for ts in data['timestamps']],
+        data['currencies'],
+        [Decimal(worth) for worth in data['original_worths']],
+        data['original_currencies']
+    )
+
+
+class ScrapeCache:
+    """Stale-while-revalidate cache of scraped positions, keyed by profile URL.
+
+    Entries younger than ``ttl`` are served as they are. Older entries are
+    still served, while a single background thread scrapes the profile
+    again and replaces the entry. Entries older than ``max_stale`` are
+    treated as missing and scraped inline. Like RateCache, entries live in
+    memory and in a SQLite table, so restarts do not start cold.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 15 * 60,
+                 max_stale: float = 24 * 3600):
+        """Initialize the cache.
+
+        Args:
+            path: SQLite database file, or None to keep entries in memory only
+            ttl: Seconds an entry is served without a refresh
+            max_stale: Seconds an entry may be served at all
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._memory: Dict[str, Tuple[PositionBatch, float]] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        if self.path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS scrape_cache ("
+                    "key TEXT PRIMARY KEY, payload TEXT NOT NULL, fetched_at REAL NOT NULL)"
+                )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, key: str) -> Optional[Tuple[PositionBatch, float]]:
+        """Return the cached positions and their age in seconds, or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None and self.path:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT payload, fetched_at FROM scrape_cache WHERE key = ?", (key,)
+                ).fetchone()
+            if row:
+                entry = (_load(row[0]), row[1])
+                with self._lock:
+                    self._memory.setdefault(key, entry)
+        if entry is None:
+            return None
+        return entry[0], time.time() - entry[1]
+
+    def set(self, key: str, batch: PositionBatch) -> None:
+        """Store freshly scraped positions in both cache levels."""
+        now = time.time()
+        with self._lock:
+            self._memory[key] = (batch, now)
+        if self.path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO scrape_cache (key, payload, fetched_at) VALUES (?, ?, ?)",
+                    (key, _dump(batch), now)
+                )
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], PositionBatch]) -> PositionBatch:
+        """Return positions for ``key``, scraping them only when needed.
+
+        Args:
+            key: Cache key, the profile URL
+            fetch: Scrapes the positions, raising on failure so errors are never cached
+
+        Returns:
+            PositionBatch: Fresh or stale cached positions, or the result of ``fetch``
+        """
+        cached = self.get(key)
+        if cached is not None:
+            batch, age = cached
+            if age < self.ttl:
+                return batch
+            if age < self.max_stale:
+                self._revalidate(key, fetch)
+                return batch
+
+        # Concurrent misses for one key wait for a single scrape
+        with self._key_lock(key):
+            cached = self.get(key)
+            if cached is not None and cached[1] < self.ttl:
+                return cached[0]
+            batch = PositionBatch.from_positions(fetch())
+            self.set(key, batch)
+            return batch
+
+    def _revalidate(self, key: str, fetch: Callable[[], PositionBatch]) -> None:
+        """Refresh ``key`` on a background thread unless a refresh is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                with self._key_lock(key):
+                    self.set(key, PositionBatch.from_positions(fetch()))
+                logger.info(f"Refreshed cached scrape of {key}")
+            except Exception as e:
+                logger.error(f"Error refreshing cached scrape of {key}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name='scrape-refresh', daemon=True).start()
+
+
+_caches: Dict[Optional[str], ScrapeCache] = {}
+_caches_lock = threading.Lock()
+
+
+def shared_cache(path: Optional[str], ttl: float, max_stale: float) -> ScrapeCache:
+    """Return the process-wide cache for ``path``.
+
+    Trackers are created per run, so the cache and its in-flight refreshes
+    must outlive them for a stale entry to be refreshed only once.
+    """
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = ScrapeCache(path, ttl, max_stale)
+        cache = _caches[path]
+        cache.ttl = ttl
+        cache.max_stale = max_stale
+        return cache
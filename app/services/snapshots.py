@@ -0,0 +1,108 @@
+from typing import Iterable, Optional
+from app.models.position import PositionBatch
+from app.models.snapshot import Snapshot, SnapshotPosition
+from app.services.delta import quantize_worth
+
+def sources_key(source_names: Iterable[str]) -> str:
+    """Key of the snapshots of runs selecting ``source_names``, independent of their order."""
+    return ','.join(sorted(source_names))
+
+
+class SnapshotStore:
+    """Persist portfolio snapshots and load the previous one for delta computation."""
+
+    def __init__(self, db_session):
+        """Initialize the store.
+
+        Args:
+            db_session: SQLAlchemy session
+        """
+        self.db_session = db_session
+
+    def latest(self, sources: str) -> Optional[Snapshot]:
+        """Return the most recent snapshot header of a set of sources, without loading its positions.
+
+        Args:
+            sources (str): Key of the selected sources, see ``sources_key``
+        """
+        return self.db_session.query(Snapshot).filter(
+            Snapshot.sources == sources
+        ).order_by(Snapshot.id.desc()).first()
+
+    def load_positions(self, snapshot: Snapshot) -> PositionBatch:
+        """Load the positions of a snapshot as a batch.
+
+        Args:
+            snapshot (Snapshot): Snapshot whose (possibly shared) rows to load
+
+        Returns:
+            PositionBatch: Snapshot positions stamped with the snapshot time, worths quantized
+        """
+        rows = self.db_session.query(
+            SnapshotPosition.platform,
+            SnapshotPosition.name,
+            SnapshotPosition.worth,
+            SnapshotPosition.currency,
+            SnapshotPosition.original_worth,
+            SnapshotPosition.original_currency
+        ).filter(
+            SnapshotPosition.snapshot_id == (snapshot.positions_snapshot_id or snapshot.id)
+        ).all()
+
+        if not rows:
+            return PositionBatch()
+        platforms, names, worths, currencies, original_worths, original_currencies = zip(*rows)
+        # Undo the drift of databases storing Numeric columns as doubles
+        return PositionBatch(names, [quantize_worth(worth) for worth in worths], platforms,
+                             snapshot.taken_at, currencies, original_worths, original_currencies)
+
+    def record(self, batch: PositionBatch, content_hash: str, currency: str,
+               previous: Optional[Snapshot] = None, run_id: Optional[int] = None,
+               sources: Optional[str] = None) -> Snapshot:
+        """Store a snapshot, sharing rows with ``previous`` when the content is identical.
+
+        Worths are stored quantized, see ``quantize_worth``.
+
+        Args:
+            batch (PositionBatch): Snapshot positions
+            content_hash (str): Content hash of ``batch``
+            currency (str): Currency of the worth column
+            previous (Snapshot, optional): Previous snapshot
+            run_id (int, optional): Run that produced the snapshot
+            sources (str, optional): Key of the sources the run selected
+
+        Returns:
+            Snapshot: Stored snapshot header
+        """
+        snapshot = Snapshot(
+            run_id=run_id,
+            sources=sources,
+            content_hash=content_hash,
+            position_count=len(batch),
+            total_worth=batch.total_worth(),
+            currency=currency
+        )
+        identical = previous is not None and previous.content_hash == content_hash
+        if identical:
+            snapshot.positions_snapshot_id = previous.positions_snapshot_id or previous.id
+        self.db_session.add(snapshot)
+        self.db_session.flush()
+
+        if not identical:
+            self.db_session.bulk_insert_mappings(SnapshotPosition, [
+                {
+                    'snapshot_id': snapshot.id,
+                    'platform': platform,
+                    'name': name,
+                    'worth': quantize_worth(worth),
+                    'currency': row_currency,
+                    'original_worth': original_worth,
+                    'original_currency': original_currency
+                }
+                for platform, name, worth, row_currency, original_worth, original_currency in zip(
+                    batch.platforms, batch.names, batch.worths, batch.currencies,
+                    batch.original_worths, batch.original_currencies
+                )
+            ])
+        self.db_session.commit()
+        return snapshot
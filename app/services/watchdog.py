@@ -0,0 +1,210 @@
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from app.database import pool_stats
+from app.services import metrics
+from app.services.processes import (
+    descendants, is_browser, list_processes, process_cmdline, process_status
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceWatchdog:
+    """Background sampler of the process' resources for unattended hosts.
+
+    Every ``interval`` seconds it records RSS, open file descriptors,
+    threads, database pool usage, browser processes and, when enabled,
+    the top tracemalloc allocation sites. Browser processes older than
+    ``orphan_age`` that belong to no open WebDriver session are killed:
+    those left behind by this process, and those of the same user that
+    were reparented to init after their driver died.
+    """
+
+    def __init__(self, interval: float = 60, orphan_age: float = 600,
+                 trace_allocations: bool = False, history: int = 60, top_allocations: int = 10):
+        """Initialize the watchdog.
+
+        Args:
+            interval: Seconds between samples
+            orphan_age: Seconds after which a browser outside any open session is killed,
+                0 disables killing
+            trace_allocations: Start tracemalloc and report the top allocation sites
+            history: Number of samples kept for trends
+            top_allocations: Allocation sites reported per sample
+        """
+        self.interval = interval
+        self.orphan_age = orphan_age
+        self.trace_allocations = trace_allocations
+        self.top_allocations = top_allocations
+        self.samples = deque(maxlen=history)
+        self.killed_total = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self) -> 'ResourceWatchdog':
+        if self._thread is None:
+            if self.trace_allocations and not tracemalloc.is_tracing():
+                tracemalloc.start(5)
+            self._thread = threading.Thread(target=self._loop, name='resource-watchdog', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Error sampling resources: {str(e)}")
+                metrics.record_error('watchdog', 'sample')
+            if self._stop.wait(self.interval):
+                return
+
+    def sample(self) -> dict:
+        """Take one sample, kill orphaned browsers and record the result."""
+        pid = os.getpid()
+        processes = list_processes()
+        browsers = self._browsers(pid, processes)
+        killed = self._kill_orphans(browsers, processes) if self.orphan_age else []
+
+        sample = {
+            "time": datetime.utcnow().isoformat(),
+            "process": process_status(pid),
+            "threads": sorted(thread.name for thread in threading.enumerate()),
+            "db_pools": pool_stats(),
+            "browser_processes": len(browsers) - len(killed),
+            "killed_browsers": killed,
+            "allocations": self._top_allocations()
+        }
+
+        if sample["process"]:
+            metrics.PROCESS_RSS.set(sample["process"]["rss_mb"] * 1024 * 1024)
+            metrics.PROCESS_OPEN_FDS.set(sample["process"]["open_fds"])
+        metrics.PROCESS_THREADS.set(len(sample["threads"]))
+        metrics.BROWSER_PROCESSES.set(sample["browser_processes"])
+
+        with self._lock:
+            self.killed_total += len(killed)
+            self.samples.append(sample)
+        return sample
+
+    def _browsers(self, pid: int, processes) -> list:
+        """Return browser processes started by this process or orphaned by a dead driver."""
+        ours = descendants(pid, processes)
+        uid = os.getuid()
+        for process in list(processes.values()):
+            if (process.ppid == 1 and process.uid == uid and is_browser(process)
+                    and self._automated(process)):
+                ours |= {process.pid} | descendants(process.pid, processes)
+        return [processes[p] for p in ours if p in processes and is_browser(processes[p])]
+
+    @staticmethod
+    def _automated(process) -> bool:
+        """Tell Selenium-driven browsers apart from a user's own browser."""
+        if 'chromedriver' in process.name.lower():
+            return True
+        return '--enable-automation' in process_cmdline(process.pid)
+
+    def _kill_orphans(self, browsers: list, processes) -> List[dict]:
+        in_use = set()
+        for driver_pid in self._driver_pids():
+            in_use.add(driver_pid)
+            in_use |= descendants(driver_pid, processes)
+
+        now = time.time()
+        killed = []
+        for process in browsers:
+            age = now - process.started_at
+            if process.pid in in_use or age < self.orphan_age:
+                continue
+            try:
+                os.kill(process.pid, signal.SIGKILL)
+            except OSError as e:
+                logger.error(f"Error killing orphaned {process.name} ({process.pid}): {str(e)}")
+                continue
+            logger.warning(f"Killed orphaned {process.name} ({process.pid}) after {age:.0f}s")
+            metrics.ORPHANS_KILLED.inc()
+            killed.append({"pid": process.pid, "name": process.name, "age_seconds": round(age)})
+        return killed
+
+    @staticmethod
+    def _driver_pids() -> set:
+        """Return the chromedriver pids of open sessions, none when Selenium was never loaded."""
+        web_driver = sys.modules.get('app.services.web_driver')
+        return web_driver.active_driver_pids() if web_driver is not None else set()
+
+    def _top_allocations(self) -> Optional[List[dict]]:
+        if not tracemalloc.is_tracing():
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        return [
+            {"location": str(stat.traceback[0]), "size_kb": stat.size / 1024, "count": stat.count}
+            for stat in snapshot.statistics('lineno')[:self.top_allocations]
+        ]
+
+    def report(self, history: bool = False) -> dict:
+        """Return the latest sample with trends over the kept history.
+
+        Args:
+            history: Include every kept sample
+
+        Returns:
+            dict: ``latest`` sample, ``trend`` since the oldest kept sample and
+            ``killed_total`` orphaned browsers
+        """
+        with self._lock:
+            samples = list(self.samples)
+            killed_total = self.killed_total
+        if not samples:
+            samples = [self.sample()]
+            killed_total = self.killed_total
+
+        first, latest = samples[0], samples[-1]
+        trend = {"samples": len(samples), "since": first["time"]}
+        if first["process"] and latest["process"]:
+            for key in ("rss_mb", "open_fds", "threads"):
+                trend[key] = latest["process"][key] - first["process"][key]
+
+        report = {
+            "latest": latest,
+            "trend": trend,
+            "killed_total": killed_total,
+            "interval": self.interval,
+            "orphan_age": self.orphan_age
+        }
+        if history:
+            report["history"] = samples
+        return report
+
+
+def init_app(app):
+    """Start the watchdog configured by the app's settings and keep it in ``app.config['WATCHDOG']``.
+
+    A ``watchdog_interval`` of 0 leaves the watchdog off.
+    """
+    settings = app.config['SETTINGS']
+    if settings.watchdog_interval <= 0:
+        app.config['WATCHDOG'] = None
+        return
+    app.config['WATCHDOG'] = ResourceWatchdog(
+        interval=settings.watchdog_interval,
+        orphan_age=settings.watchdog_orphan_age,
+        trace_allocations=settings.watchdog_tracemalloc
+    ).start()
@@ -3,17 +3,41 @@ from selenium.webdriver.chrome.options import Options
 from selenium import webdriver
 from webdriver_manager.chrome import ChromeDriverManager
 from contextlib import contextmanager
+from typing import Optional
+from app.services import metrics
+from app.services.deadline import current_deadline
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Seconds a page load and an element lookup may take, further bounded by the run's deadline
+PAGE_LOAD_TIMEOUT = 60
+IMPLICIT_WAIT = 10
+
+# chromedriver pids of sessions currently in use, so the watchdog never kills them
+_active_driver_pids = set()
+_active_lock = threading.Lock()
+
+
+def active_driver_pids() -> set:
+    """Return the chromedriver pids of WebDriver sessions that are still open."""
+    with _active_lock:
+        return set(_active_driver_pids)
+
+
 class WebDriverService:
     """Service for managing Selenium WebDriver instances."""
     
-    def __init__(self):
-        """Initialize WebDriver service with default configurations."""
+    def __init__(self, driver_path: Optional[str] = None):
+        """Initialize WebDriver service with default configurations.
+
+        Args:
+            driver_path: Local chromedriver binary; downloaded by ChromeDriverManager when omitted
+        """
         self.chrome_options = self._configure_chrome_options()
-        self.service = Service(ChromeDriverManager().install())
+        self.service = Service(driver_path or ChromeDriverManager().install())
 
     def _configure_chrome_options(self):
         """Configure Chrome WebDriver options for headless operation.
@@ -43,16 +67,26 @@ class WebDriverService:
                 driver.get("https://example.com")
         """
         driver = None
+        driver_pid = None
+        started = time.perf_counter()
         try:
             driver = webdriver.Chrome(
                 service=self.service,
                 options=self.chrome_options
             )
-            driver.implicitly_wait(10)
+            driver_pid = getattr(getattr(driver.service, 'process', None), 'pid', None)
+            if driver_pid:
+                with _active_lock:
+                    _active_driver_pids.add(driver_pid)
+            # Never let a page load or element lookup outlive the run's deadline
+            deadline = current_deadline()
+            driver.set_page_load_timeout(deadline.timeout(PAGE_LOAD_TIMEOUT))
+            driver.implicitly_wait(deadline.timeout(IMPLICIT_WAIT))
             logger.info("WebDriver instance created successfully")
             yield driver
         except Exception as e:
             logger.error(f"Error creating WebDriver instance: {str(e)}")
+            metrics.record_error('webdriver', 'chrome')
             raise
         finally:
             if driver:
@@ -61,6 +95,10 @@ class WebDriverService:
                     logger.info("WebDriver instance closed successfully")
                 except Exception as e:
                     logger.error(f"Error closing WebDriver instance: {str(e)}")
+                    metrics.record_error('webdriver', 'chrome')
+                metrics.WEBDRIVER_SESSION_DURATION.observe(time.perf_counter() - started)
+            with _active_lock:
+                _active_driver_pids.discard(driver_pid)
 
     def update_user_agent(self, user_agent):
         """Update the user agent string for the Chrome options.
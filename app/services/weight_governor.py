@@ -0,0 +1,119 @@
+from typing import Dict, Optional, Tuple
+import asyncio
+import threading
+import time
+from app.services.deadline import current_deadline
+
+
+class WeightGovernor:
+    """Keep requests to a weight-limited API within its per-window budget.
+
+    Exchanges such as Binance charge every request a weight and ban the
+    calling IP once the weight used in the current window exceeds a limit.
+    Callers ``acquire`` the weight of a request before sending it and
+    report the used weight the server returns afterwards with ``update``,
+    so the local estimate follows the server's count even when other
+    processes share the IP. Requests that do not fit the remaining budget
+    wait for the next window instead of being sent.
+    """
+
+    def __init__(self, limit: int, window: float = 60, headroom: float = 0.9):
+        """Initialize the governor.
+
+        Args:
+            limit: Weight the server allows per window
+            window: Window length in seconds, aligned to the wall clock like the server's
+            headroom: Fraction of ``limit`` the governor lets callers use
+        """
+        self.limit = limit
+        self.window = window
+        self.budget = int(limit * headroom)
+        self.used = 0
+        self._window_start = self._current_window()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _current_window(self) -> float:
+        now = time.time()
+        return now - now % self.window
+
+    def _reserve(self, weight: int) -> float:
+        """Reserve ``weight`` if it fits, otherwise return the seconds to wait first."""
+        with self._lock:
+            now = time.time()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            window_start = self._current_window()
+            if window_start != self._window_start:
+                self._window_start = window_start
+                self.used = 0
+
+            # A request heavier than the whole budget still goes out in a fresh window
+            if self.used + weight > self.budget and self.used > 0:
+                return self._window_start + self.window - now
+            self.used += weight
+            return 0.0
+
+    def acquire(self, weight: int) -> None:
+        """Block until ``weight`` fits into the current window's budget.
+
+        Raises:
+            DeadlineExceeded: When the run's deadline passes while waiting
+        """
+        while True:
+            delay = self._reserve(weight)
+            if not delay:
+                return
+            current_deadline().sleep(delay)
+
+    async def acquire_async(self, weight: int) -> None:
+        """Wait without blocking the event loop until ``weight`` fits into the budget."""
+        while True:
+            delay = self._reserve(weight)
+            if not delay:
+                return
+            await asyncio.sleep(current_deadline().timeout(delay))
+            current_deadline().check()
+
+    def update(self, used: Optional[str]) -> None:
+        """Adopt the used weight reported by the server, e.g. ``X-MBX-USED-WEIGHT-1M``.
+
+        Args:
+            used: Header value, ignored when missing or malformed
+        """
+        try:
+            used = int(used)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            if self._current_window() == self._window_start:
+                self.used = max(self.used, used)
+
+    def back_off(self, seconds: float) -> None:
+        """Hold back every request for ``seconds``, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.time() + seconds)
+
+
+_governors: Dict[Tuple[str, str], WeightGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def governor_for(host: str, pool: str, limit: int, window: float = 60) -> WeightGovernor:
+    """Return the process-wide governor for one weight pool of a host.
+
+    Limits apply per IP, so every source instance talking to the same
+    host must share one governor.
+
+    Args:
+        host: API base URL
+        pool: Name of the weight pool, e.g. 'api' or 'sapi'
+        limit: Weight allowed per window, used when the governor is created
+        window: Window length in seconds, used when the governor is created
+    """
+    with _governors_lock:
+        key = (host, pool)
+        if key not in _governors:
+            _governors[key] = WeightGovernor(limit, window)
+        return _governors[key]
@@ -1,5 +1,14 @@
 from app.sinks.notion import NotionSink
+from app.sinks.fanout import FanOutSink, FanOutError
+from app.sinks.files import JsonlSink, CsvSink, ParquetSink
+from app.sinks.delta_only import DeltaOnlySink
 
 __all__ = [
-    'NotionSink'
-]
\ No newline at end of file
+    'NotionSink',
+    'FanOutSink',
+    'FanOutError',
+    'JsonlSink',
+    'CsvSink',
+    'ParquetSink',
+    'DeltaOnlySink'
+]
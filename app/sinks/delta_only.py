@@ -0,0 +1,20 @@
+from typing import List
+from app.models.position import Position
+from app.interfaces.data_sink import DataSink
+from app.interfaces.delta_sink import DeltaSink
+
+class DeltaOnlySink(DeltaSink):
+    """Subscribe any sink to deltas: it only receives added, changed and removed positions.
+
+    Removed positions are written with a zero worth so the sink's copy of
+    the portfolio can be brought up to date.
+    """
+
+    def __init__(self, sink: DataSink):
+        self.sink = sink
+
+    def save_positions(self, positions: List[Position]) -> None:
+        self.sink.save_positions(positions)
+
+    def save_delta(self, delta) -> None:
+        self.sink.save_positions(delta.changed_positions())
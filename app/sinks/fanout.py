@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from app.models.position import Position, PositionBatch
+from app.interfaces.data_sink import DataSink
+from app.interfaces.delta_sink import DeltaSink
+from app.services import metrics
+from app.services.deadline import current_deadline, in_context
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FanOutError(Exception):
+    """Raised when one or more sinks of a FanOutSink failed.
+
+    Attributes:
+        errors: Mapping of sink name to the exception it raised
+    """
+
+    def __init__(self, errors: Dict[str, Exception]):
+        self.errors = errors
+        super().__init__(", ".join(f"{name}: {error}" for name, error in errors.items()))
+
+
+class FanOutSink(DataSink):
+    """Sink writing every batch to several sinks concurrently.
+
+    Each sink runs on its own worker thread, so a slow sink never delays
+    the others, and a failing sink does not stop the remaining ones from
+    saving. Failures are collected and raised together as a FanOutError
+    once every sink has finished.
+
+    Sinks run under the caller's run deadline and are not started once it
+    has passed.
+
+    When a snapshot delta is given, DeltaSink subscribers receive the delta
+    instead of the full batch, and are skipped when nothing changed.
+    """
+
+    def __init__(self, sinks: Dict[str, DataSink]):
+        """Initialize the fan-out sink.
+
+        Args:
+            sinks: Mapping of sink name to sink instance
+        """
+        self.sinks = sinks
+
+    def save_positions(self, positions: List[Position], delta=None) -> None:
+        """Save positions to every sink.
+
+        Args:
+            positions: Full snapshot
+            delta (SnapshotDelta, optional): Changes against the previous snapshot
+        """
+        # Share one immutable columnar batch between all sink threads
+        batch = PositionBatch.from_positions(positions)
+        targets = {}
+        for name, sink in self.sinks.items():
+            if isinstance(sink, DeltaSink) and delta is not None:
+                if not delta.is_empty:
+                    targets[name] = (sink.save_delta, delta, delta.change_count)
+            else:
+                targets[name] = (sink.save_positions, batch, len(batch))
+
+        if not targets:
+            return
+
+        if len(targets) == 1:
+            name, target = next(iter(targets.items()))
+            errors = {}
+            error = self._save(name, *target)
+            if error:
+                errors[name] = error
+        else:
+            with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix='sink') as executor:
+                futures = {
+                    name: executor.submit(in_context(self._save, name, *target))
+                    for name, target in targets.items()
+                }
+                errors = {
+                    name: future.result()
+                    for name, future in futures.items()
+                    if future.result() is not None
+                }
+
+        if errors:
+            raise FanOutError(errors)
+
+    @staticmethod
+    def _save(name: str, save, payload, count: int):
+        """Save a batch or delta to a single sink, returning the raised exception if any."""
+        try:
+            current_deadline().check()
+            logger.info(f"Saving {count} positions to {name}")
+            with metrics.SINK_SAVE_DURATION.labels(sink=name).time():
+                save(payload)
+            metrics.POSITIONS_SAVED.labels(sink=name).inc(count)
+            logger.info(f"Successfully saved positions to {name}")
+            return None
+        except Exception as e:
+            logger.error(f"Error saving positions to {name}: {str(e)}")
+            metrics.record_error('sink', name)
+            return e
@@ -0,0 +1,159 @@
+from typing import Dict, Iterator, List, Tuple
+from datetime import datetime
+from decimal import Context, Decimal
+import csv
+import io
+import json
+import os
+import threading
+from app.models.position import Position, PositionBatch
+from app.interfaces.data_sink import DataSink
+from config.settings import Settings
+
+FIELDS = ('timestamp', 'platform', 'name', 'worth', 'currency', 'original_worth', 'original_currency')
+
+# decimal128(38, 18) holds 38 digits, more than the default context's 28 once worths reach 1e10
+DECIMAL128_CONTEXT = Context(prec=38)
+
+# Appends to one file are serialized, concurrent runs would interleave partial lines
+_file_locks: Dict[str, threading.Lock] = {}
+_file_locks_lock = threading.Lock()
+
+
+def _file_lock(path: str) -> threading.Lock:
+    with _file_locks_lock:
+        return _file_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def _iter_rows(positions: List[Position]) -> Iterator[Tuple[str, ...]]:
+    """Yield rows in ``FIELDS`` order without materializing them all.
+
+    Batches are read column-wise so no Position objects are created.
+    """
+    if isinstance(positions, PositionBatch):
+        rows = zip(positions.timestamps.tolist(), positions.platforms, positions.names, positions.worths,
+                   positions.currencies, positions.original_worths, positions.original_currencies)
+    else:
+        rows = (
+            (p.timestamp, p.platform, p.name, p.worth, p.currency, p.original_worth, p.original_currency)
+            for p in positions
+        )
+    for timestamp, platform, name, worth, currency, original_worth, original_currency in rows:
+        yield timestamp.isoformat(), platform, name, str(worth), currency, str(original_worth), original_currency
+
+
+class _FileSink(DataSink):
+    """Base class for sinks writing into ``settings.sink_output_dir``."""
+
+    filename = None
+
+    def __init__(self, settings: Settings):
+        self.output_dir = settings.sink_output_dir
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.output_dir, self.filename)
+
+
+class JsonlSink(_FileSink):
+    """Append-only JSON Lines file, one position per line.
+
+    Each batch is appended in one write under a per-file lock.
+    """
+
+    filename = 'positions.jsonl'
+
+    def save_positions(self, positions: List[Position]) -> None:
+        lines = ''.join(json.dumps(dict(zip(FIELDS, row))) + '\n' for row in _iter_rows(positions))
+        with _file_lock(self.path), open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+
+class CsvSink(_FileSink):
+    """Append-only CSV file with a header written on creation.
+
+    Each batch is appended in one write under a per-file lock.
+    """
+
+    filename = 'positions.csv'
+
+    def save_positions(self, positions: List[Position]) -> None:
+        rows = io.StringIO(newline='')
+        csv.writer(rows).writerows(_iter_rows(positions))
+        with _file_lock(self.path), open(self.path, 'a', encoding='utf-8', newline='') as f:
+            if f.tell() == 0:
+                csv.writer(f).writerow(FIELDS)
+            f.write(rows.getvalue())
+
+
+class ParquetSink(_FileSink):
+    """Columnar snapshot files, one Parquet file per saved batch.
+
+    Rows are written in row groups of ``row_group_size`` so large batches
+    are never converted to Arrow in one piece. Requires ``pyarrow``; without
+    it every save fails, while the other sinks keep working.
+    """
+
+    row_group_size = 10_000
+
+    def __init__(self, settings: Settings):
+        super().__init__(settings)
+        self._pa = None
+        self._pq = None
+        self._schema = None
+
+    def _load_arrow(self) -> None:
+        """Import pyarrow on first save, so a missing package only fails this sink."""
+        if self._pa is not None:
+            return
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise RuntimeError("ParquetSink requires the 'pyarrow' package") from e
+        self._schema = pyarrow.schema([
+            ('timestamp', pyarrow.timestamp('us')),
+            ('platform', pyarrow.string()),
+            ('name', pyarrow.string()),
+            ('worth', pyarrow.decimal128(38, 18)),
+            ('currency', pyarrow.string()),
+            ('original_worth', pyarrow.decimal128(38, 18)),
+            ('original_currency', pyarrow.string()),
+        ])
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+
+    def _decimal_array(self, worths):
+        scale = Decimal(1).scaleb(-18)
+        return self._pa.array([worth.quantize(scale, context=DECIMAL128_CONTEXT) for worth in worths],
+                              type=self._pa.decimal128(38, 18))
+
+    def snapshot_path(self, snapshot_time: datetime) -> str:
+        return os.path.join(self.output_dir, f"snapshot-{snapshot_time:%Y%m%dT%H%M%S%f}.parquet")
+
+    def save_positions(self, positions: List[Position]) -> None:
+        self._load_arrow()
+        batch = PositionBatch.from_positions(positions)
+        path = self.snapshot_path(datetime.now())
+        tmp_path = f"{path}.tmp"
+
+        try:
+            with self._pq.ParquetWriter(tmp_path, self._schema) as writer:
+                for start in range(0, len(batch), self.row_group_size):
+                    end = start + self.row_group_size
+                    writer.write_table(self._pa.Table.from_arrays([
+                        self._pa.array(batch.timestamps[start:end], type=self._pa.timestamp('us')),
+                        self._pa.array(batch.platforms[start:end], type=self._pa.string()),
+                        self._pa.array(batch.names[start:end], type=self._pa.string()),
+                        self._decimal_array(batch.worths[start:end]),
+                        self._pa.array(batch.currencies[start:end], type=self._pa.string()),
+                        self._decimal_array(batch.original_worths[start:end]),
+                        self._pa.array(batch.original_currencies[start:end], type=self._pa.string()),
+                    ], schema=self._schema))
+
+            # Readers only ever see complete snapshot files
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -1,25 +1,64 @@
 from typing import List
 from datetime import datetime
-from notion_client import Client
+import asyncio
+import time
+import httpx
+from notion_client import AsyncClient, Client, APIResponseError
 from app.models.position import Position
 from app.interfaces.data_sink import DataSink
+from app.interfaces.async_data_sink import AsyncDataSink
+from app.services import metrics
+from app.services.deadline import DeadlineExceeded, current_deadline
+from app.services.weight_governor import governor_for
 from config.settings import Settings
 
+# Seconds a page creation may take, further bounded by the run's deadline
+REQUEST_TIMEOUT = 30
+
+# Page creations per second allowed by Notion, shared by all async saves of the process
+RATE_LIMIT = 3
+
+# Attempts for a page creation answered with HTTP 429 before giving up
+MAX_ATTEMPTS = 3
+
+def _bound_timeout(client) -> None:
+    """Bound the next request of a notion_client client by the run's deadline.
+
+    notion_client only takes a timeout when the client is created, so the
+    timeout of its httpx client is lowered before every page creation. The
+    request is built from it before the first await, so concurrent page
+    creations of the async client each get their own bound.
+    """
+    client.client.timeout = httpx.Timeout(current_deadline().timeout(REQUEST_TIMEOUT))
+
 class NotionSink(DataSink):
     def __init__(self, settings: Settings):
-        self.client = Client(auth=settings.notion_token)
+        self.client = Client(auth=settings.notion_token, base_url=settings.notion_base_url,
+                             timeout_ms=REQUEST_TIMEOUT * 1000)
         self.database_id = settings.notion_database_id
 
     def save_positions(self, positions: List[Position]) -> None:
         current_date = datetime.now().date().isoformat()
+        deadline = current_deadline()
         
         for position in positions:
+            # Stop between pages once the run's deadline passed
+            deadline.check()
             page_data = self._create_page_data(position, current_date)
+            started = time.perf_counter()
+            status = 200
             try:
+                _bound_timeout(self.client)
                 self.client.pages.create(**page_data)
                 print(f"Successfully imported {position.name} from {position.platform}")
+            except APIResponseError as e:
+                status = e.status
+                print(f"Error importing {position.name}: {e}")
             except Exception as e:
+                status = 'error'
                 print(f"Error importing {position.name}: {e}")
+            finally:
+                metrics.observe_http('notion', 'POST', status, time.perf_counter() - started)
 
     def _create_page_data(self, position: Position, current_date: str) -> dict:
         return {
@@ -49,4 +88,80 @@ class NotionSink(DataSink):
                 }
             }
         }
-        
\ No newline at end of file
+
+
+class AsyncNotionSink(AsyncDataSink):
+    """Notion sink creating pages concurrently.
+
+    Page creations are paced by a process-wide governor to Notion's rate
+    limit of about three requests per second per integration, shared by
+    every run. A page answered with HTTP 429 is retried after the
+    Retry-After delay instead of being dropped; pages still failing after
+    ``MAX_ATTEMPTS`` fail the save. Every save opens its own connection
+    pool. notion_client rewrites the base URL, timeout and Authorization
+    header of the client it is given, so the run's shared client is never
+    handed to it. This also keeps the Notion token out of requests to
+    other services.
+    """
+
+    def __init__(self, settings: Settings, client, max_concurrency: int = 3):
+        """Initialize the sink.
+
+        Args:
+            settings: Application settings
+            client (httpx.AsyncClient): Shared client of the run, unused, see above
+            max_concurrency: Maximum number of concurrent page creations
+        """
+        self.token = settings.notion_token
+        self.base_url = settings.notion_base_url
+        self.database_id = settings.notion_database_id
+        self.max_concurrency = max_concurrency
+        self.governor = governor_for(self.base_url, 'pages', RATE_LIMIT, window=1)
+
+    # Page payloads are identical to the synchronous sink
+    _create_page_data = NotionSink._create_page_data
+
+    async def save_positions(self, positions: List[Position]) -> None:
+        current_date = datetime.now().date().isoformat()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with AsyncClient(auth=self.token, base_url=self.base_url, timeout_ms=REQUEST_TIMEOUT * 1000) as client:
+            results = await asyncio.gather(*(
+                self._create_page(client, semaphore, position, current_date) for position in positions
+            ), return_exceptions=True)
+
+        failed = [result for result in results if isinstance(result, Exception)]
+        for error in failed:
+            if isinstance(error, DeadlineExceeded):
+                raise error
+        if failed:
+            # Pages cut off by the run's deadline leave the save interrupted rather than failed
+            current_deadline().check()
+            raise RuntimeError(f"Failed to import {len(failed)} of {len(positions)} positions: {failed[0]}")
+
+    async def _create_page(self, client: AsyncClient, semaphore: asyncio.Semaphore,
+                           position: Position, current_date: str) -> None:
+        page_data = self._create_page_data(position, current_date)
+        async with semaphore:
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                current_deadline().check()
+                await self.governor.acquire_async(1)
+                started = time.perf_counter()
+                status = 200
+                try:
+                    _bound_timeout(client)
+                    await client.pages.create(**page_data)
+                    print(f"Successfully imported {position.name} from {position.platform}")
+                    return
+                except APIResponseError as e:
+                    status = e.status
+                    if status != 429 or attempt == MAX_ATTEMPTS:
+                        print(f"Error importing {position.name}: {e}")
+                        raise
+                    self.governor.back_off(float(e.headers.get('Retry-After') or 1))
+                    metrics.record_retry('http', 'notion')
+                except Exception as e:
+                    status = 'error'
+                    print(f"Error importing {position.name}: {e}")
+                    raise
+                finally:
+                    metrics.observe_http('notion', 'POST', status, time.perf_counter() - started)
@@ -1,9 +1,36 @@
-from app.sources.binance import BinanceSource
-from app.sources.debank import DebankSource
-from app.sources.trading212 import Trading212Source
+import importlib
+
+# Sources runs and schedules can select, by name, with the class implementing each
+SOURCE_CLASSES = {
+    'Trading212': 'Trading212Source',
+    'Binance': 'BinanceSource',
+    'Debank': 'DebankSource'
+}
+SOURCE_NAMES = list(SOURCE_CLASSES)
+
+# Imported on first access, so listing sources does not load Selenium
+_LAZY_IMPORTS = {
+    'BinanceSource': 'app.sources.binance',
+    'DebankSource': 'app.sources.debank',
+    'Trading212Source': 'app.sources.trading212'
+}
 
 __all__ = [
+    'SOURCE_CLASSES',
+    'SOURCE_NAMES',
+    'source_class',
     'BinanceSource',
     'DebankSource',
     'Trading212Source'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def source_class(name: str) -> type:
+    """Return the class of a selectable source, importing its module on first use."""
+    return __getattr__(SOURCE_CLASSES[name])
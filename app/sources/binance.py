@@ -1,102 +1,360 @@
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
 from decimal import Decimal
+import asyncio
 import hmac
 import hashlib
 import time
 import requests
 from urllib.parse import urlencode
-from app.models.position import Position
-from app.interfaces.data_source import DataSource
+from app.models.position import PositionBatch, MIN_POSITION_WORTH
+from app.interfaces.data_source import DataSource, PartialFetchError
+from app.interfaces.async_data_source import AsyncDataSource
+from app.services import metrics
+from app.services.metrics import http_hooks
+from app.services.deadline import DeadlineExceeded, current_deadline, in_context
+from app.services.weight_governor import WeightGovernor, governor_for
 from config.settings import Settings
 
+Balance = Tuple[str, Decimal]
+
+# Weight pools with their per-minute IP limits and the header reporting the used weight
+WEIGHT_POOLS = {
+    'api': (6000, 'X-MBX-USED-WEIGHT-1M'),
+    'sapi': (12000, 'X-SAPI-USED-IP-WEIGHT-1M'),
+}
+
+# Attempts for a request answered with HTTP 429 before giving up
+MAX_ATTEMPTS = 3
+
+# Rows per page requested from the paginated Simple Earn endpoints
+PAGE_SIZE = 100
+
+# Seconds a request may take, further bounded by the run's deadline
+REQUEST_TIMEOUT = 30
+
+
+def _amount(*values) -> Decimal:
+    return sum((Decimal(str(value)) for value in values if value is not None), Decimal('0'))
+
+
+def _spot_balances(data: dict) -> List[Balance]:
+    return [(b['asset'], _amount(b['free'], b['locked'])) for b in data['balances']]
+
+
+def _funding_balances(data: list) -> List[Balance]:
+    return [(b['asset'], _amount(b['free'], b['locked'], b.get('freeze'))) for b in data]
+
+
+def _flexible_earn_balances(data: dict) -> List[Balance]:
+    return [(row['asset'], _amount(row['totalAmount'])) for row in data.get('rows', [])]
+
+
+def _locked_earn_balances(data: dict) -> List[Balance]:
+    return [(row['asset'], _amount(row['amount'])) for row in data.get('rows', [])]
+
+
+def _margin_balances(data: dict) -> List[Balance]:
+    return [(a['asset'], _amount(a['netAsset'])) for a in data['userAssets']]
+
+
+class WalletRequest(NamedTuple):
+    """One signed balance endpoint of a Binance wallet or sub-account."""
+    name: str
+    pool: str
+    method: str
+    endpoint: str
+    weight: int
+    parse: Callable[[object], List[Balance]]
+    params: Optional[dict] = None
+    paginated: bool = False
+
+
+WALLETS = {
+    'spot': WalletRequest('spot', 'api', 'GET', '/api/v3/account', 20, _spot_balances),
+    'funding': WalletRequest('funding', 'sapi', 'POST', '/sapi/v1/asset/get-funding-asset', 1,
+                             _funding_balances),
+    'earn': WalletRequest('earn', 'sapi', 'GET', '/sapi/v1/simple-earn/flexible/position', 150,
+                          _flexible_earn_balances, paginated=True),
+    'earn_locked': WalletRequest('earn_locked', 'sapi', 'GET', '/sapi/v1/simple-earn/locked/position', 150,
+                                 _locked_earn_balances, paginated=True),
+    'margin': WalletRequest('margin', 'sapi', 'GET', '/sapi/v1/margin/account', 10, _margin_balances),
+}
+
+TICKER_PRICES = WalletRequest('prices', 'api', 'GET', '/api/v3/ticker/price', 4, list)
+
+
+def sub_account_request(email: str) -> WalletRequest:
+    """Build the request for the spot balances of a sub-account of the master account."""
+    return WalletRequest(f"sub:{email}", 'sapi', 'GET', '/sapi/v3/sub-account/assets', 60,
+                         _spot_balances, params={'email': email})
+
+
+def _without_earn_mirrors(balances: Dict[str, List[Balance]]) -> Dict[str, List[Balance]]:
+    """Drop the LD<asset> spot balances that mirror flexible earn positions read from the earn wallet.
+
+    Without the earn wallet, or when it failed, the spot mirrors are the
+    only record of those positions and are kept.
+    """
+    if 'spot' not in balances or 'earn' not in balances:
+        return balances
+    earned = {asset for asset, _ in balances['earn']}
+    spot = [(asset, amount) for asset, amount in balances['spot']
+            if not (asset.startswith('LD') and asset[2:] in earned)]
+    return {**balances, 'spot': spot}
+
+
 class BinanceSource(DataSource):
+    """Binance balances across wallets and sub-accounts.
+
+    Every configured wallet and sub-account endpoint is fetched on its own
+    worker thread, and amounts of the same asset are merged into one
+    position. Each request first acquires its weight from a process-wide
+    WeightGovernor, which follows the used weight reported by Binance, so
+    large accounts are throttled locally instead of getting the IP banned.
+    A failing wallet does not discard the others: their positions are
+    raised with the failures in a PartialFetchError.
+    """
+
     def __init__(self, settings: Settings):
+        unknown = [name for name in settings.binance_wallets if name not in WALLETS]
+        if unknown:
+            raise ValueError(f"Unknown Binance wallets in BINANCE_WALLETS: {', '.join(unknown)}; "
+                             f"expected any of {', '.join(WALLETS)}")
         self.api_key = settings.binance_api_key
         self.api_secret = settings.binance_api_secret
-        self.base_url = "https://api.binance.com"
-        
-    def fetch_positions(self) -> List[Position]:
-        """Fetch all wallet positions from Binance"""
-        try:
-            # Get account information including balances
-            account_info = self._get_account_info()
-            
-            # Get current price information for all assets
-            prices = self._get_ticker_prices()
-            
-            # Filter non-zero balances and calculate worth
-            positions = []
-            for balance in account_info['balances']:
-                asset = balance['asset']
-                free_amount = Decimal(balance['free'])
-                locked_amount = Decimal(balance['locked'])
-                total_amount = free_amount + locked_amount
-                
-                if total_amount > Decimal('0'):
-                    try:
-                        # Calculate worth in USD
-                        worth = Decimal('0')
-                        if asset == 'USDT':
-                            worth = total_amount
-                        elif asset == 'USDC':
-                            worth = total_amount
-                        elif f"{self._clean_asset_name(asset)}USDT" in prices:
-                            worth = total_amount * Decimal(str(prices[f"{self._clean_asset_name(asset)}USDT"]))
-                        
-                        if worth >= Decimal('5'):  # Only include positions worth $5 or more
-                            cleaned_name = self._clean_asset_name(asset)
-                            positions.append(Position(
-                                name=cleaned_name,
-                                worth=worth,
-                                platform="Binance"
-                            ))
-                    except (KeyError, ValueError, TypeError) as e:
-                        print(f"Skipping {asset} due to pricing error: {e}")
-            
-            return positions
-        except Exception as e:
-            print(f"Error fetching Binance positions: {e}")
-            return []
-    
+        self.base_url = settings.binance_api_url
+        self.max_workers = settings.binance_max_workers
+        self.requests = [WALLETS[name] for name in settings.binance_wallets]
+        self.requests.extend(sub_account_request(email) for email in settings.binance_sub_accounts)
+
+    def governor(self, pool: str) -> WeightGovernor:
+        return governor_for(self.base_url, pool, WEIGHT_POOLS[pool][0])
+
+    def fetch_positions(self) -> PositionBatch:
+        """Fetch all wallet positions from Binance
+
+        Raises:
+            PartialFetchError: When some wallets failed, with the positions of the others
+        """
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.requests) + 1),
+                                thread_name_prefix='binance') as executor:
+            prices = executor.submit(in_context(self._get_ticker_prices))
+            futures = {
+                request.name: executor.submit(in_context(self._fetch_balances, request))
+                for request in self.requests
+            }
+            balances, errors = {}, {}
+            for name, future in futures.items():
+                try:
+                    balances[name] = future.result()
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    errors[name] = e
+            prices = prices.result()
+
+        return self._merge_wallets(balances, errors, prices)
+
+    def _merge_wallets(self, balances: Dict[str, List[Balance]], errors: Dict[str, Exception],
+                       prices: dict) -> PositionBatch:
+        """Build the positions of the fetched wallets, raising PartialFetchError when some failed"""
+        for name, error in errors.items():
+            print(f"Error fetching Binance {name} balances: {error}")
+        balances = _without_earn_mirrors(balances)
+        positions = self._build_positions(
+            (balance for wallet in balances.values() for balance in wallet), prices
+        )
+        if errors:
+            raise PartialFetchError(positions, errors)
+        return positions
+
+    def _fetch_balances(self, request: WalletRequest) -> List[Balance]:
+        """Fetch every page of one wallet endpoint"""
+        if not request.paginated:
+            return request.parse(self._signed_request(request, request.params))
+
+        balances = []
+        page = 1
+        while True:
+            data = self._signed_request(request, {**(request.params or {}), 'current': page, 'size': PAGE_SIZE})
+            balances.extend(request.parse(data))
+            if page * PAGE_SIZE >= int(data.get('total', 0)):
+                return balances
+            page += 1
+
+    def _build_positions(self, balances: Iterable[Balance], prices: dict) -> PositionBatch:
+        """Merge balances per asset and calculate their worth in USD"""
+        amounts = {}
+        for asset, amount in balances:
+            if amount > Decimal('0'):
+                cleaned_name = self._clean_asset_name(asset)
+                amounts[cleaned_name] = amounts.get(cleaned_name, Decimal('0')) + amount
+
+        names = []
+        worths = []
+        for name, total_amount in amounts.items():
+            try:
+                # Calculate worth in USD
+                worth = Decimal('0')
+                if name in ('USDT', 'USDC'):
+                    worth = total_amount
+                elif f"{name}USDT" in prices:
+                    worth = total_amount * Decimal(str(prices[f"{name}USDT"]))
+
+                names.append(name)
+                worths.append(worth)
+            except (KeyError, ValueError, TypeError) as e:
+                print(f"Skipping {name} due to pricing error: {e}")
+
+        # Only include positions worth $5 or more
+        return PositionBatch(names, worths, "Binance").filter_min_worth(MIN_POSITION_WORTH)
+
     def _get_account_info(self) -> dict:
-        """Get account information from Binance API"""
-        endpoint = "/api/v3/account"
-        return self._signed_request("GET", endpoint)
-    
+        """Get spot account information from Binance API"""
+        return self._signed_request(WALLETS['spot'])
+
     def _get_ticker_prices(self) -> dict:
         """Get current prices for all trading pairs"""
-        endpoint = "/api/v3/ticker/price"
-        response = requests.get(f"{self.base_url}{endpoint}")
-        response.raise_for_status()
-        
+        url = f"{self.base_url}{TICKER_PRICES.endpoint}"
+        response = self._send(TICKER_PRICES, lambda: requests.get(
+            url, hooks=http_hooks('binance'), timeout=current_deadline().timeout(REQUEST_TIMEOUT)
+        ))
+
         return {item['symbol']: item['price'] for item in response.json()}
-    
-    def _signed_request(self, method: str, endpoint: str, params: dict = None) -> dict:
-        """Make a signed request to Binance API"""
-        if params is None:
-            params = {}
-            
+
+    def _signed_url(self, endpoint: str, params: dict = None) -> str:
+        """Build a timestamped and signed URL for a Binance API endpoint"""
+        params = dict(params or {})
+
         timestamp = int(time.time() * 1000)
         params['timestamp'] = timestamp
-        
+
         query_string = urlencode(params)
         signature = hmac.new(
             self.api_secret.encode('utf-8'),
             query_string.encode('utf-8'),
             hashlib.sha256
         ).hexdigest()
-        
-        url = f"{self.base_url}{endpoint}?{query_string}&signature={signature}"
+
+        return f"{self.base_url}{endpoint}?{query_string}&signature={signature}"
+
+    def _signed_request(self, request: WalletRequest, params: dict = None):
+        """Make a signed request to Binance API"""
         headers = {'X-MBX-APIKEY': self.api_key}
-        
-        response = requests.request(method, url, headers=headers)
-        response.raise_for_status()
-        
+
+        # Sign on every attempt, a retried request needs a fresh timestamp
+        response = self._send(request, lambda: requests.request(
+            request.method, self._signed_url(request.endpoint, params),
+            headers=headers, hooks=http_hooks('binance'), timeout=current_deadline().timeout(REQUEST_TIMEOUT)
+        ))
+
         return response.json()
-        
+
+    def _send(self, request: WalletRequest, send: Callable[[], requests.Response]) -> requests.Response:
+        """Send a request within the weight budget, retrying when throttled"""
+        governor = self.governor(request.pool)
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            governor.acquire(request.weight)
+            response = send()
+            governor.update(response.headers.get(WEIGHT_POOLS[request.pool][1]))
+            if not self._throttled(governor, response.status_code, response.headers) or attempt == MAX_ATTEMPTS:
+                response.raise_for_status()
+                return response
+            metrics.record_retry('http', 'binance')
+
+    @staticmethod
+    def _throttled(governor: WeightGovernor, status: int, headers) -> bool:
+        """Pause the governor after a 429 (rate limited) or 418 (IP banned) answer.
+
+        Returns:
+            bool: True when the request may be retried
+        """
+        if status not in (418, 429):
+            return False
+        governor.back_off(float(headers.get('Retry-After') or 60))
+        return status == 429
+
     @staticmethod
     def _clean_asset_name(asset_name: str) -> str:
         """Remove 'LD' prefix from asset names if present."""
         if asset_name.startswith('LD'):
             return asset_name[2:]
-        return asset_name
\ No newline at end of file
+        return asset_name
+
+
+class AsyncBinanceSource(AsyncDataSource):
+    """Binance source fetching every wallet and prices concurrently on a shared ``httpx.AsyncClient``."""
+
+    def __init__(self, settings: Settings, client):
+        """Initialize the source.
+
+        Args:
+            settings: Application settings
+            client (httpx.AsyncClient): Shared client providing the connection pool
+        """
+        # Signing, weight governors and position building are shared with the synchronous source
+        self._source = BinanceSource(settings)
+        self.client = client
+
+    async def fetch_positions(self) -> PositionBatch:
+        """Fetch all wallet positions from Binance
+
+        Raises:
+            PartialFetchError: When some wallets failed, with the positions of the others
+        """
+        prices, *results = await asyncio.gather(
+            self._get_json(TICKER_PRICES, lambda: f"{self._source.base_url}{TICKER_PRICES.endpoint}"),
+            *(self._fetch_balances(request) for request in self._source.requests),
+            return_exceptions=True
+        )
+        balances, errors = {}, {}
+        for request, result in zip(self._source.requests, results):
+            # Deadline and cancellation stop the whole fetch
+            if isinstance(result, DeadlineExceeded) or (
+                    isinstance(result, BaseException) and not isinstance(result, Exception)):
+                raise result
+            if isinstance(result, Exception):
+                errors[request.name] = result
+            else:
+                balances[request.name] = result
+        if isinstance(prices, BaseException):
+            raise prices
+
+        prices = {item['symbol']: item['price'] for item in prices}
+        return self._source._merge_wallets(balances, errors, prices)
+
+    async def _fetch_balances(self, request: WalletRequest) -> List[Balance]:
+        """Fetch every page of one wallet endpoint"""
+        if not request.paginated:
+            return request.parse(await self._get_signed_json(request, request.params))
+
+        balances = []
+        page = 1
+        while True:
+            data = await self._get_signed_json(request, {**(request.params or {}), 'current': page, 'size': PAGE_SIZE})
+            balances.extend(request.parse(data))
+            if page * PAGE_SIZE >= int(data.get('total', 0)):
+                return balances
+            page += 1
+
+    async def _get_signed_json(self, request: WalletRequest, params: dict = None):
+        return await self._get_json(
+            request, lambda: self._source._signed_url(request.endpoint, params),
+            headers={'X-MBX-APIKEY': self._source.api_key}
+        )
+
+    async def _get_json(self, request: WalletRequest, build_url: Callable[[], str], headers: dict = None):
+        governor = self._source.governor(request.pool)
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            await governor.acquire_async(request.weight)
+            started = time.perf_counter()
+            response = await self.client.request(request.method, build_url(), headers=headers,
+                                                 timeout=current_deadline().timeout(REQUEST_TIMEOUT))
+            metrics.observe_http('binance', request.method, response.status_code, time.perf_counter() - started)
+            governor.update(response.headers.get(WEIGHT_POOLS[request.pool][1]))
+            if (not BinanceSource._throttled(governor, response.status_code, response.headers)
+                    or attempt == MAX_ATTEMPTS):
+                response.raise_for_status()
+                return response.json()
+            metrics.record_retry('http', 'binance')
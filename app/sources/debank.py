@@ -1,58 +1,75 @@
-from typing import List
 from decimal import Decimal
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from app.models.position import Position
-from app.interfaces.data_source import DataSource
+from app.models.position import PositionBatch, MIN_POSITION_WORTH
+from app.interfaces.data_source import DataSource, PartialFetchError
 from app.services.web_driver import WebDriverService
+from app.services.scrape_cache import shared_cache
+from app.services.deadline import DeadlineExceeded, current_deadline
 from config.settings import Settings
-import time
 
 class DebankSource(DataSource):
+    """DeBank profiles scraped with Selenium.
+
+    Scrapes are cached per profile URL with stale-while-revalidate
+    semantics, see ScrapeCache. A ``debank_cache_ttl`` of 0 disables the
+    cache and scrapes every profile on every fetch.
+    """
+
     def __init__(self, settings: Settings, web_driver_service: WebDriverService):
         self.settings = settings
         self.web_driver_service = web_driver_service
         self.urls_and_platforms = settings.debank_sources
+        self.cache = None
+        if settings.debank_cache_ttl > 0:
+            self.cache = shared_cache(settings.debank_cache_path, settings.debank_cache_ttl,
+                                      settings.debank_cache_max_stale)
 
-    def fetch_positions(self) -> List[Position]:
-        all_positions = []
-        
+    def fetch_positions(self) -> PositionBatch:
+        """Scrape every profile, raising PartialFetchError when some failed"""
+        deadline = current_deadline()
+        batches = []
+        errors = {}
         for url, platform in self.urls_and_platforms:
-            positions = self._scrape_profile(url, platform)
-            if positions:
-                all_positions.extend(positions)
-                
-        return all_positions
+            deadline.check()
+            try:
+                batches.append(self._fetch_profile(url, platform))
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                print(f"Error scraping {platform}: {str(e)}")
+                errors[platform] = e
+
+        positions = PositionBatch.concat(batches)
+        if errors:
+            raise PartialFetchError(positions, errors)
+        return positions
 
-    def _scrape_profile(self, url: str, platform: str) -> List[Position]:
-        positions = []
+    def _fetch_profile(self, url: str, platform: str) -> PositionBatch:
+        if self.cache is None:
+            return self._scrape_profile(url, platform)
+        return self.cache.get_or_fetch(url, lambda: self._scrape_profile(url, platform))
 
+    def _scrape_profile(self, url: str, platform: str) -> PositionBatch:
+        """Scrape one profile, raising on failure so errors are never cached"""
+        deadline = current_deadline()
         with self.web_driver_service.get_driver() as driver:
-            try:
-                driver.get(url)
-                wait = WebDriverWait(driver, 7)
-                wait.until(EC.presence_of_element_located((By.CLASS_NAME, "ProjectCell_assetsItemWorth__EMwu2")))
-                time.sleep(3)
-
-                worth_elements = driver.find_elements(By.CLASS_NAME, "ProjectCell_assetsItemWorth__EMwu2")
-                name_elements = driver.find_elements(By.CLASS_NAME, "ProjectCell_assetsItemNameText__l9fan")
-
-                for name, worth in zip(name_elements, worth_elements):
-                    worth_value = self._clean_worth_value(worth.text.strip())
-                    
-                    if worth_value >= Decimal('5'):
-                        positions.append(Position(
-                            name=name.text.strip(),
-                            worth=worth_value,
-                            platform=platform
-                        ))
-
-                return positions
+            driver.get(url)
+            wait = WebDriverWait(driver, deadline.timeout(7))
+            wait.until(EC.presence_of_element_located((By.CLASS_NAME, "ProjectCell_assetsItemWorth__EMwu2")))
+            deadline.sleep(3)
 
-            except Exception as e:
-                print(f"Error scraping {platform}: {str(e)}")
-                return []
+            worth_elements = driver.find_elements(By.CLASS_NAME, "ProjectCell_assetsItemWorth__EMwu2")
+            name_elements = driver.find_elements(By.CLASS_NAME, "ProjectCell_assetsItemNameText__l9fan")
+
+            names = []
+            worths = []
+            for name, worth in zip(name_elements, worth_elements):
+                names.append(name.text.strip())
+                worths.append(self._clean_worth_value(worth.text.strip()))
+
+            return PositionBatch(names, worths, platform).filter_min_worth(MIN_POSITION_WORTH)
 
     @staticmethod
     def _clean_worth_value(worth_text: str) -> Decimal:
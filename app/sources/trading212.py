@@ -1,29 +1,122 @@
 import requests
+import time
 from decimal import Decimal
-from typing import List
-from app.models.position import Position
+from typing import Dict, Tuple
+from app.models.position import PositionBatch
 from app.interfaces.data_source import DataSource
+from app.interfaces.async_data_source import AsyncDataSource
+from app.services import metrics
+from app.services.metrics import http_hooks
+from app.services.deadline import DeadlineExceeded, current_deadline
 from config.settings import Settings
 
+# Seconds a request may take, further bounded by the run's deadline
+REQUEST_TIMEOUT = 30
+
+# Account currency per (API URL, token), so the rate limited account endpoint is asked once per process
+_account_currencies: Dict[Tuple[str, str], str] = {}
+
+
+def _currency_lookup_failed(error: Exception) -> LookupError:
+    """Fail the fetch rather than guess, the lookup is retried on the next run."""
+    return LookupError(f"Could not look up the Trading212 account currency, "
+                       f"set TRADING212_CURRENCY to skip the lookup: {error}")
+
 class Trading212Source(DataSource):
     def __init__(self, settings: Settings):
         self.api_url = settings.trading212_api_url
         self.api_token = settings.trading212_api_token
+        # Worth is reported in the account currency, looked up once when not configured
+        self.currency = settings.trading212_currency
 
-    def fetch_positions(self) -> List[Position]:
+    def fetch_positions(self) -> PositionBatch:
 
         headers = {
         "Authorization": self.api_token
         }
-        response = requests.get(self.api_url, headers=headers)
+        currency = self._account_currency(headers)
+
+        response = requests.get(self.api_url, headers=headers, hooks=http_hooks('trading212'),
+                                timeout=current_deadline().timeout(REQUEST_TIMEOUT))
         response.raise_for_status()
         
-        portfolio_data = response.json()
-        return [
-            Position(
-                name=position.get('ticker', ''),
-                worth=Decimal(str(float(position.get('currentPrice', 0)) * float(position.get('quantity', 0)))),
-                platform="Trading212"
-            )
-            for position in portfolio_data
-        ]
+        return self._build_positions(response.json(), currency)
+
+    def _account_currency(self, headers: dict) -> str:
+        """Return the configured or cached account currency, looking it up on first use."""
+        if self.currency is not None:
+            return self.currency
+        key = (self.api_url, self.api_token)
+        if key not in _account_currencies:
+            try:
+                response = requests.get(account_info_url(self.api_url), headers=headers,
+                                        hooks=http_hooks('trading212'),
+                                        timeout=current_deadline().timeout(REQUEST_TIMEOUT))
+                response.raise_for_status()
+                _account_currencies[key] = response.json()['currencyCode'].upper()
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                raise _currency_lookup_failed(e) from e
+        return _account_currencies[key]
+
+    @staticmethod
+    def _build_positions(portfolio_data: list, currency: str) -> PositionBatch:
+        """Convert the portfolio endpoint payload into a batch of positions."""
+        return PositionBatch(
+            names=[position.get('ticker', '') for position in portfolio_data],
+            worths=[
+                Decimal(str(float(position.get('currentPrice', 0)) * float(position.get('quantity', 0))))
+                for position in portfolio_data
+            ],
+            platforms="Trading212",
+            currencies=currency
+        )
+
+
+def account_info_url(portfolio_url: str) -> str:
+    """Derive the account info endpoint from the portfolio endpoint URL."""
+    return portfolio_url.rsplit('/equity/', 1)[0] + '/equity/account/info'
+
+
+class AsyncTrading212Source(AsyncDataSource):
+    """Trading212 source issuing its request on a shared ``httpx.AsyncClient``."""
+
+    def __init__(self, settings: Settings, client):
+        """Initialize the source.
+
+        Args:
+            settings: Application settings
+            client (httpx.AsyncClient): Shared client providing the connection pool
+        """
+        self.api_url = settings.trading212_api_url
+        self.api_token = settings.trading212_api_token
+        self.currency = settings.trading212_currency
+        self.client = client
+
+    async def fetch_positions(self) -> PositionBatch:
+        currency = await self._account_currency()
+        return Trading212Source._build_positions(await self._get_json(self.api_url), currency)
+
+    async def _account_currency(self) -> str:
+        """Return the configured or cached account currency, looking it up on first use."""
+        if self.currency is not None:
+            return self.currency
+        key = (self.api_url, self.api_token)
+        if key not in _account_currencies:
+            try:
+                info = await self._get_json(account_info_url(self.api_url))
+                _account_currencies[key] = info['currencyCode'].upper()
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                raise _currency_lookup_failed(e) from e
+        return _account_currencies[key]
+
+    async def _get_json(self, url: str):
+        started = time.perf_counter()
+        response = await self.client.get(url, headers={"Authorization": self.api_token},
+                                         timeout=current_deadline().timeout(REQUEST_TIMEOUT))
+        metrics.observe_http('trading212', 'GET', response.status_code, time.perf_counter() - started)
+        response.raise_for_status()
+        return response.json()
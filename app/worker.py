@@ -0,0 +1,165 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import logging
+import signal
+import threading
+import time
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.database import get_db
+from app.models import Run, Schedule, TableVersion
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Process executing scheduled and queued runs away from the web server.
+
+    With ``run_mode`` set to 'queue', the web process only records runs as
+    'queued'. The worker claims them from the database, runs them on a
+    pool of ``concurrency`` threads and fires the schedules itself, picking
+    up schedule changes made through the web app. Runs left unfinished by
+    a worker that died are marked as such, see ``expire_abandoned_runs``.
+    """
+
+    def __init__(self, app, concurrency: int = 2, poll_interval: float = 2.0):
+        """Initialize the worker.
+
+        Args:
+            app: Flask application providing settings and the database
+            concurrency: Queued runs executed at the same time; scheduled runs
+                fire on the scheduler's own threads
+            poll_interval: Seconds between checks for queued runs and schedule changes
+        """
+        self.app = app
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.scheduler_service = None
+        self._schedules_version: Optional[str] = None
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='run')
+        self._in_flight = set()
+        self._in_flight_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._next_expiry = 0.0
+
+    def start(self) -> None:
+        """Start the scheduler with the active schedules."""
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from app.services.scheduler import SchedulerService
+
+        scheduler = BackgroundScheduler()
+        scheduler.start()
+        with self.app.app_context():
+            self.scheduler_service = SchedulerService(scheduler, app=self.app)
+            self._schedules_version = self._current_schedules_version(get_db())
+
+    def run_forever(self) -> None:
+        """Poll for work until SIGINT or SIGTERM, then wait for the runs in flight."""
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self.stop())
+
+        self.start()
+        logger.info(f"Worker started, executing up to {self.concurrency} runs at a time")
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.error(f"Error polling for runs: {str(e)}")
+                self._stop.wait(self.poll_interval)
+        finally:
+            self.shutdown()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def poll(self) -> int:
+        """Finish abandoned runs, apply schedule changes and start queued runs while threads are free.
+
+        Returns:
+            int: Number of runs started
+        """
+        from app.services.runs import HEARTBEAT_TIMEOUT, expire_abandoned_runs
+
+        with self.app.app_context():
+            db = get_db()
+            if time.monotonic() >= self._next_expiry:
+                expire_abandoned_runs(db)
+                self._next_expiry = time.monotonic() + HEARTBEAT_TIMEOUT
+            self._reconcile_schedules(db)
+
+            with self._in_flight_lock:
+                free = self.concurrency - len(self._in_flight)
+            if free <= 0:
+                return 0
+
+            from app.services.runs import claim_queued_runs
+
+            run_ids = claim_queued_runs(db, free)
+        for run_id in run_ids:
+            future = self._executor.submit(self._execute, run_id)
+            with self._in_flight_lock:
+                self._in_flight.add(future)
+            future.add_done_callback(self._done)
+        return len(run_ids)
+
+    def _done(self, future) -> None:
+        with self._in_flight_lock:
+            self._in_flight.discard(future)
+
+    def _execute(self, run_id: int) -> None:
+        from app.services.runs import execute_queued_run
+
+        with self.app.app_context():
+            db = get_db()
+            run = db.query(Run).get(run_id)
+            logger.info(f"Executing run {run_id}: {', '.join(run.selected_sources)}")
+            try:
+                execute_queued_run(db, self.app.config['SETTINGS'], run)
+                logger.info(f"Run {run_id} finished with status {run.status}")
+            except Exception as e:
+                logger.error(f"Run {run_id} failed: {str(e)}")
+
+    @staticmethod
+    def _current_schedules_version(db) -> str:
+        return TableVersion.current_tag(db, Schedule.__tablename__)
+
+    def _reconcile_schedules(self, db) -> None:
+        """Reload the scheduler jobs once the schedules table changed."""
+        version = self._current_schedules_version(db)
+        if version != self._schedules_version:
+            self.scheduler_service.reconcile(db)
+            self._schedules_version = version
+            logger.info(f"Schedules reloaded at version {version}")
+
+    def shutdown(self) -> None:
+        """Stop firing schedules, cancel the runs in flight and wait until they recorded their outcome."""
+        from app.services.runs import cancel_active_runs
+
+        if self.scheduler_service is not None:
+            self.scheduler_service.scheduler.pause()
+        cancelled = cancel_active_runs()
+        if cancelled:
+            logger.info(f"Cancelling {cancelled} runs in flight")
+        if self.scheduler_service is not None:
+            self.scheduler_service.shutdown()
+        self._executor.shutdown(wait=True)
+        logger.info("Worker stopped")
+
+
+@click.command('worker')
+@click.option('--concurrency', type=int, default=None,
+              help='Runs executed at the same time, WORKER_CONCURRENCY by default.')
+@click.option('--poll-interval', type=float, default=None,
+              help='Seconds between checks for queued runs, WORKER_POLL_INTERVAL by default.')
+@with_appcontext
+def worker_command(concurrency, poll_interval):
+    """Execute queued and scheduled portfolio runs until interrupted."""
+    app = current_app._get_current_object()
+    settings = app.config['SETTINGS']
+    Worker(
+        app,
+        concurrency=concurrency or settings.worker_concurrency,
+        poll_interval=poll_interval or settings.worker_poll_interval
+    ).run_forever()
@@ -0,0 +1 @@
+"""Benchmarks and local upstream stubs for the portfolio tracker."""
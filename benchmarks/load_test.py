@@ -0,0 +1,334 @@
+"""HTTP load and soak test of the web app against local stubs.
+
+The app runs in its own process (``benchmarks.serve_app``) with every
+upstream replaced by a stub from ``benchmarks.stubs``. Concurrent clients
+send a weighted mix of requests to ``/``, the ``/api/schedules`` CRUD
+endpoints and ``/api/run`` for ``--duration`` seconds. Throughput and
+p50/p95/p99 latency are reported per operation, while the RSS, open file
+descriptors and threads of the server are sampled every
+``--sample-interval`` seconds. Chrome and chromedriver processes are
+counted system-wide and compared with the count before the server
+started, so browsers orphaned to init are caught too. Process samples need
+Linux ``/proc``.
+
+Example:
+    python -m benchmarks.load_test --clients 16 --duration 60 --output load.json
+    python -m benchmarks.load_test --clients 4 --duration 3600 \\
+        --sample-interval 30 --mix index=1,list=4,crud=2,run=1 --wallets 1
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import asdict
+from datetime import datetime
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import requests
+from app.services.processes import is_browser, list_processes, process_status
+from benchmarks.run_pipeline import build_settings
+from benchmarks.stubs import BinanceStub, DebankStub, NotionStub, Trading212Stub
+
+OPERATIONS = ('index', 'list', 'crud', 'run')
+DEFAULT_MIX = 'index=2,list=6,crud=2,run=1'
+
+
+def parse_mix(value: str) -> dict:
+    """Parse ``name=weight`` pairs, e.g. ``index=1,list=4``."""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation {name!r}, expected one of {OPERATIONS}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    """Thread-safe collection of request latencies and failures per operation."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.statuses = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, status) -> None:
+        with self._lock:
+            self.latencies.setdefault(name, []).append(seconds)
+            key = f"{name}:{status}"
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+            if not isinstance(status, int) or status >= 400:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self, elapsed: float) -> dict:
+        result = {}
+        with self._lock:
+            for name, values in sorted(self.latencies.items()):
+                values = sorted(values)
+                result[name] = {
+                    "requests": len(values),
+                    "errors": self.errors.get(name, 0),
+                    "rps": len(values) / elapsed if elapsed else 0.0,
+                    "p50_ms": percentile(values, 0.50) * 1000,
+                    "p95_ms": percentile(values, 0.95) * 1000,
+                    "p99_ms": percentile(values, 0.99) * 1000,
+                    "max_ms": values[-1] * 1000
+                }
+            result["statuses"] = dict(sorted(self.statuses.items()))
+        return result
+
+
+class Client:
+    """One simulated user issuing operations on its own HTTP session."""
+
+    def __init__(self, base_url: str, recorder: Recorder, sources, seed: int):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.sources = sources
+        self.session = requests.Session()
+        self.random = random.Random(seed)
+
+    def _request(self, name: str, method: str, path: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=300, **kwargs)
+            status = response.status_code
+        except requests.RequestException:
+            response, status = None, 'error'
+        self.recorder.record(name, time.perf_counter() - started, status)
+        return response
+
+    def index(self):
+        self._request('index', 'GET', '/')
+
+    def list(self):
+        self._request('list_schedules', 'GET', '/api/schedules')
+
+    def crud(self):
+        response = self._request('create_schedule', 'POST', '/api/schedules', json={
+            "name": f"load-{self.random.getrandbits(32):08x}",
+            "schedule_type": "daily",
+            "time": f"{self.random.randrange(24):02d}:{self.random.randrange(60):02d}",
+            "selected_sources": list(self.sources)
+        })
+        if response is None or response.status_code != 201:
+            return
+        schedule_id = response.json()['schedule']['id']
+        self._request('update_schedule', 'PUT', f"/api/schedules/{schedule_id}", json={"active": False})
+        self._request('delete_schedule', 'DELETE', f"/api/schedules/{schedule_id}")
+
+    def run(self):
+        self._request('run', 'POST', '/api/run', json={"sources": list(self.sources)})
+
+    def loop(self, mix: dict, deadline: float) -> None:
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        while time.monotonic() < deadline:
+            getattr(self, self.random.choices(names, weights)[0])()
+        self.session.close()
+
+
+def count_browsers() -> int:
+    """Count Chrome and chromedriver processes system-wide, whoever their parent is."""
+    return sum(1 for process in list_processes().values() if is_browser(process))
+
+
+def sample_process(pid: int) -> dict:
+    """Sample RSS, open file descriptors and threads of a process, and the browsers running."""
+    sample = {"time": time.time()}
+    status = process_status(pid)
+    if status is None:
+        # Not on Linux, or the server already exited
+        return sample
+    sample.update(status)
+    sample["chrome_processes"] = count_browsers()
+    return sample
+
+
+def sample_loop(pid: int, interval: float, stop: threading.Event, samples: list) -> None:
+    while True:
+        samples.append(sample_process(pid))
+        if stop.wait(interval):
+            return
+
+
+def resource_growth(samples: list, browsers_before: int) -> dict:
+    """Compare the last sample with the first one, and its browsers with those before the server started."""
+    usable = [s for s in samples if "rss_mb" in s]
+    if len(usable) < 2:
+        return {}
+    first, last = usable[0], usable[-1]
+    hours = (last["time"] - first["time"]) / 3600 or 1
+    return {
+        "rss_mb": last["rss_mb"] - first["rss_mb"],
+        "rss_mb_per_hour": (last["rss_mb"] - first["rss_mb"]) / hours,
+        "open_fds": last["open_fds"] - first["open_fds"],
+        "threads": last["threads"] - first["threads"],
+        "chrome_processes_left": last["chrome_processes"] - browsers_before
+    }
+
+
+def start_server(settings_path: str, database: str):
+    """Start ``benchmarks.serve_app`` and wait for it to report its port."""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.serve_app', '--settings', settings_path, '--database', database],
+        stdout=subprocess.PIPE, text=True
+    )
+    for line in process.stdout:
+        if line.startswith('LISTENING '):
+            return process, f"http://127.0.0.1:{int(line.split()[1])}"
+    process.wait()
+    raise RuntimeError(f"Server exited with code {process.returncode} before listening")
+
+
+def run_load(args) -> dict:
+    """Run one load test and return its results."""
+    with ExitStack() as stack:
+        trading212 = stack.enter_context(Trading212Stub(args.positions, latency=args.source_latency))
+        binance = stack.enter_context(BinanceStub(args.positions, latency=args.source_latency))
+        debank = stack.enter_context(DebankStub(args.positions, latency=args.source_latency))
+        notion = stack.enter_context(NotionStub(latency=args.notion_latency))
+        tmp = stack.enter_context(tempfile.TemporaryDirectory(prefix='portfolio-load-'))
+
+        settings = build_settings(trading212, binance, debank, notion, args.wallets)
+        settings.sink_output_dir = os.path.join(tmp, 'data')
+        if args.mix.get('run') and not settings.chromedriver_path:
+            raise RuntimeError("Runs need a local chromedriver, install one or set CHROMEDRIVER_PATH")
+        settings_path = os.path.join(tmp, 'settings.json')
+        with open(settings_path, 'w') as f:
+            json.dump(asdict(settings), f)
+
+        browsers_before = count_browsers()
+        process, base_url = start_server(settings_path, os.path.join(tmp, 'load.db'))
+        stack.callback(process.wait)
+        stack.callback(process.terminate)
+
+        recorder = Recorder()
+        samples = []
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=sample_loop, args=(process.pid, args.sample_interval, stop, samples), daemon=True
+        )
+        sampler.start()
+
+        started = time.monotonic()
+        deadline = started + args.duration
+        with ThreadPoolExecutor(max_workers=args.clients, thread_name_prefix='client') as executor:
+            futures = [
+                executor.submit(Client(base_url, recorder, args.sources, seed).loop, args.mix, deadline)
+                for seed in range(args.clients)
+            ]
+            for future in futures:
+                future.result()
+        elapsed = time.monotonic() - started
+
+        # Let in-flight cleanup (browser shutdown, pool returns) settle before the last sample
+        time.sleep(min(args.sample_interval, 5))
+        stop.set()
+        sampler.join()
+        samples.append(sample_process(process.pid))
+
+        summary = recorder.summary(elapsed)
+        statuses = summary.pop("statuses")
+        total = sum(op["requests"] for op in summary.values())
+        return {
+            "started_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": vars(args),
+            "seconds": elapsed,
+            "requests": total,
+            "rps": total / elapsed if elapsed else 0.0,
+            "operations": summary,
+            "statuses": statuses,
+            "notion_requests": notion.request_count,
+            "resources": samples,
+            "chrome_processes_before": browsers_before,
+            "growth": resource_growth(samples, browsers_before)
+        }
+
+
+def check_limits(results: dict, args) -> list:
+    """Return a message per exceeded soak limit."""
+    growth = results["growth"]
+    failures = []
+    if not growth:
+        return failures
+    if args.max_rss_growth is not None and growth["rss_mb"] > args.max_rss_growth:
+        failures.append(f"RSS grew by {growth['rss_mb']:.1f} MB (limit {args.max_rss_growth} MB)")
+    if args.max_fd_growth is not None and growth["open_fds"] > args.max_fd_growth:
+        failures.append(f"Open file descriptors grew by {growth['open_fds']} (limit {args.max_fd_growth})")
+    if args.max_thread_growth is not None and growth["threads"] > args.max_thread_growth:
+        failures.append(f"Threads grew by {growth['threads']} (limit {args.max_thread_growth})")
+    if growth["chrome_processes_left"]:
+        failures.append(f"{growth['chrome_processes_left']} Chrome processes left after the load stopped")
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to apply load')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Relative weight per operation ({', '.join(OPERATIONS)}), default {DEFAULT_MIX}")
+    parser.add_argument('--sources', nargs='+', default=['Trading212'],
+                        help='Sources requested by run and schedule operations')
+    parser.add_argument('--positions', type=int, default=100, help='Positions returned by each source stub')
+    parser.add_argument('--wallets', type=int, default=0, help='DeBank profiles scraped per run')
+    parser.add_argument('--source-latency', type=float, default=0.0,
+                        help='Seconds of latency added by source stubs')
+    parser.add_argument('--notion-latency', type=float, default=0.0,
+                        help='Seconds of latency added per Notion request')
+    parser.add_argument('--sample-interval', type=float, default=5, help='Seconds between resource samples')
+    parser.add_argument('--max-rss-growth', type=float, help='Fail when RSS grows by more MB')
+    parser.add_argument('--max-fd-growth', type=int, help='Fail when open file descriptors grow by more')
+    parser.add_argument('--max-thread-growth', type=int, help='Fail when threads grow by more')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = run_load(args)
+
+    print(f"{'operation':18s} {'requests':>9s} {'errors':>7s} {'rps':>8s} "
+          f"{'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+    for name, op in results["operations"].items():
+        print(f"{name:18s} {op['requests']:9d} {op['errors']:7d} {op['rps']:8.1f} "
+              f"{op['p50_ms']:8.1f} {op['p95_ms']:8.1f} {op['p99_ms']:8.1f}")
+    print(f"{'total':18s} {results['requests']:9d} {'':7s} {results['rps']:8.1f}")
+    if results["growth"]:
+        growth = results["growth"]
+        print(f"growth: rss {growth['rss_mb']:+.1f} MB ({growth['rss_mb_per_hour']:+.1f} MB/h), "
+              f"fds {growth['open_fds']:+d}, threads {growth['threads']:+d}, "
+              f"chrome left {growth['chrome_processes_left']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    failures = check_limits(results, args)
+    for failure in failures:
+        print(f"LIMIT EXCEEDED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
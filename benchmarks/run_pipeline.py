@@ -0,0 +1,207 @@
+"""End-to-end benchmark of ``PortfolioTracker.run`` against local stubs.
+
+Every upstream (Notion, Trading212, Binance and DeBank) is replaced by a
+stub from ``benchmarks.stubs``, so a run needs no credentials. DeBank
+scraping still drives a real headless Chrome against the local page.
+
+Example:
+    python -m benchmarks.run_pipeline --sizes 10 100 1000 \\
+        --sources Trading212 Binance --output bench.json
+    python -m benchmarks.run_pipeline --compare bench.json
+"""
+from contextlib import ExitStack
+from datetime import datetime
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+
+from benchmarks.stubs import BinanceStub, DebankStub, NotionStub, Trading212Stub
+from config.settings import Settings
+
+ALL_SOURCES = ['Trading212', 'Binance', 'Debank']
+
+
+def build_settings(trading212: Trading212Stub, binance: BinanceStub,
+                   debank: DebankStub, notion: NotionStub, wallets: int) -> Settings:
+    """Create settings pointing every upstream at the local stubs."""
+    return Settings(
+        notion_token='stub-notion-token',
+        notion_database_id='stub-database',
+        trading212_api_token='stub-trading212-token',
+        trading212_api_url=trading212.portfolio_url,
+        debank_sources=[
+            (debank.profile_url(f"0x{i:040x}"), f"Stub DeFi {i}")
+            for i in range(wallets)
+        ],
+        binance_api_key='stub-binance-key',
+        binance_api_secret='stub-binance-secret',
+        cryptocom_api_key='',
+        cryptocom_api_secret='',
+        binance_api_url=binance.url,
+        binance_wallets=['spot', 'funding', 'earn', 'earn_locked', 'margin'],
+        binance_sub_accounts=['stub-sub-account@example.com'],
+        notion_base_url=notion.url,
+        trading212_currency='USD',
+        fx_cache_path=None,
+        debank_cache_ttl=0,
+        # Never download a driver during a measurement
+        chromedriver_path=os.getenv('CHROMEDRIVER_PATH') or shutil.which('chromedriver')
+    )
+
+
+def _timed(stage_times: dict, stage: str, func):
+    """Wrap ``func`` so each call adds its duration to ``stage_times[stage]``."""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stage_times[stage] = stage_times.get(stage, 0.0) + time.perf_counter() - start
+    return wrapper
+
+
+def build_tracker(settings: Settings, sources):
+    """Create a tracker with the requested sources active."""
+    from app.portfolio_tracker import PortfolioTracker
+
+    tracker = PortfolioTracker(settings)
+    tracker.set_active_sources(sources)
+    return tracker
+
+
+def run_case(sources, size: int, repeat: int, args) -> dict:
+    """Benchmark one combination of sources and portfolio size."""
+    with ExitStack() as stack:
+        trading212 = stack.enter_context(Trading212Stub(size, latency=args.source_latency))
+        binance = stack.enter_context(BinanceStub(size, latency=args.source_latency))
+        debank = stack.enter_context(DebankStub(size, latency=args.source_latency))
+        notion = stack.enter_context(NotionStub(
+            latency=args.notion_latency,
+            throttle_rate=args.notion_throttle_rate
+        ))
+        settings = build_settings(trading212, binance, debank, notion, args.wallets)
+        tracker = build_tracker(settings, sources)
+
+        runs = []
+        for _ in range(repeat):
+            stage_times = {}
+            for name, source in tracker.active_sources.items():
+                source.fetch_positions = _timed(
+                    stage_times, f"fetch.{name}", type(source).fetch_positions.__get__(source)
+                )
+            tracker.sink.save_positions = _timed(
+                stage_times, "sinks", type(tracker.sink).save_positions.__get__(tracker.sink)
+            )
+
+            start = time.perf_counter()
+            result = tracker.run()
+            elapsed = time.perf_counter() - start
+            runs.append({
+                "seconds": elapsed,
+                "stages": stage_times,
+                "positions": result.get("positions"),
+                "status": result.get("status")
+            })
+
+        stage_names = sorted({stage for run in runs for stage in run["stages"]})
+        return {
+            "sources": list(sources),
+            "size": size,
+            "repeat": repeat,
+            "positions": runs[-1]["positions"],
+            "status": runs[-1]["status"],
+            "median_seconds": statistics.median(run["seconds"] for run in runs),
+            "min_seconds": min(run["seconds"] for run in runs),
+            "stages": {
+                stage: statistics.median(run["stages"].get(stage, 0.0) for run in runs)
+                for stage in stage_names
+            },
+            "notion_requests": notion.request_count,
+            "notion_throttled": notion.throttled,
+            "runs": runs
+        }
+
+
+def _case_key(case: dict) -> str:
+    return f"{'+'.join(case['sources'])}@{case['size']}"
+
+
+def compare(baseline_path: str, results: dict, threshold: float) -> int:
+    """Print the change against a baseline file and count regressions."""
+    with open(baseline_path) as f:
+        baseline = {_case_key(case): case for case in json.load(f)["cases"]}
+
+    regressions = 0
+    for case in results["cases"]:
+        key = _case_key(case)
+        if key not in baseline:
+            print(f"{key:40s} (no baseline)")
+            continue
+        before = baseline[key]["median_seconds"]
+        after = case["median_seconds"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key:40s} {before:9.3f}s -> {after:9.3f}s ({change:+.1%}){flag}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                        help='Positions returned by each source stub')
+    parser.add_argument('--sources', nargs='+', default=ALL_SOURCES, choices=ALL_SOURCES,
+                        help='Sources to benchmark, measured with 1..N of them active')
+    parser.add_argument('--wallets', type=int, default=2,
+                        help='DeBank profiles scraped per run')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--source-latency', type=float, default=0.0,
+                        help='Seconds of latency added by source stubs')
+    parser.add_argument('--notion-latency', type=float, default=0.0,
+                        help='Seconds of latency added per Notion request')
+    parser.add_argument('--notion-throttle-rate', type=float, default=0.0,
+                        help='Fraction of Notion requests answered with 429')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative slowdown reported as a regression')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = {
+        "started_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "cases": []
+    }
+
+    for count in range(1, len(args.sources) + 1):
+        sources = args.sources[:count]
+        for size in args.sizes:
+            case = run_case(sources, size, args.repeat, args)
+            results["cases"].append(case)
+            stages = ", ".join(f"{k}={v:.3f}s" for k, v in case["stages"].items())
+            print(f"{_case_key(case):40s} {case['median_seconds']:9.3f}s  {stages}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        return 1 if compare(args.compare, results, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Serve the web app on a local port with settings given on the command line.
+
+Used by ``benchmarks.load_test`` to run the app in its own process, so
+resource samples only cover the server. Prints ``LISTENING <port>`` once
+the socket is bound.
+
+Example:
+    python -m benchmarks.serve_app --settings settings.json --database /tmp/load.db
+"""
+from pathlib import Path
+import argparse
+import importlib.util
+import json
+import logging
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_create_app():
+    """Import ``create_app`` from the top-level ``app.py``, which the ``app`` package shadows."""
+    spec = importlib.util.spec_from_file_location('portfolio_app', ROOT / 'app.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.create_app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--settings', required=True, help='JSON file with Settings fields')
+    parser.add_argument('--database', required=True, help='SQLite database file')
+    parser.add_argument('--port', type=int, default=0, help='Port to bind, 0 picks a free one')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    from werkzeug.serving import make_server
+    from app.database import init_db
+    from config.settings import Settings
+
+    with open(args.settings) as f:
+        settings = Settings(**json.load(f))
+
+    app = load_create_app()({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{args.database}",
+        'SECRET_KEY': 'load-test'
+    })
+    app.config['SETTINGS'] = settings
+    init_db(app)
+
+    # Request logging would dominate the measured latency
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    server = make_server('127.0.0.1', args.port, app, threaded=True)
+    print(f"LISTENING {server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""Local stand-ins for every upstream the portfolio tracker talks to.
+
+Each stub is a small threaded HTTP server bound to 127.0.0.1 on a random
+port, so benchmarks and load tests can run without live credentials.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import html
+import json
+import random
+import threading
+import time
+
+
+class StubServer:
+    """Base class running a request handler on a background thread."""
+
+    def __init__(self, latency: float = 0.0):
+        """Initialize the stub.
+
+        Args:
+            latency: Seconds to sleep before answering each request
+        """
+        self.latency = latency
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle(self, method: str, path: str, body: bytes):
+        """Return a (status, content_type, payload, headers) tuple for a request."""
+        raise NotImplementedError
+
+    def start(self) -> 'StubServer':
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes, Nagle would hold the body back ~40 ms
+            disable_nagle_algorithm = True
+
+            def _dispatch(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                with stub._lock:
+                    stub.request_count += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                status, content_type, payload, headers = stub.handle(
+                    self.command, urlparse(self.path).path, body
+                )
+                if isinstance(payload, (dict, list)):
+                    payload = json.dumps(payload)
+                if isinstance(payload, str):
+                    payload = payload.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _dispatch
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _fake_tickers(count: int):
+    return [f"TCK{i:05d}" for i in range(count)]
+
+
+class NotionStub(StubServer):
+    """Notion API stub accepting page creation with optional throttling."""
+
+    def __init__(self, latency: float = 0.0, throttle_rate: float = 0.0,
+                 retry_after: int = 1, seed: int = 0):
+        """Initialize the stub.
+
+        Args:
+            latency: Seconds to sleep before answering each request
+            throttle_rate: Fraction of requests answered with HTTP 429
+            retry_after: Value of the Retry-After header sent with a 429
+            seed: Seed for the throttling decisions
+        """
+        super().__init__(latency)
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.pages_created = 0
+        self.throttled = 0
+        self._random = random.Random(seed)
+
+    def handle(self, method, path, body):
+        with self._lock:
+            throttle = self._random.random() < self.throttle_rate
+            if throttle:
+                self.throttled += 1
+            else:
+                self.pages_created += 1
+        if throttle:
+            return 429, 'application/json', {
+                "object": "error",
+                "status": 429,
+                "code": "rate_limited",
+                "message": "You have been rate limited. Please try again in a few minutes."
+            }, {'Retry-After': str(self.retry_after)}
+        if method == 'POST' and path.endswith('/pages'):
+            return 200, 'application/json', {
+                "object": "page",
+                "id": f"stub-page-{self.pages_created}"
+            }, None
+        return 404, 'application/json', {
+            "object": "error", "status": 404, "code": "object_not_found", "message": path
+        }, None
+
+
+class Trading212Stub(StubServer):
+    """Trading212 portfolio endpoint returning ``positions`` holdings."""
+
+    PATH = '/api/v0/equity/portfolio'
+
+    def __init__(self, positions: int = 10, latency: float = 0.0):
+        super().__init__(latency)
+        self.payload = json.dumps([
+            {"ticker": ticker, "quantity": 1.5 + i % 7, "currentPrice": 10.0 + i % 100}
+            for i, ticker in enumerate(_fake_tickers(positions))
+        ])
+
+    @property
+    def portfolio_url(self) -> str:
+        return f"{self.url}{self.PATH}"
+
+    def handle(self, method, path, body):
+        if path == self.PATH:
+            return 200, 'application/json', self.payload, None
+        if path == '/api/v0/equity/account/info':
+            return 200, 'application/json', {"currencyCode": "USD", "id": 1}, None
+        return 404, 'application/json', {"code": "NotFound"}, None
+
+
+class BinanceStub(StubServer):
+    """Binance spot, funding, earn, margin and sub-account balance endpoints.
+
+    Every response reports the weight used so far in the
+    ``X-MBX-USED-WEIGHT-1M`` / ``X-SAPI-USED-IP-WEIGHT-1M`` headers.
+    """
+
+    WEIGHTS = {
+        '/api/v3/account': 20,
+        '/api/v3/ticker/price': 4,
+        '/sapi/v1/asset/get-funding-asset': 1,
+        '/sapi/v1/simple-earn/flexible/position': 150,
+        '/sapi/v1/simple-earn/locked/position': 150,
+        '/sapi/v1/margin/account': 10,
+        '/sapi/v3/sub-account/assets': 60,
+    }
+
+    def __init__(self, positions: int = 10, latency: float = 0.0):
+        super().__init__(latency)
+        self.used_weight = {'api': 0, 'sapi': 0}
+        assets = [f"A{i:05d}" for i in range(positions)]
+        balances = [
+            {"asset": asset, "free": str(1 + i % 13), "locked": "0"}
+            for i, asset in enumerate(assets)
+        ]
+        self.account = json.dumps({"balances": balances})
+        self.funding = json.dumps([dict(b, freeze="0", withdrawing="0") for b in balances[:positions // 4]])
+        self.earn = json.dumps({
+            "rows": [{"asset": asset, "totalAmount": "1"} for asset in assets[:positions // 4]],
+            "total": positions // 4
+        })
+        self.margin = json.dumps({
+            "userAssets": [{"asset": b["asset"], "free": b["free"], "locked": "0", "borrowed": "0",
+                            "netAsset": b["free"]} for b in balances[:positions // 4]]
+        })
+        self.prices = json.dumps([
+            {"symbol": f"{asset}USDT", "price": str(5 + i % 50)}
+            for i, asset in enumerate(assets)
+        ])
+
+    def handle(self, method, path, body):
+        pool = 'sapi' if path.startswith('/sapi/') else 'api'
+        with self._lock:
+            self.used_weight[pool] += self.WEIGHTS.get(path, 1)
+            used = self.used_weight[pool]
+        header = 'X-SAPI-USED-IP-WEIGHT-1M' if pool == 'sapi' else 'X-MBX-USED-WEIGHT-1M'
+        headers = {header: str(used)}
+        payload = {
+            '/api/v3/account': self.account,
+            '/api/v3/ticker/price': self.prices,
+            '/sapi/v1/asset/get-funding-asset': self.funding,
+            '/sapi/v1/simple-earn/flexible/position': self.earn,
+            '/sapi/v1/simple-earn/locked/position': '{"rows": [], "total": 0}',
+            '/sapi/v1/margin/account': self.margin,
+            '/sapi/v3/sub-account/assets': self.account,
+        }.get(path)
+        if payload is None:
+            return 404, 'application/json', {"code": -1, "msg": "Not found"}, headers
+        return 200, 'application/json', payload, headers
+
+
+class DebankStub(StubServer):
+    """Static DeBank-like profile page for the Selenium scraper."""
+
+    def __init__(self, positions: int = 10, latency: float = 0.0):
+        super().__init__(latency)
+        rows = "\n".join(
+            '<div class="ProjectCell_assetsItem">'
+            f'<span class="ProjectCell_assetsItemNameText__l9fan">{html.escape(name)}</span>'
+            f'<span class="ProjectCell_assetsItemWorth__EMwu2">${1000 + i * 3:,}.{i % 100:02d}</span>'
+            '</div>'
+            for i, name in enumerate(_fake_tickers(positions))
+        )
+        self.page = f"<!DOCTYPE html><html><head><title>DeBank</title></head><body>{rows}</body></html>"
+
+    def profile_url(self, wallet: str) -> str:
+        return f"{self.url}/profile/{wallet}"
+
+    def handle(self, method, path, body):
+        if path.startswith('/profile/'):
+            return 200, 'text/html; charset=utf-8', self.page, None
+        return 404, 'text/html', '<html><body>Not found</body></html>', None
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
 import os
 from dotenv import load_dotenv
 
@@ -14,6 +14,30 @@ class Settings:
     binance_api_secret: str
     cryptocom_api_key: str
     cryptocom_api_secret: str
+    binance_api_url: str = "https://api.binance.com"
+    binance_wallets: List[str] = field(default_factory=lambda: ['spot'])
+    binance_sub_accounts: List[str] = field(default_factory=list)
+    binance_max_workers: int = 4
+    notion_base_url: str = "https://api.notion.com"
+    sinks: List[str] = field(default_factory=lambda: ['notion'])
+    sink_output_dir: str = "data"
+    base_currency: str = "USD"
+    trading212_currency: Optional[str] = None
+    fx_cache_path: Optional[str] = "fx_rates.db"
+    fx_cache_ttl: int = 6 * 3600
+    debank_cache_path: Optional[str] = "scrape_cache.db"
+    debank_cache_ttl: int = 15 * 60
+    debank_cache_max_stale: int = 24 * 3600
+    chromedriver_path: Optional[str] = None
+    watchdog_interval: int = 60
+    watchdog_orphan_age: int = 600
+    watchdog_tracemalloc: bool = False
+    delta_sinks: List[str] = field(default_factory=list)
+    delta_threshold: float = 0.0
+    run_deadline: int = 900
+    run_mode: str = 'inline'
+    worker_concurrency: int = 2
+    worker_poll_interval: float = 2.0
 
     @classmethod
     def load_from_env(cls) -> 'Settings':
@@ -31,6 +55,29 @@ class Settings:
             binance_api_key=os.getenv('BINANCE_API_KEY'),
             binance_api_secret=os.getenv('BINANCE_API_SECRET'),
             cryptocom_api_key=os.getenv('CRYPTOCOM_API_KEY'),
-            cryptocom_api_secret=os.getenv('CRYPTOCOM_API_SECRET')
-            
+            cryptocom_api_secret=os.getenv('CRYPTOCOM_API_SECRET'),
+            binance_api_url=os.getenv('BINANCE_API_URL', "https://api.binance.com"),
+            binance_wallets=[name.strip().lower() for name in os.getenv('BINANCE_WALLETS', 'spot').split(',') if name.strip()],
+            binance_sub_accounts=[email.strip() for email in os.getenv('BINANCE_SUB_ACCOUNTS', '').split(',') if email.strip()],
+            binance_max_workers=int(os.getenv('BINANCE_MAX_WORKERS', 4)),
+            notion_base_url=os.getenv('NOTION_BASE_URL', "https://api.notion.com"),
+            sinks=[name.strip().lower() for name in os.getenv('SINKS', 'notion').split(',') if name.strip()],
+            sink_output_dir=os.getenv('SINK_OUTPUT_DIR', "data"),
+            base_currency=os.getenv('BASE_CURRENCY', "USD").upper(),
+            trading212_currency=(os.getenv('TRADING212_CURRENCY') or '').upper() or None,
+            fx_cache_path=os.getenv('FX_CACHE_PATH', "fx_rates.db"),
+            fx_cache_ttl=int(os.getenv('FX_CACHE_TTL', 6 * 3600)),
+            debank_cache_path=os.getenv('DEBANK_CACHE_PATH', "scrape_cache.db"),
+            debank_cache_ttl=int(os.getenv('DEBANK_CACHE_TTL', 15 * 60)),
+            debank_cache_max_stale=int(os.getenv('DEBANK_CACHE_MAX_STALE', 24 * 3600)),
+            chromedriver_path=os.getenv('CHROMEDRIVER_PATH') or None,
+            watchdog_interval=int(os.getenv('WATCHDOG_INTERVAL', 60)),
+            watchdog_orphan_age=int(os.getenv('WATCHDOG_ORPHAN_AGE', 600)),
+            watchdog_tracemalloc=os.getenv('WATCHDOG_TRACEMALLOC', '').lower() in ('1', 'true', 'yes'),
+            delta_sinks=[name.strip().lower() for name in os.getenv('DELTA_SINKS', '').split(',') if name.strip()],
+            delta_threshold=float(os.getenv('DELTA_THRESHOLD', 0.0)),
+            run_deadline=int(os.getenv('RUN_DEADLINE', 900)),
+            run_mode=os.getenv('RUN_MODE', 'inline').lower(),
+            worker_concurrency=int(os.getenv('WORKER_CONCURRENCY', 2)),
+            worker_poll_interval=float(os.getenv('WORKER_POLL_INTERVAL', 2.0))
         )
\ No newline at end of file
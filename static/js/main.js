@@ -7,11 +7,14 @@ const schedulesList = document.getElementById('schedulesList');
 const scheduleTypeSelect = document.querySelector('select[name="scheduleType"]');
 const dayOfWeekField = document.getElementById('dayOfWeekField');
 const statusMessage = document.getElementById('statusMessage');
+const runsList = document.getElementById('runsList');
+const profileRunsToggle = document.getElementById('profileRunsToggle');
 
 // Event Listeners
 document.addEventListener('DOMContentLoaded', () => {
-    // Load initial schedules
+    // Load initial schedules and runs
     loadSchedules();
+    loadRuns();
     
     // Modal controls
     addScheduleBtn.addEventListener('click', () => {
@@ -64,7 +67,8 @@ async function runUpdate(source) {
     button.textContent = 'Updating...';
 
     try {
-        const response = await fetch('/api/run', {
+        const url = profileRunsToggle.checked ? '/api/run?profile=1' : '/api/run';
+        const response = await fetch(url, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ sources: [source] })
@@ -82,9 +86,48 @@ async function runUpdate(source) {
     } finally {
         button.disabled = false;
         button.textContent = 'Update Now';
+        loadRuns();
     }
 }
 
+// Run history handling
+async function loadRuns() {
+    try {
+        const response = await fetch('/api/runs?limit=10');
+        const data = await response.json();
+        
+        if (data.status === 'success') {
+            renderRuns(data.runs || []);
+        }
+    } catch (error) {
+        showMessage('Error loading runs', false);
+    }
+}
+
+function renderRuns(runs) {
+    if (!runs.length) {
+        runsList.innerHTML = '<p class="text-gray-500 text-center py-4">No runs recorded</p>';
+        return;
+    }
+
+    runsList.innerHTML = runs.map(run => `
+        <div class="flex justify-between items-center text-sm border-b border-gray-100 py-2">
+            <div>
+                <span class="font-medium text-gray-900">#${run.id}</span>
+                <span class="text-gray-600 ml-2">${run.selected_sources.join(', ')}</span>
+                <span class="text-gray-500 ml-2">${run.started_at || ''}</span>
+            </div>
+            <div class="flex space-x-3">
+                <span class="text-gray-700">${run.status}</span>
+                ${run.profiled ? `
+                    <a href="/api/runs/${run.id}/profile" class="text-blue-600 hover:underline">pstats</a>
+                    <a href="/api/runs/${run.id}/profile?format=text" target="_blank" class="text-blue-600 hover:underline">summary</a>
+                ` : ''}
+            </div>
+        </div>
+    `).join('');
+}
+
 // Schedule handling
 async function loadSchedules() {
     try {
@@ -0,0 +1,50 @@
+from decimal import Decimal
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import models  # noqa: F401
+from app.database import Base
+from app.models.position import PositionBatch
+from app.services.delta import compute_delta, content_hash
+from app.services.snapshots import SnapshotStore
+
+
+@pytest.fixture
+def store():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield SnapshotStore(session)
+    session.close()
+
+
+def _batch(worths):
+    return PositionBatch([f"P{i}" for i in range(len(worths))], [Decimal(w) for w in worths],
+                         'Trading212', currencies='USD')
+
+
+WORTHS = ['123.45', '0.1', '20', '12345678901.2345', '0.000012345678901234567',
+          '1999.9999999999999999', '31.41592653589793238']
+
+
+def test_reloaded_snapshot_is_unchanged(store):
+    batch = _batch(WORTHS)
+    snapshot = store.record(batch, content_hash(batch), 'USD', sources='Trading212')
+
+    reloaded = store.load_positions(snapshot)
+    delta = compute_delta(reloaded, batch)
+
+    assert delta.summary() == {'added': 0, 'removed': 0, 'changed': 0,
+                               'unchanged': len(WORTHS), 'identical': False}
+    assert content_hash(reloaded) == content_hash(batch)
+
+
+def test_reloaded_snapshot_detects_changes(store):
+    batch = _batch(WORTHS)
+    snapshot = store.record(batch, content_hash(batch), 'USD', sources='Trading212')
+
+    changed = _batch(['123.46'] + WORTHS[1:])
+    delta = compute_delta(store.load_positions(snapshot), changed)
+
+    assert delta.summary()['changed'] == 1
+    assert list(delta.changed.names) == ['P0']
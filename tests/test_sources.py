@@ -0,0 +1,68 @@
+from decimal import Decimal
+from unittest import mock
+import pytest
+import requests
+from app import portfolio_tracker
+from app.sources import SOURCE_NAMES, source_class
+from app.sources.binance import BinanceSource
+from config.settings import Settings
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+        self.status_code = 200
+        self.headers = {}
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return Settings(
+        notion_token='notion', notion_database_id='db', trading212_api_token='t212',
+        trading212_api_url='https://t212.invalid/api/v0/equity/portfolio', debank_sources=[],
+        binance_api_key='key', binance_api_secret='secret', cryptocom_api_key=None,
+        cryptocom_api_secret=None, binance_api_url='https://binance.invalid', sinks=[],
+        fx_cache_path=str(tmp_path / 'fx.db'), debank_cache_ttl=0
+    )
+
+
+def test_binance_is_selectable():
+    assert 'Binance' in SOURCE_NAMES
+    assert source_class('Binance') is BinanceSource
+
+
+def test_run_with_binance_settings_fetches_from_binance(settings, monkeypatch):
+    monkeypatch.setattr(portfolio_tracker, 'WebDriverService', mock.MagicMock())
+    urls = []
+
+    def fake_get(url, **kwargs):
+        urls.append(url)
+        return FakeResponse([{'symbol': 'BTCUSDT', 'price': '50000'}])
+
+    def fake_request(method, url, **kwargs):
+        urls.append(url)
+        assert kwargs['headers'] == {'X-MBX-APIKEY': 'key'}
+        return FakeResponse({'balances': [
+            {'asset': 'BTC', 'free': '0.5', 'locked': '0'},
+            {'asset': 'USDT', 'free': '100', 'locked': '0'}
+        ]})
+
+    monkeypatch.setattr(requests, 'get', fake_get)
+    monkeypatch.setattr(requests, 'request', fake_request)
+
+    tracker = portfolio_tracker.PortfolioTracker(settings)
+    tracker.set_active_sources(['Binance'])
+    result = tracker.run()
+
+    assert isinstance(tracker.active_sources['Binance'], BinanceSource)
+    assert result['status'] == 'success'
+    assert result['completed']['sources'] == ['Binance']
+    assert result['positions'] == 2
+    assert Decimal(result['total_worth']) == Decimal('25100')
+    assert all(url.startswith('https://binance.invalid/') for url in urls)